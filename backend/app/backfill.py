@@ -0,0 +1,406 @@
+# app/backfill.py
+"""
+Загрузка архива за много сезонов (backfill) с чекпоинтами.
+
+Запуск из командной строки (из каталога backend):
+
+    python -m app.backfill bl1 2010 2023 --rate 1 --batch-size 100
+
+или через API: POST /api/admin/backfill?league=bl1&season_from=2010&season_to=2023.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.openligadb_client import OpenLigaDBClient
+from app.repositories.backfill import list_backfill_checkpoints, save_backfill_checkpoint
+from app.repositories.matches import bulk_upsert_matches_from_board
+from app.repositories.sync_lock import release_sync_lock, try_acquire_sync_lock
+from app.schemas.match import classify_matches
+from app.serialization import match_summaries_rows
+from app.settings import settings
+from app.sync_scheduler import default_instance_id
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillBusy(Exception):
+    """Backfill лиги уже идёт (аренду в sync_lock держит другой процесс)."""
+
+
+def backfill_lock_name(league: str) -> str:
+    return f"backfill:{league.lower()}"
+
+
+class RateLimiter:
+    """
+    Не чаще rate_per_s запросов в секунду (равномерно, без всплесков).
+    rate_per_s <= 0 — без ограничения.
+
+    Лимит — в памяти процесса: у каждой реплики (и у запуска из
+    командной строки) он свой.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.interval_s = 1.0 / rate_per_s if rate_per_s > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+        self.waited_s = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval_s:
+            return
+        async with self._lock:
+            now = self._clock()
+            wait = self._next_at - now
+            if wait > 0:
+                self.waited_s += wait
+                await self._sleep(wait)
+            self._next_at = max(now, self._next_at) + self.interval_s
+
+
+@dataclass
+class BackfillReport:
+    league: str
+    season_from: int
+    season_to: int
+    done: List[int] = field(default_factory=list)
+    skipped: List[int] = field(default_factory=list)
+    failed: Dict[int, str] = field(default_factory=dict)
+    matches: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "league": self.league,
+            "season_from": self.season_from,
+            "season_to": self.season_to,
+            "done": self.done,
+            "skipped": self.skipped,
+            "failed": {str(season): detail for season, detail in self.failed.items()},
+            "matches": self.matches,
+        }
+
+
+def _utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+async def _backfill_season(
+    db: Session,
+    client: OpenLigaDBClient,
+    limiter: RateLimiter,
+    league: str,
+    season: int,
+    batch_size: int,
+    now: dt.datetime,
+) -> int:
+    await limiter.acquire()
+    last_change = await client.get_season_last_change(league, season)
+    await limiter.acquire()
+    raw_matches = await client.get_season_raw(league, season)
+    if not raw_matches:
+        # Пустой ответ — не «сезон загружен»: помечаем failed, следующий запуск повторит
+        raise ValueError("OpenLigaDB не вернул матчей сезона")
+
+    return await asyncio.to_thread(
+        _write_season, db, league, season, raw_matches, last_change, batch_size, now
+    )
+
+
+def _write_season(
+    db: Session,
+    league: str,
+    season: int,
+    raw_matches: List[Dict[str, Any]],
+    last_change: Optional[dt.datetime],
+    batch_size: int,
+    now: dt.datetime,
+) -> int:
+    # Классификация и запись пачек — в потоке, не в event loop
+    matches = match_summaries_rows(classify_matches(raw_matches, now))
+    written = 0
+    for start in range(0, len(matches), batch_size):
+        batch = matches[start : start + batch_size]
+        last_batch = start + batch_size >= len(matches)
+        bulk_upsert_matches_from_board(
+            db=db,
+            league_shortcut=league,
+            league_name=league,
+            season_year=season,
+            matches=batch,
+            # Метки сезона — только когда записан весь сезон
+            last_change_at=last_change if last_batch else None,
+            full_sync_at=now if last_batch else None,
+        )
+        written += len(batch)
+        save_backfill_checkpoint(db, league, season, now, matches_written=written)
+    return written
+
+
+async def run_backfill(
+    session_factory: Callable[[], Session],
+    client: OpenLigaDBClient,
+    league: str,
+    season_from: int,
+    season_to: int,
+    limiter: Optional[RateLimiter] = None,
+    batch_size: Optional[int] = None,
+    clock: Callable[[], dt.datetime] = _utcnow,
+    holder: Optional[str] = None,
+    lock_ttl_s: Optional[float] = None,
+) -> BackfillReport:
+    """
+    Загрузить сезоны season_from..season_to лиги в БД, по одному.
+
+    - матчи сезона пишутся пачками по batch_size, после каждой пачки
+      обновляется чекпоинт (backfill_checkpoint);
+    - сезоны со статусом done пропускаются — повторный запуск продолжает
+      с места остановки; running (процесс упал) и failed загружаются заново;
+    - ошибка сезона не останавливает остальные: он помечается failed
+      (в том числе сезон, по которому OpenLigaDB не вернул матчей);
+    - запросы к OpenLigaDB идут не чаще limiter (BACKFILL_RATE_PER_S, на процесс);
+    - вся работа с БД идёт в потоках (asyncio.to_thread): backfill,
+      запущенный из API, не блокирует event loop;
+    - одна лига — один backfill на все реплики: аренда backfill:<лига>
+      в sync_lock (holder, на lock_ttl_s секунд, продлевается после каждого
+      сезона). Аренду держит другой процесс — BackfillBusy; потеряли
+      аренду посреди загрузки — останавливаемся.
+    """
+    league = league.lower()
+    if limiter is None:
+        limiter = RateLimiter(settings.backfill_rate_per_s)
+    if batch_size is None:
+        batch_size = settings.backfill_batch_size
+    if holder is None:
+        holder = default_instance_id()
+    if lock_ttl_s is None:
+        lock_ttl_s = settings.backfill_lock_ttl_s
+    lock_name = backfill_lock_name(league)
+    report = BackfillReport(league=league, season_from=season_from, season_to=season_to)
+
+    db = await asyncio.to_thread(session_factory)
+    try:
+        acquired, _ = await asyncio.to_thread(
+            try_acquire_sync_lock, db, lock_name, holder, clock(), lock_ttl_s
+        )
+        if not acquired:
+            raise BackfillBusy(f"Backfill лиги {league} уже выполняется")
+        try:
+            checkpoints = await asyncio.to_thread(
+                list_backfill_checkpoints, db, league, season_from, season_to
+            )
+            done = {cp.season_year for cp in checkpoints if cp.status == "done"}
+            for season in range(season_from, season_to + 1):
+                if season in done:
+                    report.skipped.append(season)
+                    continue
+                # Продлеваем аренду перед каждым сезоном (тот же holder — тот же UPDATE)
+                renewed, _ = await asyncio.to_thread(
+                    try_acquire_sync_lock, db, lock_name, holder, clock(), lock_ttl_s
+                )
+                if not renewed:
+                    logger.warning("backfill %s: аренду перехватил другой процесс, останавливаемся", league)
+                    break
+
+                now = clock()
+                await asyncio.to_thread(
+                    save_backfill_checkpoint,
+                    db,
+                    league,
+                    season,
+                    now,
+                    new_attempt=True,
+                    status="running",
+                    error=None,
+                    matches_written=0,
+                )
+                try:
+                    written = await _backfill_season(db, client, limiter, league, season, batch_size, now)
+                except Exception as exc:
+                    detail = str(exc) or type(exc).__name__
+                    await asyncio.to_thread(_mark_failed, db, league, season, clock(), detail)
+                    report.failed[season] = detail
+                    logger.warning("backfill %s/%s не загружен: %s", league, season, detail)
+                    continue
+
+                await asyncio.to_thread(save_backfill_checkpoint, db, league, season, clock(), status="done")
+                report.done.append(season)
+                report.matches += written
+                logger.info("backfill %s/%s: %d матчей", league, season, written)
+        finally:
+            await asyncio.to_thread(release_sync_lock, db, lock_name, holder, next_run_at=clock())
+    finally:
+        await asyncio.to_thread(db.close)
+    return report
+
+
+def _mark_failed(db: Session, league: str, season: int, now: dt.datetime, detail: str) -> None:
+    db.rollback()
+    save_backfill_checkpoint(db, league, season, now, status="failed", error=detail)
+
+
+class BackfillRunner:
+    """
+    Backfill в фоне для admin API: не больше одного запуска на лигу —
+    на все реплики (аренда backfill:<лига> в sync_lock, см. run_backfill).
+    Все запуски процесса делят один RateLimiter: нагрузка на OpenLigaDB
+    ограничена rate_per_s на реплику.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        client: OpenLigaDBClient,
+        rate_per_s: float = 1.0,
+        batch_size: int = 100,
+        instance_id: Optional[str] = None,
+        lock_ttl_s: Optional[float] = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._client = client
+        self.limiter = RateLimiter(rate_per_s)
+        self.batch_size = batch_size
+        self.instance_id = instance_id or default_instance_id()
+        self.lock_ttl_s = settings.backfill_lock_ttl_s if lock_ttl_s is None else lock_ttl_s
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.last_reports: Dict[str, Dict[str, Any]] = {}
+
+    def is_running(self, league: str) -> bool:
+        return league.lower() in self._tasks
+
+    async def start(self, league: str, season_from: int, season_to: int) -> bool:
+        """
+        Запустить backfill лиги в фоне.
+        False — для этой лиги он уже идёт (в этом процессе или на другой реплике).
+        """
+        league = league.lower()
+        if league in self._tasks:
+            return False
+        # Аренду берём до ответа 202; run_backfill продлевает её тем же holder
+        if not await asyncio.to_thread(self._acquire, league) or league in self._tasks:
+            return False
+        self._tasks[league] = asyncio.create_task(self._run(league, season_from, season_to))
+        return True
+
+    async def wait(self, league: str) -> None:
+        task = self._tasks.get(league.lower())
+        if task is not None:
+            await task
+
+    async def stop(self) -> None:
+        # Прерванный сезон останется running и при следующем запуске загрузится заново
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _run(self, league: str, season_from: int, season_to: int) -> None:
+        try:
+            report = await run_backfill(
+                self._session_factory,
+                self._client,
+                league,
+                season_from,
+                season_to,
+                limiter=self.limiter,
+                batch_size=self.batch_size,
+                holder=self.instance_id,
+                lock_ttl_s=self.lock_ttl_s,
+            )
+            self.last_reports[league] = report.as_dict()
+        except BackfillBusy as exc:
+            logger.warning("backfill %s %s..%s не запущен: %s", league, season_from, season_to, exc)
+        except Exception:
+            logger.exception("backfill %s %s..%s прерван", league, season_from, season_to)
+        finally:
+            self._tasks.pop(league, None)
+
+    def _acquire(self, league: str) -> bool:
+        with self._session_factory() as db:
+            return try_acquire_sync_lock(
+                db, backfill_lock_name(league), self.instance_id, _utcnow(), self.lock_ttl_s
+            )[0]
+
+
+def get_backfill_runner(request: Request) -> Optional[BackfillRunner]:
+    """Dependency: фоновый backfill из app.state (None без lifespan)."""
+    return getattr(request.app.state, "backfill_runner", None)
+
+
+# ---------- командная строка ----------
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.backfill",
+        description="Загрузить архив сезонов лиги из OpenLigaDB в БД (продолжает с места остановки).",
+    )
+    parser.add_argument("league", help="Shortcut лиги, например bl1")
+    parser.add_argument("season_from", type=int)
+    parser.add_argument("season_to", type=int)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=settings.backfill_rate_per_s,
+        help="Запросов к OpenLigaDB в секунду (0 — без ограничения)",
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.backfill_batch_size)
+    args = parser.parse_args(argv)
+    if args.season_from > args.season_to:
+        parser.error("season_from больше season_to")
+    return args
+
+
+async def _main(args: argparse.Namespace) -> BackfillReport:
+    from app.clients.http import create_http_client
+    from app.db import SessionLocal
+
+    http_client = create_http_client()
+    try:
+        return await run_backfill(
+            SessionLocal,
+            OpenLigaDBClient(http_client=http_client),
+            args.league,
+            args.season_from,
+            args.season_to,
+            limiter=RateLimiter(args.rate),
+            batch_size=args.batch_size,
+        )
+    finally:
+        await http_client.aclose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    try:
+        report = asyncio.run(_main(_parse_args(argv)))
+    except BackfillBusy as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
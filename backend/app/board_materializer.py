@@ -0,0 +1,191 @@
+# app/board_materializer.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from pydantic import BaseModel
+
+from app.http_cache import content_etag
+from app.serialization import model_json
+
+logger = logging.getLogger(__name__)
+
+BoardKey = Tuple[Tuple[str, ...], int, int, int]
+BoardBuilder = Callable[[], Awaitable[BaseModel]]
+
+
+def board_key(leagues: Sequence[str], season: int, days_back: int, days_ahead: int) -> BoardKey:
+    """Параметры доски в нормализованном виде (порядок лиг важен: он есть в ответе)."""
+    return tuple(lg.strip().lower() for lg in leagues), int(season), int(days_back), int(days_ahead)
+
+
+@dataclass
+class BoardSnapshot:
+    """Готовая доска: сериализованное тело и его ETag."""
+
+    key: BoardKey
+    body: bytes
+    etag: str
+    built_at: float
+    # Доска собрана частично (часть лиг не загрузилась)
+    partial: bool = False
+
+
+class BoardMaterializer:
+    """
+    Фоновая сборка /board для параметров по умолчанию.
+
+    - раз в interval_s (или сразу после notify(): поменялись данные сезона)
+      собирает доску и хранит её уже сериализованной;
+    - если тело не поменялось, снапшот (и ETag) остаётся прежним;
+    - lookup() отдаёт снапшот, только если он не старше max_age_s —
+      иначе (воркер завис, OpenLigaDB лежит) запрос идёт обычным путём;
+    - частичную доску не отдаём из памяти: пусть запрос попробует сам.
+    """
+
+    def __init__(
+        self,
+        build: BoardBuilder,
+        key: BoardKey,
+        interval_s: float = 15.0,
+        max_age_s: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._build = build
+        self.key = key
+        self.interval_s = interval_s
+        self.max_age_s = max_age_s
+        self._clock = clock
+
+        self._snapshot: Optional[BoardSnapshot] = None
+        self._wakeup = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[BaseModel], None]] = []
+
+        self.builds = 0
+        self.build_errors = 0
+        self.changes = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_build_ms: Optional[float] = None
+
+    # ---------- API ----------
+
+    def lookup(self, key: BoardKey) -> Optional[BoardSnapshot]:
+        if key != self.key:
+            return None
+        snapshot = self._snapshot
+        if (
+            snapshot is None
+            or snapshot.partial
+            or self._clock() - snapshot.built_at > self.max_age_s
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return snapshot
+
+    def add_listener(self, callback: Callable[[BaseModel], None]) -> None:
+        """Подписаться на изменения доски (вызывается с моделью доски, частичные не приходят)."""
+        self._listeners.append(callback)
+
+    def notify(self, *_args: Any) -> None:
+        """Данные изменились — пересобрать доску, не дожидаясь interval_s."""
+        self._wakeup.set()
+
+    async def refresh(self) -> Optional[BoardSnapshot]:
+        started = time.perf_counter()
+        try:
+            board = await self._build()
+        except Exception as exc:
+            self.build_errors += 1
+            logger.warning("Не удалось собрать /board в фоне: %s", exc)
+            return self._snapshot
+        finally:
+            self.builds += 1
+            self.last_build_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        body = model_json(board)
+        now = self._clock()
+        previous = self._snapshot
+        if previous is not None and previous.body == body:
+            previous.built_at = now
+            return previous
+
+        self.changes += 1
+        self._snapshot = BoardSnapshot(
+            key=self.key,
+            body=body,
+            etag=content_etag(body),
+            built_at=now,
+            partial=bool(getattr(board, "errors", None)),
+        )
+        if not self._snapshot.partial:
+            for callback in self._listeners:
+                try:
+                    callback(board)
+                except Exception:
+                    logger.exception("Ошибка в подписчике доски")
+        return self._snapshot
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._task is not None:
+            # Сборка может ждать OpenLigaDB — при остановке её не дожидаемся
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "key": {
+                "leagues": list(self.key[0]),
+                "season": self.key[1],
+                "days_back": self.key[2],
+                "days_ahead": self.key[3],
+            },
+            "builds": self.builds,
+            "build_errors": self.build_errors,
+            "changes": self.changes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "last_build_ms": self.last_build_ms,
+            "age_s": round(self._clock() - snapshot.built_at, 3) if snapshot else None,
+            "body_bytes": len(snapshot.body) if snapshot else None,
+        }
+
+    # ---------- внутреннее ----------
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            await self.refresh()
+            if self._stop.is_set():
+                break
+            # Уведомления, пришедшие во время сборки (в т.ч. от неё самой),
+            # уже учтены в только что собранной доске
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+
+def get_board_materializer(request: Request) -> Optional[BoardMaterializer]:
+    """Dependency: фоновая сборка /board из app.state (None без lifespan или если выключена)."""
+    return getattr(request.app.state, "board_materializer", None)
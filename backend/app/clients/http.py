@@ -0,0 +1,56 @@
+# app/clients/http.py
+from __future__ import annotations
+
+import logging
+from typing import Optional
+
+import httpx
+from fastapi import Request
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Создать общий httpx.AsyncClient для всех запросов к OpenLigaDB.
+
+    Клиент держит пул keep-alive соединений, поэтому TCP+TLS рукопожатие
+    происходит один раз, а не на каждый запрос. Создаётся в lifespan
+    приложения и закрывается при остановке (см. app.main).
+    """
+    http2 = settings.http2_enabled
+    if http2 and not _h2_available():
+        logger.warning("HTTP2_ENABLED=true, но пакет h2 не установлен — используем HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_s,
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.http_timeout_s),
+        limits=limits,
+        http2=http2,
+        follow_redirects=True,
+    )
+
+
+def get_http_client(request: Request) -> Optional[httpx.AsyncClient]:
+    """
+    Dependency: общий HTTP-клиент из app.state.
+
+    Возвращает None, если приложение запущено без lifespan
+    (тогда клиенты OpenLigaDB открывают соединение на каждый запрос).
+    """
+    return getattr(request.app.state, "http_client", None)
@@ -4,32 +4,68 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from app.openligadb_client import read_match_list
 from app.settings import settings
 
 
 class OpenLigaDBClient:
-    def __init__(self, base_url: str | None = None, timeout_s: float = 10.0):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout_s: float = 10.0,
+        http_client: httpx.AsyncClient | None = None,
+    ):
         self.base_url = (base_url or str(settings.api_base_url)).rstrip("/")
         self.timeout = httpx.Timeout(timeout_s)
+        # Общий пул соединений из lifespan; без него — клиент на каждый запрос
+        self._http = http_client
 
     async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
         url = f"{self.base_url}{path}"
+        if self._http is not None:
+            resp = await self._http.get(url, params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            return resp.json()
+
         async with httpx.AsyncClient(timeout=self.timeout) as client:
             resp = await client.get(url, params=params)
             resp.raise_for_status()
             return resp.json()
 
+    async def _get_matches(self, path: str) -> List[Dict[str, Any]]:
+        """Список матчей: с OPENLIGADB_STREAM_PARSE — потоковый разбор и урезанные матчи."""
+        if not settings.openligadb_stream_parse:
+            return await self._get(path)
+        url = f"{self.base_url}{path}"
+        if self._http is not None:
+            async with self._http.stream("GET", url, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                return await read_match_list(resp)
+
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with client.stream("GET", url) as resp:
+                resp.raise_for_status()
+                return await read_match_list(resp)
+
     # ===== OpenLigaDB endpoints (минимальный набор для MVP) =====
 
     async def get_matchdata_league_season(self, league: str, season: int) -> List[Dict[str, Any]]:
         # /getmatchdata/{league}/{season}
-        return await self._get(f"/getmatchdata/{league}/{season}")
+        return await self._get_matches(f"/getmatchdata/{league}/{season}")
 
     async def get_matchdata_league_season_group(
         self, league: str, season: int, group_order_id: int
     ) -> List[Dict[str, Any]]:
         # /getmatchdata/{league}/{season}/{groupOrderId}
-        return await self._get(f"/getmatchdata/{league}/{season}/{group_order_id}")
+        return await self._get_matches(f"/getmatchdata/{league}/{season}/{group_order_id}")
+
+    async def get_current_group(self, league: str) -> Dict[str, Any]:
+        # /getcurrentgroup/{league}
+        return await self._get(f"/getcurrentgroup/{league}")
+
+    async def get_last_change_date(self, league: str, season: int, group_order_id: int) -> str:
+        # /getlastchangedate/{league}/{season}/{groupOrderId}
+        return await self._get(f"/getlastchangedate/{league}/{season}/{group_order_id}")
 
     async def get_available_groups(self, league: str, season: int) -> List[Dict[str, Any]]:
         # /getavailablegroups/{league}/{season}
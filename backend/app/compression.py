@@ -0,0 +1,140 @@
+# app/compression.py
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0: одинаковое тело -> одинаковые байты (и одинаковый ETag)
+    return gzip.compress(body, compresslevel=settings.http_gzip_level, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=settings.http_brotli_quality)
+
+
+def _available_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        encoders["br"] = _brotli
+    encoders["gzip"] = _gzip
+    return encoders
+
+
+def _accepted(accept_encoding: str) -> List[str]:
+    """Кодировки из Accept-Encoding (без q=0), в порядке заголовка."""
+    result = []
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        params = params.replace(" ", "")
+        if not name or params in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        result.append(name.strip().lower())
+    return result
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов brotli (если установлен пакет brotli) или gzip.
+
+    - сжимаем только тела не меньше minimum_size байт;
+    - brotli предпочтительнее gzip, если клиент принимает оба;
+    - тела от thread_min_size байт сжимаются в потоке (asyncio.to_thread):
+      сжатие большого архива — десятки миллисекунд CPU, event loop
+      всё это время не обслуживал бы другие запросы;
+    - уже сжатые и потоковые (text/event-stream) ответы не трогаем;
+    - ETag, выставленный до сжатия, становится слабым (W/...), как в nginx.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        thread_min_size: Optional[int] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            settings.http_compress_min_size if minimum_size is None else minimum_size
+        )
+        self.thread_min_size = (
+            settings.http_compress_thread_min_size if thread_min_size is None else thread_min_size
+        )
+        self.encoders = _available_encoders()
+
+    def _choose(self, scope: Scope) -> Optional[str]:
+        accepted = _accepted(Headers(scope=scope).get("accept-encoding", ""))
+        for name in self.encoders:
+            if name in accepted:
+                return name
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._choose(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or headers.get("content-type", "").startswith(
+                    "text/event-stream"
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough or start is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if len(body) >= self.minimum_size:
+                encode = self.encoders[encoding]
+                if len(body) >= self.thread_min_size:
+                    body = await asyncio.to_thread(encode, body)
+                else:
+                    body = encode(body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            headers.add_vary_header("Accept-Encoding")
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -13,6 +13,7 @@ DEFAULT_SEASON: int = settings.default_season
 # Настройки диапазона для доски матчей (/board)
 BOARD_DAYS_BACK: int = settings.board_days_back
 BOARD_DAYS_AHEAD: int = settings.board_days_ahead
+BOARD_FETCH_CONCURRENCY: int = settings.board_fetch_concurrency
 
 
 def get_default_leagues_list() -> list[str]:
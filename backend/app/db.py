@@ -2,8 +2,16 @@
 
 from __future__ import annotations
 
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
 from .settings import settings
 
@@ -13,12 +21,115 @@ class Base(DeclarativeBase):
     pass
 
 
+# ==== Пул соединений ====
+
+
+class PoolWaitStats:
+    """Сколько раз и как долго запросы ждали свободное соединение из пула."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+
+    def record(self, wait_s: float, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_s += wait_s
+            self.max_wait_s = max(self.max_wait_s, wait_s)
+            if timed_out:
+                self.timeouts += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    round(self.total_wait_s / self.checkouts * 1000, 3) if self.checkouts else None
+                ),
+                "max_wait_ms": round(self.max_wait_s * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    """Замеряет время получения соединения из пула (включая ожидание в очереди)."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):  # type: ignore[override]
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.wait_stats.record(time.perf_counter() - started, timed_out)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_kwargs(url: str, poolclass: type) -> Dict[str, Any]:
+    """
+    Параметры пула из Settings.
+
+    Для SQLite в памяти оставляем пул по умолчанию: там одно соединение
+    на процесс/поток, размер пула и recycle не имеют смысла.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+        "pool_recycle": settings.db_pool_recycle_s,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def create_db_engine(url: str) -> Engine:
+    """Синхронный engine SQLAlchemy 2.x с настройками пула из Settings."""
+    return create_engine(
+        url,
+        future=True,
+        echo=False,  # можно временно включить True для отладки SQL
+        **_pool_kwargs(url, InstrumentedQueuePool),
+    )
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Снимок состояния пула: занятые/свободные соединения, overflow, ожидание."""
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.as_dict()
+    return status
+
+
 # Синхронный engine SQLAlchemy 2.x
-engine = create_engine(
-    settings.database_url,
-    future=True,
-    echo=False,  # можно временно включить True для отладки SQL
-)
+engine = create_db_engine(settings.database_url)
 
 # Фабрика сессий
 SessionLocal = sessionmaker(
@@ -43,3 +154,87 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ==== Асинхронный engine (asyncpg для Postgres, aiosqlite для тестов) ====
+# Нужен async-эндпоинтам архива, чтобы они не занимали потоки threadpool Starlette.
+# Создаётся лениво при первом запросе: драйвер импортируется, только если он реально нужен.
+
+# Синхронный драйвер -> асинхронный для того же URL
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def async_database_url(url: str) -> str:
+    """
+    URL для async engine из обычного DATABASE_URL.
+
+    postgresql://... -> postgresql+asyncpg://..., sqlite:///... -> sqlite+aiosqlite:///...
+    Если драйвер уже асинхронный (или неизвестен) — URL возвращается как есть.
+    """
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Async engine процесса (создаётся при первом обращении)."""
+    global _async_engine
+    if _async_engine is None:
+        url = settings.async_database_url or async_database_url(settings.database_url)
+        _async_engine = create_async_engine(
+            url,
+            echo=False,
+            **_pool_kwargs(url, InstrumentedAsyncQueuePool),
+        )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    global _async_session_factory
+    if _async_session_factory is None:
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(),
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_session_factory
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Зависимость для FastAPI: асинхронная сессия БД.
+
+    Пример использования:
+        @router.get("/items")
+        async def list_items(db: AsyncSession = Depends(get_async_db)):
+            ...
+    """
+    async with get_async_session_factory()() as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    """Закрыть пул async engine (вызывается при остановке приложения)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _async_session_factory = None
+
+
+def db_pool_metrics() -> Dict[str, Any]:
+    """Метрики пулов соединений для /api/admin/metrics."""
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(_async_engine.pool) if _async_engine is not None else None,
+    }
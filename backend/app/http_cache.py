@@ -0,0 +1,164 @@
+# app/http_cache.py
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.settings import settings
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Значение Cache-Control для эндпоинта."""
+
+    max_age: int = 0
+    stale_while_revalidate: int = 0
+    # no-cache: кэшировать можно, но перед использованием — revalidate (If-None-Match)
+    no_cache: bool = False
+    no_store: bool = False
+
+    def header(self) -> str:
+        if self.no_store:
+            return "no-store"
+        if self.no_cache:
+            return "no-cache"
+        parts = ["public", f"max-age={self.max_age}"]
+        if self.stale_while_revalidate:
+            parts.append(f"stale-while-revalidate={self.stale_while_revalidate}")
+        return ", ".join(parts)
+
+
+# Политики эндпоинтов
+NO_STORE = CachePolicy(no_store=True)
+REVALIDATE = CachePolicy(no_cache=True)
+BOARD_POLICY = CachePolicy(
+    max_age=settings.http_cache_board_max_age_s,
+    stale_while_revalidate=settings.http_cache_board_swr_s,
+)
+LIVE_POLICY = CachePolicy(max_age=30, stale_while_revalidate=30)
+REFERENCE_POLICY = CachePolicy(max_age=3600, stale_while_revalidate=3600)
+ARCHIVE_POLICY = CachePolicy(max_age=60, stale_while_revalidate=60)
+ARCHIVE_FINISHED_POLICY = CachePolicy(max_age=settings.http_cache_archive_finished_max_age_s)
+
+
+def apply_cache_policy(response: Optional[Response], policy: CachePolicy) -> None:
+    # Legacy-маршруты могут вызвать обработчик без Response
+    if response is not None:
+        response.headers["Cache-Control"] = policy.header()
+
+
+def _quote(digest: str) -> str:
+    return f'"{digest}"'
+
+
+def content_etag(body: bytes) -> str:
+    """Сильный ETag по содержимому ответа."""
+    return _quote(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def version_etag(*parts: Any) -> str:
+    """
+    Сильный ETag по версии данных (без сериализации ответа).
+
+    Версия должна браться из общего состояния (БД), а не из памяти
+    процесса: за балансировщиком ETag проверяет любая реплика.
+    """
+    key = "|".join(map(str, parts)).encode()
+    return _quote(hashlib.blake2b(key, digest_size=16).hexdigest())
+
+
+def _parse_if_none_match(value: str) -> List[str]:
+    return [tag.strip().removeprefix("W/") for tag in value.split(",") if tag.strip()]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Сравнение для If-None-Match (слабое, как требует RFC 9110):
+    W/"x" и "x" считаются одинаковыми, "*" совпадает с любым ETag.
+    """
+    if not if_none_match:
+        return False
+    tags = _parse_if_none_match(if_none_match)
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def not_modified_response(request: Request, etag: str, policy: CachePolicy) -> Optional[Response]:
+    """
+    304, если у клиента уже есть ответ с этим ETag (иначе None).
+
+    Для обработчиков, у которых ETag известен до запроса в БД.
+    """
+    if not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": policy.header()})
+
+
+_STRIP_ON_304 = ("content-length", "content-type", "content-encoding")
+
+
+class HTTPCacheMiddleware:
+    """
+    ETag + 304 для GET-ответов 200.
+
+    - если обработчик не выставил ETag — считаем его по телу ответа;
+    - если ETag совпал с If-None-Match — вместо тела отдаём 304;
+    - без явной политики ставим Cache-Control: no-cache (всегда revalidate);
+    - потоковые ответы (text/event-stream) пропускаем как есть.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, passthrough
+
+            if message["type"] == "http.response.start":
+                content_type = Headers(raw=message["headers"]).get("content-type", "")
+                if message["status"] != 200 or content_type.startswith("text/event-stream"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough or start is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            etag = headers.get("etag") or content_etag(body)
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = REVALIDATE.header()
+
+            if etag_matches(if_none_match, etag):
+                for name in _STRIP_ON_304:
+                    if name in headers:
+                        del headers[name]
+                start["status"] = 304
+                body = b""
+
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,105 @@
+# app/json_stream.py
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Optional
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789+-.eE"
+_decoder = json.JSONDecoder()
+
+# Где мы внутри массива
+_START, _FIRST, _VALUE, _COMMA = range(4)
+
+
+def _skip_ws(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+async def iter_json_array(
+    chunks: AsyncIterable[bytes],
+    transform: Optional[Callable[[Any], Any]] = None,
+) -> AsyncIterator[Any]:
+    """
+    Элементы JSON-массива верхнего уровня по мере прихода байтов.
+
+    В памяти одновременно — непрочитанный хвост буфера и один разобранный
+    элемент, а не всё тело и все объекты сразу, как у resp.json().
+    transform применяется к элементу до разбора следующего (например,
+    оставить от матча только нужные поля).
+
+    Если верхний уровень — не массив, тело проверяется целиком и ничего
+    не выдаётся. Битый или оборванный JSON — json.JSONDecodeError.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    iterator = chunks.__aiter__()
+    buf = ""
+    pos = 0
+    state = _START
+    eof = False
+    need_more = False
+
+    while True:
+        pos = _skip_ws(buf, pos)
+        if need_more or pos >= len(buf):
+            if eof:
+                raise json.JSONDecodeError("Неожиданный конец JSON-массива", buf, pos)
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                chunk, eof = b"", True
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+            need_more = False
+            continue
+
+        char = buf[pos]
+        if state == _START:
+            if char != "[":
+                rest = [buf[pos:]]
+                async for chunk in iterator:
+                    rest.append(utf8.decode(chunk))
+                rest.append(utf8.decode(b"", final=True))
+                json.loads("".join(rest))
+                return
+            state = _FIRST
+            pos += 1
+        elif state == _COMMA or (state == _FIRST and char == "]"):
+            if char == "]":
+                pos += 1
+                break
+            if char != ",":
+                raise json.JSONDecodeError("Ожидалась ',' или ']'", buf, pos)
+            state = _VALUE
+            pos += 1
+        else:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Элемент пришёл не целиком — дочитываем
+                need_more = True
+                continue
+            if (
+                not eof
+                and isinstance(item, (int, float))
+                and (end >= len(buf) or buf[end] in _NUMBER_CHARS)
+            ):
+                # Число могло оборваться на границе куска ("1" из "12", "-3" из "-3.5")
+                need_more = True
+                continue
+            pos = end
+            state = _COMMA
+            yield transform(item) if transform is not None else item
+
+    # После ']' допустимы только пробелы
+    tail = buf[pos:]
+    async for chunk in iterator:
+        tail += utf8.decode(chunk)
+    tail += utf8.decode(b"", final=True)
+    if tail.strip(_WHITESPACE):
+        raise json.JSONDecodeError("Лишние данные после JSON-массива", tail, 0)
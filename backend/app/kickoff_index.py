@@ -0,0 +1,69 @@
+# app/kickoff_index.py
+from __future__ import annotations
+
+import datetime as dt
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List
+
+from app.schemas.match import LIVE_LEAD, parse_kickoff_utc
+from app.season_cache import SeasonSnapshot
+
+# Запас на округление epoch-секунд (float): срез берём чуть шире,
+# точные границы окна проверяет вызывающий код
+_EPSILON_S = 1.0
+
+
+class KickoffIndex:
+    """
+    Сырые матчи сезона, отсортированные по kickoff, и параллельный
+    массив epoch-секунд — окно по времени выбирается бисекцией.
+
+    Отдельно держим неоконченные матчи (их LIVE не ограничен окном:
+    перенесённый и не закрытый матч остаётся LIVE) и матчи без
+    разбираемой даты (classify_match считает их начавшимися «сейчас»).
+    """
+
+    def __init__(self, raw: List[Dict[str, Any]]) -> None:
+        dated = []
+        self.undated: List[Dict[str, Any]] = []
+        for m in raw:
+            kickoff = parse_kickoff_utc(m)
+            if kickoff is None:
+                self.undated.append(m)
+            else:
+                dated.append((kickoff.timestamp(), m))
+        dated.sort(key=lambda item: item[0])
+
+        self.epochs: List[float] = [epoch for epoch, _ in dated]
+        self.matches: List[Dict[str, Any]] = [m for _, m in dated]
+        unfinished = [(epoch, m) for epoch, m in dated if not m.get("matchIsFinished")]
+        self._unfinished_epochs = [epoch for epoch, _ in unfinished]
+        self._unfinished = [m for _, m in unfinished]
+
+    def __len__(self) -> int:
+        return len(self.matches) + len(self.undated)
+
+    def between(self, start: dt.datetime, end: dt.datetime) -> List[Dict[str, Any]]:
+        """Матчи с kickoff в [start, end] (с запасом _EPSILON_S), по возрастанию kickoff."""
+        lo = bisect_left(self.epochs, start.timestamp() - _EPSILON_S)
+        hi = bisect_right(self.epochs, end.timestamp() + _EPSILON_S)
+        return self.matches[lo:hi]
+
+    def board_candidates(self, now: dt.datetime, back: int, ahead: int) -> List[Dict[str, Any]]:
+        """
+        Все матчи, которые могут попасть на /board с окном back/ahead дней:
+        окно [now - back, now + max(ahead, LIVE_LEAD)], неоконченные матчи
+        до окна (LIVE) и матчи без даты. Остальные классифицировать не нужно.
+        """
+        start = now - dt.timedelta(days=back)
+        end = now + max(dt.timedelta(days=ahead), LIVE_LEAD)
+        before = bisect_left(self._unfinished_epochs, start.timestamp() - _EPSILON_S)
+        return self._unfinished[:before] + self.between(start, end) + self.undated
+
+
+def kickoff_index(snapshot: SeasonSnapshot) -> KickoffIndex:
+    """KickoffIndex снапшота: строится один раз на версию (SeasonSnapshot.derived)."""
+    index = snapshot.derived.get("kickoff_index")
+    if index is None:
+        index = snapshot.derived["kickoff_index"] = KickoffIndex(snapshot.raw)
+    return index
@@ -0,0 +1,189 @@
+# app/live_stream.py
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from starlette.requests import HTTPConnection
+
+from app.schemas.match import MatchStatus, MatchSummary
+from app.serialization import match_summaries_json
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    """
+    Событие потока: сериализуется один раз и раздаётся всем подписчикам
+    (в очередях лежат ссылки на один и тот же объект).
+    """
+
+    seq: int
+    kind: str  # snapshot | update
+    data: bytes  # JSON
+
+    @cached_property
+    def sse(self) -> bytes:
+        """Кадр Server-Sent Events."""
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (self.seq, self.kind.encode(), self.data)
+
+    @cached_property
+    def ws(self) -> str:
+        """Сообщение WebSocket: {"event": ..., "seq": ..., "matches": [...]}."""
+        return '{"event":"%s","seq":%d,"matches":%s}' % (self.kind, self.seq, self.data.decode())
+
+
+# Маркер в очереди: подписчик не успевал читать, события выброшены —
+# вместо них он получит свежий snapshot
+_RESYNC = object()
+
+
+@dataclass(eq=False)
+class Subscription:
+    queue: "asyncio.Queue[Any]"
+    overflows: int = 0
+    resync_pending: bool = field(default=False)
+
+
+def _match_state(m: MatchSummary) -> tuple:
+    return m.status, m.score_team1, m.score_team2
+
+
+class LiveBroadcaster:
+    """
+    Рассылка изменений LIVE-матчей всем открытым соединениям.
+
+    - источник один (BoardMaterializer): publish_board() вызывается
+      после каждой пересборки доски, OpenLigaDB не опрашивается на каждого зрителя;
+    - update-события — матчи, у которых поменялся статус или счёт
+      (в т.ч. LIVE -> FINISHED), snapshot — все текущие LIVE-матчи;
+    - у каждого подписчика ограниченная очередь (queue_size событий).
+      Не успевает читать — очередь очищается, и он получает один snapshot
+      вместо пропущенных событий (память на соединение не растёт);
+    - не больше max_subscribers одновременных соединений.
+    """
+
+    def __init__(self, queue_size: int = 32, max_subscribers: int = 5000) -> None:
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+
+        self._subscribers: set[Subscription] = set()
+        self._live: Dict[int, MatchSummary] = {}
+        self._seq = itertools.count(1)
+        self._snapshot = self._make_snapshot()
+
+        self.published = 0
+        self.overflows = 0
+        self.rejected = 0
+
+    # ---------- источник ----------
+
+    def publish_board(self, board: Any) -> List[LiveEvent]:
+        """Сравнить новую доску с прошлой и разослать изменения."""
+        live: Sequence[MatchSummary] = board.live
+        finished = {m.id: m for m in board.recent}
+        current = {m.id: m for m in live}
+
+        changed: List[MatchSummary] = [
+            m for m in live if m.id not in self._live or _match_state(self._live[m.id]) != _match_state(m)
+        ]
+        for match_id, previous in self._live.items():
+            if match_id in current:
+                continue
+            # Матч ушёл из LIVE: закончился (есть в recent) или пропал с доски
+            ended = finished.get(match_id)
+            if ended is None:
+                ended = previous.model_copy(update={"status": MatchStatus.UNKNOWN})
+            changed.append(ended)
+
+        self._live = current
+        if not changed:
+            return []
+
+        self._snapshot = self._make_snapshot()
+        event = LiveEvent(seq=next(self._seq), kind="update", data=match_summaries_json(changed))
+        self._broadcast(event)
+        return [event]
+
+    # ---------- подписчики ----------
+
+    def subscribe(self) -> Optional[Subscription]:
+        """Новый подписчик (None — лимит соединений исчерпан). Первым получит snapshot."""
+        if len(self._subscribers) >= self.max_subscribers:
+            self.rejected += 1
+            return None
+        sub = Subscription(queue=asyncio.Queue(maxsize=self.queue_size))
+        sub.queue.put_nowait(self._snapshot)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    async def events(self, sub: Subscription, heartbeat_s: float) -> AsyncIterator[Optional[LiveEvent]]:
+        """
+        События подписчика по порядку. None — heartbeat (событий не было
+        heartbeat_s секунд): соединение надо «пошевелить», чтобы прокси его не закрыли.
+        """
+        while True:
+            try:
+                item = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_s)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if item is _RESYNC:
+                sub.resync_pending = False
+                item = self._snapshot
+            yield item
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": self.max_subscribers,
+            "live_matches": len(self._live),
+            "published": self.published,
+            "overflows": self.overflows,
+            "rejected": self.rejected,
+        }
+
+    # ---------- внутреннее ----------
+
+    def _make_snapshot(self) -> LiveEvent:
+        live = sorted(self._live.values(), key=lambda m: m.kickoff_utc)
+        return LiveEvent(seq=next(self._seq), kind="snapshot", data=match_summaries_json(live))
+
+    def _broadcast(self, event: LiveEvent) -> None:
+        self.published += 1
+        for sub in self._subscribers:
+            if sub.resync_pending:
+                # Уже ждёт snapshot — он будет свежее любого update
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop_backlog(sub)
+
+    def _drop_backlog(self, sub: Subscription) -> None:
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(_RESYNC)
+        sub.resync_pending = True
+        sub.overflows += 1
+        self.overflows += 1
+
+
+def get_live_broadcaster(conn: HTTPConnection) -> Optional[LiveBroadcaster]:
+    """
+    Dependency: рассылка LIVE-обновлений из app.state (None без lifespan или если
+    фоновая сборка /board выключена). HTTPConnection — чтобы работало и для WebSocket.
+    """
+    return getattr(conn.app.state, "live_broadcaster", None)
@@ -2,21 +2,40 @@
 from __future__ import annotations
 
 import datetime as dt
+from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI, Query
+import httpx
+from fastapi import Depends, FastAPI, Query, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import config as cfg
 from app.settings import settings
-from app.db import get_db
+from app.backfill import BackfillRunner
+from app.board_materializer import BoardMaterializer, board_key, get_board_materializer
+from app.db import SessionLocal, dispose_async_engine, get_async_db
+from app.compression import CompressionMiddleware
+from app.http_cache import HTTPCacheMiddleware
+from app.live_stream import LiveBroadcaster, get_live_broadcaster
+from app.clients.http import create_http_client, get_http_client
 from app.clients.openligadb_client import OpenLigaDBClient
+from app.openligadb_client import OpenLigaDBClient as SeasonClient
+from app.season_cache import SeasonCache
+from app.sync import sync_season
+from app.sync_jobs import SyncJobManager
+from app.sync_scheduler import SyncScheduler
+from app.write_behind import WriteBehindQueue, get_board_writer
 from app.sports_api import (
     router as sports_router,
+    build_board,
     get_client,
+    persist_board_snapshots,
     # handlers (sports)
     get_leagues as get_leagues_handler,
     get_matches as get_matches_handler,
     get_board as get_board_handler,
+    live_stream as live_stream_handler,
+    live_ws as live_ws_handler,
     # handlers (archive)
     get_archive_leagues as get_archive_leagues_handler,
     get_archive_seasons as get_archive_seasons_handler,
@@ -25,12 +44,153 @@ from app.sports_api import (
     get_archive_meta_endpoint as get_archive_meta_handler,
 )
 
+
+def _create_board_materializer(app: FastAPI) -> BoardMaterializer:
+    leagues = cfg.get_default_leagues_list()
+    client = SeasonClient(http_client=app.state.http_client, season_cache=app.state.season_cache)
+
+    async def build():
+        return await build_board(
+            client,
+            leagues,
+            cfg.DEFAULT_SEASON,
+            cfg.BOARD_DAYS_BACK,
+            cfg.BOARD_DAYS_AHEAD,
+            app.state.board_writer,
+        )
+
+    materializer = BoardMaterializer(
+        build=build,
+        key=board_key(leagues, cfg.DEFAULT_SEASON, cfg.BOARD_DAYS_BACK, cfg.BOARD_DAYS_AHEAD),
+        interval_s=settings.board_materialize_interval_s,
+        max_age_s=settings.board_materialize_max_age_s,
+    )
+    # Новая версия сезона в кэше -> пересобрать доску сразу
+    app.state.season_cache.add_listener(materializer.notify)
+    return materializer
+
+
+def _create_sync_scheduler(app: FastAPI) -> SyncScheduler:
+    # Тот же пул HTTP и кэш сезонов, что у запросов: новая версия сезона
+    # сразу попадает и в /board (через listener кэша)
+    client = SeasonClient(http_client=app.state.http_client, season_cache=app.state.season_cache)
+    api_client = OpenLigaDBClient(http_client=app.state.http_client)
+    season = cfg.DEFAULT_SEASON
+
+    async def sync_league(db, league: str):
+        result = await sync_season(db, client, api_client, league, season, mode="auto")
+        return result.as_dict()
+
+    return SyncScheduler(
+        sync_league=sync_league,
+        leagues=settings.sync_leagues.split(","),
+        season=season,
+        session_factory=SessionLocal,
+        live_interval_s=settings.sync_live_interval_s,
+        idle_interval_s=settings.sync_idle_interval_s,
+        match_window_s=settings.sync_match_window_s,
+        lock_ttl_s=settings.sync_lock_ttl_s,
+    )
+
+
+def _create_sync_jobs(app: FastAPI) -> SyncJobManager:
+    client = SeasonClient(http_client=app.state.http_client, season_cache=app.state.season_cache)
+    api_client = OpenLigaDBClient(http_client=app.state.http_client)
+
+    async def sync_pair(db, league: str, season: int, mode: str, force: bool):
+        result = await sync_season(db, client, api_client, league, season, mode=mode, force=force)
+        return result.as_dict()
+
+    return SyncJobManager(
+        sync_pair=sync_pair,
+        session_factory=SessionLocal,
+        concurrency=settings.bulk_sync_concurrency,
+        max_jobs=settings.bulk_sync_max_jobs,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ресурсы на время жизни процесса.
+
+    Один httpx.AsyncClient с пулом keep-alive соединений на весь backend:
+    get_client отдаёт его всем клиентам OpenLigaDB, при остановке пул закрывается.
+    Там же живут общий кэш сезонов OpenLigaDB, очередь write-behind,
+    которая сохраняет снапшоты /board в БД в фоне, и фоновая сборка /board
+    для параметров по умолчанию; от неё же питается поток LIVE-обновлений.
+    Планировщик синхронизирует сезоны в БД (одна реплика за раз, см. app.sync_scheduler),
+    массовая синхронизация и загрузка архива по запросу идут фоновыми задачами
+    (app.sync_jobs, app.backfill).
+    """
+    app.state.http_client = create_http_client()
+    app.state.season_cache = SeasonCache(
+        ttl_s=settings.season_cache_ttl_s,
+        finished_ttl_s=settings.season_cache_finished_ttl_s,
+        stale_s=settings.season_cache_stale_s,
+        max_entries=settings.season_cache_max_entries,
+        revalidate_s=settings.season_cache_revalidate_s,
+    )
+    app.state.board_writer = WriteBehindQueue(
+        persist=persist_board_snapshots,
+        max_pending=settings.board_write_behind_max_pending,
+        batch_size=settings.board_write_behind_batch_size,
+        flush_interval_s=settings.board_write_behind_flush_interval_s,
+    )
+    app.state.board_writer.start()
+    app.state.board_materializer = None
+    app.state.live_broadcaster = None
+    if settings.board_materializer_enabled:
+        app.state.board_materializer = _create_board_materializer(app)
+        # Один источник на все соединения /live/*: каждая новая доска -> diff LIVE-матчей
+        app.state.live_broadcaster = LiveBroadcaster(
+            queue_size=settings.live_stream_queue_size,
+            max_subscribers=settings.live_stream_max_subscribers,
+        )
+        app.state.board_materializer.add_listener(app.state.live_broadcaster.publish_board)
+        app.state.board_materializer.start()
+    app.state.sync_jobs = _create_sync_jobs(app)
+    # Архивные сезоны — мимо кэша сезонов, чтобы не вытеснять из него текущие
+    app.state.backfill_runner = BackfillRunner(
+        session_factory=SessionLocal,
+        client=SeasonClient(http_client=app.state.http_client),
+        rate_per_s=settings.backfill_rate_per_s,
+        batch_size=settings.backfill_batch_size,
+    )
+    app.state.sync_scheduler = None
+    if settings.sync_scheduler_enabled:
+        app.state.sync_scheduler = _create_sync_scheduler(app)
+        app.state.sync_scheduler.start()
+    try:
+        yield
+    finally:
+        # Сначала дописываем очередь в БД, потом закрываем пул HTTP
+        if app.state.sync_scheduler is not None:
+            await app.state.sync_scheduler.stop()
+        await app.state.sync_jobs.stop()
+        await app.state.backfill_runner.stop()
+        if app.state.board_materializer is not None:
+            await app.state.board_materializer.stop()
+        await app.state.board_writer.stop()
+        await app.state.http_client.aclose()
+        await dispose_async_engine()
+
+
 app = FastAPI(
     title="SportHub API",
     version="0.1.0",
     description="Простой API для отображения спортивных лиг и матчей (через OpenLigaDB).",
+    lifespan=lifespan,
 )
 
+# Сжатие gzip/brotli больших ответов. Внутри HTTPCacheMiddleware:
+# ETag считается по сжатому телу, у gzip и identity он разный.
+app.add_middleware(CompressionMiddleware)
+
+# ETag / 304 для GET-ответов. Добавляется до CORS, чтобы CORS-заголовки
+# попадали и в ответы 304.
+app.add_middleware(HTTPCacheMiddleware)
+
 # CORS — чтобы фронт из браузера мог ходить к API
 app.add_middleware(
     CORSMiddleware,
@@ -61,17 +221,19 @@ app.include_router(sports_router)
 
 @app.get("/leagues", tags=["sports-legacy"])
 async def legacy_leagues(
+    response: Response,
     client: OpenLigaDBClient = Depends(get_client),
 ):
     """
     Старый маршрут, который использует тот же обработчик, что и /api/leagues.
     Нужен для фронтенда/ingress, когда внешний /api/leagues превращается во /leagues.
     """
-    return await get_leagues_handler(client=client)
+    return await get_leagues_handler(response=response, client=client)
 
 
 @app.get("/matches", tags=["sports-legacy"])
 async def legacy_matches(
+    response: Response,
     league: str,
     date_str: str,
     client: OpenLigaDBClient = Depends(get_client),
@@ -80,6 +242,7 @@ async def legacy_matches(
     Старый маршрут, проксирующий на /api/matches.
     """
     return await get_matches_handler(
+        response=response,
         league=league,
         date_str=date_str,
         client=client,
@@ -88,6 +251,7 @@ async def legacy_matches(
 
 @app.get("/board", tags=["sports-legacy"])
 async def legacy_board(
+    response: Response,
     # Эти параметры нужны, потому что ingress rewrite превращает внешний /api/board
     # во внутренний /board. Поэтому legacy /board должен поддерживать те же query.
     leagues: str | None = None,  # "bl1,bl2"
@@ -95,34 +259,58 @@ async def legacy_board(
     days_back: int = 7,
     days_ahead: int = 7,
     client: OpenLigaDBClient = Depends(get_client),
+    writer: WriteBehindQueue | None = Depends(get_board_writer),
+    materializer: BoardMaterializer | None = Depends(get_board_materializer),
 ):
     """
     Legacy маршрут для /board.
     Нужен из-за ingress rewrite: внешний /api/board превращается во внутренний /board.
     """
     return await get_board_handler(
+        response=response,
         leagues=leagues,
         season=season,
         days_back=days_back,
         days_ahead=days_ahead,
         client=client,
+        writer=writer,
+        materializer=materializer,
     )
 
 
+@app.get("/live/stream", tags=["sports-legacy"])
+async def legacy_live_stream(
+    broadcaster: LiveBroadcaster | None = Depends(get_live_broadcaster),
+):
+    """Legacy маршрут для /api/live/stream (ingress rewrite, как и /board)."""
+    return await live_stream_handler(broadcaster=broadcaster)
+
+
+@app.websocket("/live/ws")
+async def legacy_live_ws(
+    websocket: WebSocket,
+    broadcaster: LiveBroadcaster | None = Depends(get_live_broadcaster),
+):
+    await live_ws_handler(websocket=websocket, broadcaster=broadcaster)
+
+
 # ==== Legacy-роуты для архива (/archive/*) ====
 # Аналогично /board: внешний /api/archive/* превращается во внутренний /archive/*.
 # Поэтому добавляем “внутренние” пути без /api и проксируем в те же handlers.
 
 
 @app.get("/archive/meta", tags=["archive-legacy"])
-def legacy_archive_meta(
-    db: Session = Depends(get_db),
+async def legacy_archive_meta(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return get_archive_meta_handler(db=db)
+    return await get_archive_meta_handler(request=request, response=response, db=db)
 
 
 @app.get("/archive", tags=["archive-legacy"])
-def legacy_archive(
+async def legacy_archive(
+    response: Response,
     league: str = Query(..., description="Shortcut лиги, например bl1"),
     season: int | None = Query(default=None, description="Год сезона, например 2024"),
     date_from: dt.date | None = Query(default=None, description="YYYY-MM-DD"),
@@ -130,9 +318,12 @@ def legacy_archive(
     status: str | None = Query(default=None, description="FINISHED/LIVE/SCHEDULED/UNKNOWN"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
-    db: Session = Depends(get_db),
+    cursor: str | None = Query(default=None, description="next_cursor из предыдущего ответа"),
+    include_total: bool | None = Query(default=None, description="Считать total"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return get_archive_handler(
+    return await get_archive_handler(
+        response=response,
         league=league,
         season=season,
         date_from=date_from,
@@ -140,40 +331,49 @@ def legacy_archive(
         status=status,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
         db=db,
     )
 
 
 @app.get("/archive/leagues", tags=["archive-legacy"])
 async def legacy_archive_leagues(
+    response: Response,
     client: OpenLigaDBClient = Depends(get_client),
 ):
-    return await get_archive_leagues_handler(client=client)
+    return await get_archive_leagues_handler(response=response, client=client)
 
 
 @app.get("/archive/{league}/seasons", tags=["archive-legacy"])
 async def legacy_archive_seasons(
+    response: Response,
     league: str,
     client: OpenLigaDBClient = Depends(get_client),
 ):
-    return await get_archive_seasons_handler(league=league, client=client)
+    return await get_archive_seasons_handler(response=response, league=league, client=client)
 
 
 @app.get("/archive/{league}/{season}/matches", tags=["archive-legacy"])
 async def legacy_archive_matches(
+    response: Response,
     league: str,
     season: int,
     client: OpenLigaDBClient = Depends(get_client),
 ):
-    return await get_archive_matches_handler(league=league, season=season, client=client)
+    return await get_archive_matches_handler(
+        response=response, league=league, season=season, client=client
+    )
 
 
 @app.get("/debug/openligadb/ping", tags=["debug"])
-async def debug_openligadb_ping():
+async def debug_openligadb_ping(
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+):
     """
     Проверка доступности OpenLigaDB из backend.
     """
-    client = OpenLigaDBClient()
+    client = OpenLigaDBClient(http_client=http_client)
     league = settings.default_leagues[0] if settings.default_leagues else "bl1"
     groups = await client.get_available_groups(league, settings.default_season)
     return {
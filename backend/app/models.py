@@ -8,6 +8,8 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     JSON,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import declarative_base, relationship
 
@@ -34,6 +36,11 @@ class Season(Base):
     league_id = Column(Integer, ForeignKey("league.id"), nullable=False)
     year = Column(Integer, nullable=False)
     is_current = Column(Boolean, nullable=False, default=False)
+    # Метка OpenLigaDB getlastchangedate на момент последней синхронизации
+    # (время OpenLigaDB как есть, без часового пояса; только для сравнения)
+    last_change_at = Column(DateTime(timezone=False), nullable=True)
+    # Когда сезон последний раз синхронизировался целиком (а не по турам)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
 
     league = relationship("League", back_populates="seasons")
     matches = relationship("Match", back_populates="season")
@@ -41,8 +48,13 @@ class Season(Base):
 
 class Match(Base):
     __tablename__ = "match"
+    __table_args__ = (
+        # Ключ для INSERT ... ON CONFLICT в bulk-upsert
+        UniqueConstraint("season_id", "external_match_id", name="uq_match_season_external_match_id"),
+    )
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # В SQLite автоинкремент работает только у INTEGER PRIMARY KEY
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
     external_match_id = Column(Integer, nullable=False)
     league_id = Column(Integer, ForeignKey("league.id"), nullable=False)
     season_id = Column(Integer, ForeignKey("season.id"), nullable=False)
@@ -54,5 +66,73 @@ class Match(Base):
     score_team1 = Column(Integer)
     score_team2 = Column(Integer)
     raw_payload = Column(JSON)
+    # Отпечаток нормализованных полей: upsert пропускает строки с тем же значением
+    fingerprint = Column(String(32))
 
     season = relationship("Season", back_populates="matches")
+
+
+# Индексы под запросы архива (list_archive_matches / get_archive_meta),
+# см. миграцию 5f0a3c2e91b4.
+Index("ix_season_league_id_year", Season.league_id, Season.year)
+# id последним: keyset-пагинация идёт по (kickoff_utc, id) — и в WHERE, и в ORDER BY.
+Index("ix_match_league_id_kickoff_utc", Match.league_id, Match.kickoff_utc.desc(), Match.id.desc())
+Index("ix_match_season_id_kickoff_utc", Match.season_id, Match.kickoff_utc, Match.id)
+Index("ix_match_league_id_status_kickoff_utc", Match.league_id, Match.status, Match.kickoff_utc, Match.id)
+
+
+class SyncLock(Base):
+    """
+    Общее для всех реплик состояние планировщика синхронизации (app.sync_scheduler);
+    те же аренды берёт backfill (app.backfill, строки backfill:<лига>).
+
+    holder/locked_until — кто сейчас синхронизирует (аренда с истечением),
+    next_run_at — когда следующая синхронизация: до этого момента
+    ни одна реплика в OpenLigaDB не ходит.
+    """
+
+    __tablename__ = "sync_lock"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    next_run_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class SyncJobRecord(Base):
+    """
+    Задача массовой синхронизации (app.sync_jobs) в общей для реплик БД:
+    статус по job_id отдаёт любая реплика, а не только запустившая задачу.
+    """
+
+    __tablename__ = "sync_job"
+
+    id = Column(String(32), primary_key=True)
+    # Реплика, которая выполняет задачу
+    holder = Column(String, nullable=False)
+    # queued / running / finished / failed / interrupted
+    status = Column(String, nullable=False)
+    # SyncJob.as_dict(): прогресс, результаты и ошибки по парам
+    state = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class BackfillCheckpoint(Base):
+    """Прогресс загрузки архива по сезонам (app.backfill): повторный запуск продолжает с него."""
+
+    __tablename__ = "backfill_checkpoint"
+    __table_args__ = (
+        UniqueConstraint("league_shortcut", "season_year", name="uq_backfill_checkpoint_league_season"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    league_shortcut = Column(String, nullable=False)
+    season_year = Column(Integer, nullable=False)
+    # running / done / failed
+    status = Column(String, nullable=False)
+    # Сколько матчей сезона уже записано (растёт по пачкам)
+    matches_written = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,12 +1,85 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
-from typing import Any, Dict, List, Optional
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 import httpx
 from pydantic import BaseModel
 
 from . import config as cfg
+from .json_stream import iter_json_array
+from .season_cache import SeasonCache, SeasonPayload, SeasonSnapshot
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def parse_last_change_date(raw: Any) -> Optional[dt.datetime]:
+    """
+    Разобрать ответ /getlastchangedate.
+
+    OpenLigaDB отдаёт время без часового пояса; значение используем
+    только для сравнения с другими метками OpenLigaDB, поэтому храним
+    его как есть (naive). Непонятный ответ — None.
+    """
+    if not isinstance(raw, str) or not raw:
+        return None
+    try:
+        value = dt.datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Поля матча /getmatchdata, которые читает backend (classify_match, /matches).
+# Остальное (goals, location, иконки команд и т.п.) при потоковом разборе отбрасываем.
+_MATCH_FIELDS = (
+    "matchID",
+    "leagueName",
+    "leagueShortcut",
+    "leagueSeason",
+    "matchDateTime",
+    "matchDateTimeUTC",
+    "matchIsFinished",
+    "lastUpdateDateTime",
+)
+_GROUP_FIELDS = ("groupOrderID", "groupName")
+_RESULT_FIELDS = ("resultTypeID", "pointsTeam1", "pointsTeam2")
+
+
+def slim_match(raw: Any) -> Any:
+    """Оставить от сырого матча OpenLigaDB только поля, которые использует backend."""
+    if not isinstance(raw, dict):
+        return raw
+    slim = {key: raw[key] for key in _MATCH_FIELDS if key in raw}
+    group = raw.get("group")
+    if isinstance(group, dict):
+        slim["group"] = {key: group[key] for key in _GROUP_FIELDS if key in group}
+    for team in ("team1", "team2"):
+        value = raw.get(team)
+        if isinstance(value, dict):
+            slim[team] = {"teamName": value.get("teamName")}
+    results = raw.get("matchResults")
+    if isinstance(results, list):
+        slim["matchResults"] = [
+            {key: r[key] for key in _RESULT_FIELDS if key in r} if isinstance(r, dict) else r
+            for r in results
+        ]
+    return slim
+
+
+async def read_match_list(resp: httpx.Response) -> List[Any]:
+    """
+    Список матчей из потокового ответа: разбираем по одному и сразу
+    урезаем (slim_match), не держа в памяти всё тело и полные объекты.
+    Не массив — пустой список (как и при обычном разборе).
+    """
+    return [m async for m in iter_json_array(resp.aiter_bytes(), slim_match)]
 
 
 class Match(BaseModel):
@@ -23,20 +96,127 @@ class Match(BaseModel):
     is_finished: bool
 
 
+def _build_match(m: Dict[str, Any], match_dt: dt.datetime, league: str, season: int) -> Match:
+    # финальный счёт — resultTypeID == 2 (Endergebnis), если есть
+    match_results = m.get("matchResults") or []
+    score1 = score2 = None
+    if match_results:
+        final = None
+        for r in match_results:
+            if r.get("resultTypeID") == 2:
+                final = r
+                break
+        if final is None:
+            final = match_results[-1]
+        score1 = final.get("pointsTeam1")
+        score2 = final.get("pointsTeam2")
+
+    group = m.get("group") or {}
+
+    return Match(
+        match_id=m.get("matchID"),
+        league_name=m.get("leagueName"),
+        league_shortcut=m.get("leagueShortcut") or league,
+        season=m.get("leagueSeason") or season,
+        group_name=group.get("groupName"),
+        date_time=match_dt,
+        team1=(m.get("team1") or {}).get("teamName"),
+        team2=(m.get("team2") or {}).get("teamName"),
+        score1=score1,
+        score2=score2,
+        is_finished=bool(m.get("matchIsFinished")),
+    )
+
+
+class MatchDateIndex:
+    """
+    Матчи сезона по календарной дате matchDateTime — для /matches.
+
+    Даты разбираются одним проходом при создании; модели Match строятся
+    при первом запросе даты и дальше переиспользуются. Индекс живёт
+    в SeasonSnapshot.derived, т.е. пересобирается только с новой версией
+    payload'а. Результат общий для всех запросов — не мутировать модели.
+    """
+
+    def __init__(self, raw: List[Dict[str, Any]], league: str, season: int) -> None:
+        self._league = league
+        self._season = season
+        self._raw_by_date: Dict[dt.date, List[Any]] = {}
+        self._matches: Dict[dt.date, List[Match]] = {}
+
+        for m in raw:
+            dt_str = m.get("matchDateTime") or m.get("matchDateTimeUTC")
+            if not dt_str:
+                continue
+            try:
+                match_dt = dt.datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
+            except Exception:
+                continue
+            self._raw_by_date.setdefault(match_dt.date(), []).append((match_dt, m))
+
+    def get(self, date: dt.date) -> List[Match]:
+        matches = self._matches.get(date)
+        if matches is None:
+            # Битый матч (ValidationError) ломает только свою дату, как и раньше
+            matches = [
+                _build_match(m, match_dt, self._league, self._season)
+                for match_dt, m in self._raw_by_date.get(date, ())
+            ]
+            matches.sort(key=lambda x: x.date_time)
+            self._matches[date] = matches
+        return list(matches)
+
+
 class OpenLigaDBClient:
     """Клиент для публичного JSON-API OpenLigaDB."""
 
-    def __init__(self, base_url: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        season_cache: Optional[SeasonCache] = None,
+    ) -> None:
         # По умолчанию берём URL из config.SPORTS_API_BASE_URL
         self.base_url = (base_url or cfg.SPORTS_API_BASE_URL).rstrip("/")
+        # Общий пул соединений (создаётся в lifespan приложения).
+        # Если не передан — открываем клиент на каждый запрос, как раньше.
+        self._http = http_client
+        # Общий кэш сезонов; без него каждый вызов идёт в OpenLigaDB
+        self._season_cache = season_cache
 
-    async def _get(self, path: str) -> Any:
-        """Внутренний метод для GET-запросов."""
+    async def _request(self, path: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
         url = f"{self.base_url}{path}"
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
-            resp = await client.get(url)
+        if self._http is not None:
+            resp = await self._http.get(url, headers=headers)
+        else:
+            async with httpx.AsyncClient(timeout=15.0, follow_redirects=True) as client:
+                resp = await client.get(url, headers=headers)
+        # 304 — не ошибка: его разбирает вызывающий код
+        if resp.status_code != 304:
             resp.raise_for_status()
-            return resp.json()
+        return resp
+
+    @asynccontextmanager
+    async def _stream(
+        self, path: str, headers: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[httpx.Response]:
+        """Как _request, но тело не читается заранее (resp.aiter_bytes())."""
+        url = f"{self.base_url}{path}"
+        async with AsyncExitStack() as stack:
+            http = self._http
+            if http is None:
+                http = await stack.enter_async_context(
+                    httpx.AsyncClient(timeout=15.0, follow_redirects=True)
+                )
+            resp = await stack.enter_async_context(http.stream("GET", url, headers=headers))
+            if resp.status_code != 304:
+                resp.raise_for_status()
+            yield resp
+
+    async def _get(self, path: str) -> Any:
+        """Внутренний метод для GET-запросов."""
+        resp = await self._request(path)
+        return resp.json()
 
     async def get_leagues(self, shortcuts: List[str]) -> List[Dict[str, Any]]:
         """
@@ -64,16 +244,198 @@ class OpenLigaDBClient:
         result.sort(key=lambda x: shortcuts_lower.index(x["id"]))
         return result
 
+    async def get_current_group_order_id(self, league: str) -> Optional[int]:
+        """groupOrderID текущего тура лиги (/getcurrentgroup)."""
+        raw = await self._get(f"/getcurrentgroup/{league}")
+        if not isinstance(raw, dict) or raw.get("groupOrderID") is None:
+            return None
+        return int(raw["groupOrderID"])
+
+    async def get_last_change_date(
+        self, league: str, season: int, group_order_id: int
+    ) -> Optional[dt.datetime]:
+        """
+        Время последнего изменения тура в OpenLigaDB (/getlastchangedate).
+
+        См. parse_last_change_date.
+        """
+        raw = await self._get(f"/getlastchangedate/{league}/{season}/{group_order_id}")
+        return parse_last_change_date(raw)
+
+    async def get_season_last_change(self, league: str, season: int) -> Optional[dt.datetime]:
+        """
+        Дешёвая метка изменений сезона: lastchangedate текущего тура.
+
+        Два маленьких запроса вместо скачивания всего сезона. Метка покрывает
+        только текущий тур: результаты обновляются в нём, но перенос матча
+        другого тура её не меняет. Поэтому совпавшая метка лишь откладывает
+        полную проверку сезона — не дольше SEASON_CACHE_REVALIDATE_S
+        (см. _load_season), а полная синхронизация её не использует.
+        Ошибки не пробрасываем: None означает «не знаем, качаем сезон целиком».
+        """
+        try:
+            group_order_id = await self.get_current_group_order_id(league)
+            if group_order_id is None:
+                return None
+            return await self.get_last_change_date(league, season, group_order_id)
+        except Exception as exc:
+            logger.warning(
+                "Не удалось получить lastchangedate (league=%s, season=%s): %s",
+                league,
+                season,
+                exc,
+            )
+            return None
+
+    async def _fetch_season_payload(
+        self,
+        league: str,
+        season: int,
+        previous: Optional[SeasonSnapshot] = None,
+    ) -> SeasonPayload:
+        """
+        Скачать матчи сезона; с previous — условным запросом.
+
+        Если OpenLigaDB ответил 304, возвращаем raw предыдущего снапшота.
+        С OPENLIGADB_STREAM_PARSE тело разбирается потоково, от матчей
+        остаются только нужные поля (slim_match).
+        """
+        headers: Dict[str, str] = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+
+        path = f"/getmatchdata/{league}/{season}"
+        if settings.openligadb_stream_parse:
+            async with self._stream(path, headers=headers or None) as resp:
+                if resp.status_code == 304 and previous is not None:
+                    return self._not_modified(resp, previous)
+                raw = await read_match_list(resp)
+        else:
+            resp = await self._request(path, headers=headers or None)
+            if resp.status_code == 304 and previous is not None:
+                return self._not_modified(resp, previous)
+            raw = resp.json()
+
+        return SeasonPayload(
+            raw=raw if isinstance(raw, list) else [],
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+
+    @staticmethod
+    def _not_modified(resp: httpx.Response, previous: SeasonSnapshot) -> SeasonPayload:
+        return SeasonPayload(
+            raw=previous.raw,
+            etag=resp.headers.get("ETag") or previous.etag,
+            last_modified=resp.headers.get("Last-Modified") or previous.last_modified,
+        )
+
+    async def _load_season(
+        self,
+        league: str,
+        season: int,
+        last_change: Optional[dt.datetime] = None,
+        revalidate: bool = False,
+    ) -> SeasonPayload:
+        """
+        Загрузчик для SeasonCache.
+
+        Сначала сверяем lastchangedate с меткой текущего снапшота:
+        совпала — сезон не качаем. Иначе — условный GET всего сезона.
+
+        Метка видит только текущий тур, поэтому без условного GET
+        обходимся не дольше revalidate_s кэша; revalidate=True —
+        условный GET в любом случае.
+        """
+        previous = self._season_cache.peek(league, season) if self._season_cache else None
+        if previous is not None and not revalidate:
+            revalidate = self._season_cache.revalidation_due(previous)
+
+        if last_change is None:
+            if previous is not None:
+                last_change = await self.get_season_last_change(league, season)
+            else:
+                # Первая загрузка: метку берём параллельно с самим сезоном
+                last_change, payload = await asyncio.gather(
+                    self.get_season_last_change(league, season),
+                    self._fetch_season_payload(league, season),
+                )
+                payload.last_change = last_change
+                return payload
+
+        if (
+            previous is not None
+            and not revalidate
+            and last_change is not None
+            and previous.last_change == last_change
+        ):
+            return SeasonPayload(
+                raw=previous.raw,
+                etag=previous.etag,
+                last_modified=previous.last_modified,
+                last_change=last_change,
+                revalidated=False,
+            )
+
+        payload = await self._fetch_season_payload(league, season, previous)
+        payload.last_change = last_change
+        return payload
+
+    async def get_season_snapshot(
+        self,
+        league: str,
+        season: int,
+        last_change: Optional[dt.datetime] = None,
+        revalidate: bool = False,
+    ) -> SeasonSnapshot:
+        """
+        Сырые матчи сезона вместе с версией payload'а.
+
+        С кэшем — через SeasonCache (TTL, stale-while-revalidate, single-flight),
+        без кэша — прямой запрос в OpenLigaDB.
+
+        last_change — уже известная свежая метка getlastchangedate:
+        если снапшот в кэше получен с другой меткой, он перезагружается
+        сразу, не дожидаясь TTL.
+
+        revalidate=True — мимо TTL и проверки по lastchangedate: снапшот
+        перезагружается условным GET /getmatchdata (полная синхронизация).
+        """
+        if self._season_cache is None:
+            payload = await self._fetch_season_payload(league, season)
+            return SeasonSnapshot(
+                league=league.lower(),
+                season=int(season),
+                raw=payload.raw,
+                etag=payload.etag,
+                last_modified=payload.last_modified,
+                last_change=last_change,
+            )
+
+        cached = self._season_cache.peek(league, season)
+        if cached is not None and (
+            revalidate or (last_change is not None and cached.last_change != last_change)
+        ):
+            self._season_cache.expire(league, season)
+
+        return await self._season_cache.get(
+            league,
+            season,
+            lambda: self._load_season(league, season, last_change, revalidate),
+        )
+
     async def get_season_raw(self, league: str, season: int) -> List[Dict[str, Any]]:
         """
         Получить СЫРЫЕ матчи сезона для лиги без фильтрации по дате.
 
         Используется для /board и архивных эндпоинтов.
+        Результат общий для всех запросов — не мутировать.
         """
-        raw = await self._get(f"/getmatchdata/{league}/{season}")
-        if not isinstance(raw, list):
-            return []
-        return raw
+        snapshot = await self.get_season_snapshot(league, season)
+        return snapshot.raw
 
     async def get_matches_for_date(
         self,
@@ -84,7 +446,8 @@ class OpenLigaDBClient:
         """
         Вернуть матчи указанной лиги на конкретную дату.
 
-        Упрощённо: берём все матчи сезона и фильтруем по дате matchDateTime.
+        Матчи сезона раскладываются по дате matchDateTime один раз
+        на версию снапшота (MatchDateIndex), дальше — поиск по словарю.
         """
         league = league.lower()
 
@@ -92,55 +455,8 @@ class OpenLigaDBClient:
         if season is None:
             season = date.year if date.month >= 7 else date.year - 1
 
-        # Берём все матчи сезона и фильтруем по дате
-        raw = await self.get_season_raw(league, season)
-
-        matches: List[Match] = []
-
-        for m in raw:
-            dt_str = m.get("matchDateTime") or m.get("matchDateTimeUTC")
-            if not dt_str:
-                continue
-
-            try:
-                match_dt = dt.datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-            except Exception:
-                continue
-
-            if match_dt.date() != date:
-                continue
-
-            # финальный счёт — resultTypeID == 2 (Endergebnis), если есть
-            match_results = m.get("matchResults") or []
-            score1 = score2 = None
-            if match_results:
-                final = None
-                for r in match_results:
-                    if r.get("resultTypeID") == 2:
-                        final = r
-                        break
-                if final is None:
-                    final = match_results[-1]
-                score1 = final.get("pointsTeam1")
-                score2 = final.get("pointsTeam2")
-
-            group = m.get("group") or {}
-
-            matches.append(
-                Match(
-                    match_id=m.get("matchID"),
-                    league_name=m.get("leagueName"),
-                    league_shortcut=m.get("leagueShortcut") or league,
-                    season=m.get("leagueSeason") or season,
-                    group_name=group.get("groupName"),
-                    date_time=match_dt,
-                    team1=(m.get("team1") or {}).get("teamName"),
-                    team2=(m.get("team2") or {}).get("teamName"),
-                    score1=score1,
-                    score2=score2,
-                    is_finished=bool(m.get("matchIsFinished")),
-                )
-            )
-
-        matches.sort(key=lambda x: x.date_time)
-        return matches
+        snapshot = await self.get_season_snapshot(league, season)
+        index = snapshot.derived.get("matches_by_date")
+        if index is None:
+            index = snapshot.derived["matches_by_date"] = MatchDateIndex(snapshot.raw, league, season)
+        return index.get(date)
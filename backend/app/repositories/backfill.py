@@ -0,0 +1,73 @@
+# app/repositories/backfill.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import BackfillCheckpoint
+
+
+def list_backfill_checkpoints(
+    db: Session,
+    league_shortcut: str,
+    season_from: Optional[int] = None,
+    season_to: Optional[int] = None,
+) -> list[BackfillCheckpoint]:
+    """Чекпоинты лиги (по возрастанию сезона), при желании — только в диапазоне сезонов."""
+    stmt = select(BackfillCheckpoint).where(BackfillCheckpoint.league_shortcut == league_shortcut)
+    if season_from is not None:
+        stmt = stmt.where(BackfillCheckpoint.season_year >= season_from)
+    if season_to is not None:
+        stmt = stmt.where(BackfillCheckpoint.season_year <= season_to)
+    return list(db.execute(stmt.order_by(BackfillCheckpoint.season_year)).scalars())
+
+
+def save_backfill_checkpoint(
+    db: Session,
+    league_shortcut: str,
+    season_year: int,
+    now: datetime,
+    new_attempt: bool = False,
+    **values: Any,
+) -> BackfillCheckpoint:
+    """
+    Создать или обновить чекпоинт сезона и сразу закоммитить (прогресс не должен теряться).
+    new_attempt — начинается очередная попытка загрузить сезон (attempts + 1).
+    """
+    checkpoint = db.execute(
+        select(BackfillCheckpoint).where(
+            BackfillCheckpoint.league_shortcut == league_shortcut,
+            BackfillCheckpoint.season_year == season_year,
+        )
+    ).scalar_one_or_none()
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(
+            league_shortcut=league_shortcut,
+            season_year=season_year,
+            status="running",
+            matches_written=0,
+            attempts=0,
+        )
+        db.add(checkpoint)
+    if new_attempt:
+        checkpoint.attempts += 1
+    for name, value in values.items():
+        setattr(checkpoint, name, value)
+    checkpoint.updated_at = now
+    db.commit()
+    return checkpoint
+
+
+def checkpoint_as_dict(checkpoint: BackfillCheckpoint) -> dict[str, Any]:
+    return {
+        "league": checkpoint.league_shortcut,
+        "season": checkpoint.season_year,
+        "status": checkpoint.status,
+        "matches_written": checkpoint.matches_written,
+        "attempts": checkpoint.attempts,
+        "error": checkpoint.error,
+        "updated_at": checkpoint.updated_at.isoformat() if checkpoint.updated_at else None,
+    }
@@ -3,12 +3,41 @@ from __future__ import annotations
 import datetime as dt
 from app.schemas.match import MatchSummary, MatchStatus
 from datetime import datetime
+import base64
+import binascii
+import hashlib
+import threading
+from dataclasses import asdict, dataclass
 from typing import Iterable, Mapping, Any, Optional
 from app.schemas.match import ArchiveLeagueInfo
 
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import League, Season, Match
+from app.models import BackfillCheckpoint, League, Season, Match
+
+
+@dataclass
+class _ArchiveMetaCache:
+    items: Optional[list[ArchiveLeagueInfo]] = None
+    # Версия метаданных в БД (archive_meta_stamp), с которой прочитаны items:
+    # лигу/сезон могла добавить и другая реплика, поэтому сверяемся с БД,
+    # а не с коммитами этого процесса.
+    stamp: Optional[tuple[int, ...]] = None
+
+
+_archive_meta_cache = _ArchiveMetaCache()
+_archive_meta_lock = threading.Lock()
+
+
+def invalidate_archive_meta_cache() -> None:
+    """Сбросить кэш get_archive_meta (следующий вызов перечитает БД)."""
+    with _archive_meta_lock:
+        _archive_meta_cache.items = None
+        _archive_meta_cache.stamp = None
 
 
 def get_or_create_league(
@@ -179,6 +208,86 @@ def _extract_team_name(match_data: Mapping[str, Any], key: str) -> str:
     return "Unknown"
 
 
+# Сколько матчей отправляем в одном INSERT ... ON CONFLICT
+UPSERT_CHUNK_SIZE = 500
+
+# Колонки, которые обновляются при конфликте по (season_id, external_match_id)
+_UPSERT_UPDATE_COLUMNS = (
+    "group_order_id",
+    "kickoff_utc",
+    "status",
+    "team1_name",
+    "team2_name",
+    "score_team1",
+    "score_team2",
+    "raw_payload",
+    "fingerprint",
+)
+# Нормализованные поля, из которых считается отпечаток матча (match.fingerprint).
+# raw_payload в отпечаток не входит: он производный от этих же полей.
+_FINGERPRINT_COLUMNS = (
+    "group_order_id",
+    "kickoff_utc",
+    "status",
+    "team1_name",
+    "team2_name",
+    "score_team1",
+    "score_team2",
+)
+
+
+def _match_fingerprint(values: Mapping[str, Any]) -> str:
+    """
+    Отпечаток содержимого матча: по нему upsert понимает,
+    что строку можно не трогать (ни UPDATE, ни перезапись raw_payload).
+    """
+    parts = []
+    for col in _FINGERPRINT_COLUMNS:
+        value = values.get(col)
+        if isinstance(value, datetime):
+            # Один и тот же момент времени должен давать один отпечаток
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=dt.timezone.utc)
+            value = value.astimezone(dt.timezone.utc).isoformat()
+        parts.append("" if value is None else str(value))
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _match_values_from_payload(
+    league: League,
+    season: Season,
+    match_data: Mapping[str, Any],
+) -> Optional[dict[str, Any]]:
+    """
+    Нормализовать payload матча в значения колонок таблицы match.
+
+    None — если не удалось распарсить дату матча: такой матч пропускаем,
+    чтобы не уронить весь sync-season на одном кривом payload.
+    """
+    external_id = _extract_external_id(match_data)
+
+    kickoff_dt = _extract_kickoff_utc(match_data)
+    if kickoff_dt is None:
+        return None
+
+    values = {
+        "external_match_id": external_id,
+        "league_id": league.id,
+        "season_id": season.id,
+        "group_order_id": _extract_group_order_id(match_data),
+        "kickoff_utc": kickoff_dt,
+        "status": str(match_data.get("status", "UNKNOWN")),
+        "team1_name": _extract_team_name(match_data, "team1_name"),
+        "team2_name": _extract_team_name(match_data, "team2_name"),
+        "score_team1": match_data.get("score_team1"),
+        "score_team2": match_data.get("score_team2"),
+        # raw_payload должен быть JSON-сериализуемым — сюда кладём dict
+        "raw_payload": dict(match_data),
+    }
+    values["fingerprint"] = _match_fingerprint(values)
+    return values
+
+
 def upsert_match_from_payload(
     db: Session,
     league: League,
@@ -186,79 +295,142 @@ def upsert_match_from_payload(
     match_data: Mapping[str, Any],
 ) -> Optional[Match]:
     """
-    Универсальный upsert матча в БД.
+    Универсальный upsert одного матча в БД (через ORM).
 
     match_data может быть:
     - dict, полученный из MatchSummary.model_dump(mode="json");
     - или любой другой dict с ожидаемыми полями.
+
+    Для пачек матчей используйте bulk_upsert_matches_from_board.
     """
-    external_id = _extract_external_id(match_data)
+    values = _match_values_from_payload(league, season, match_data)
+    if values is None:
+        return None
 
     match: Optional[Match] = (
         db.query(Match)
         .filter(
-            Match.external_match_id == external_id,
+            Match.external_match_id == values["external_match_id"],
             Match.season_id == season.id,
         )
         .first()
     )
 
-    kickoff_dt = _extract_kickoff_utc(match_data)
-    # Если не смогли распарсить дату — просто пропускаем матч,
-    # чтобы не уронить весь sync-season на одном кривом payload.
-    if kickoff_dt is None:
-        return None
-
-    group_order_id = _extract_group_order_id(match_data)
-
-    status = str(match_data.get("status", "UNKNOWN"))
-    team1_name = _extract_team_name(match_data, "team1_name")
-    team2_name = _extract_team_name(match_data, "team2_name")
-
-    score_team1 = match_data.get("score_team1")
-    score_team2 = match_data.get("score_team2")
-
     if match is None:
         # Новый матч
-        match = Match(
-            external_match_id=external_id,
-            league_id=league.id,
-            season_id=season.id,
-            group_order_id=group_order_id,
-            kickoff_utc=kickoff_dt,
-            status=status,
-            team1_name=team1_name,
-            team2_name=team2_name,
-            score_team1=score_team1,
-            score_team2=score_team2,
-            # raw_payload должен быть JSON-сериализуемым — сюда кладём dict
-            raw_payload=dict(match_data),
-        )
+        match = Match(**values)
         db.add(match)
     else:
         # Обновление существующего матча
-        match.group_order_id = group_order_id
-        match.kickoff_utc = kickoff_dt
-        match.status = status
-        match.team1_name = team1_name
-        match.team2_name = team2_name
-        match.score_team1 = score_team1
-        match.score_team2 = score_team2
-        match.raw_payload = dict(match_data)
+        for column in _UPSERT_UPDATE_COLUMNS:
+            setattr(match, column, values[column])
 
     return match
 
 
+@dataclass
+class UpsertCounts:
+    """Итог bulk-upsert: сколько матчей вставлено, обновлено, не изменилось, пропущено."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+
+    def __iadd__(self, other: "UpsertCounts") -> "UpsertCounts":
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.skipped += other.skipped
+        return self
+
+    @property
+    def changed(self) -> int:
+        """Сколько строк реально записано (вставлено или обновлено)."""
+        return self.inserted + self.updated
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def _dialect_insert(db: Session):
+    """insert() с поддержкой ON CONFLICT для текущего диалекта (Postgres или SQLite для тестов)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return pg_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    raise NotImplementedError(f"Bulk upsert is not supported for dialect {dialect!r}")
+
+
+def _upsert_chunk(db: Session, season_id: int, rows: list[dict[str, Any]]) -> UpsertCounts:
+    """
+    Один чанк матчей: SELECT отпечатков существующих строк, затем один
+    INSERT ... ON CONFLICT DO UPDATE только для новых и изменившихся матчей.
+
+    Неизменившиеся матчи в INSERT вообще не попадают, поэтому не пишут
+    ни WAL, ни новые версии строк. WHERE по fingerprint в ON CONFLICT
+    страхует от гонки с параллельным sync.
+    """
+    table = Match.__table__
+    ids = [r["external_match_id"] for r in rows]
+
+    existing = dict(
+        db.execute(
+            select(table.c.external_match_id, table.c.fingerprint).where(
+                table.c.season_id == season_id,
+                table.c.external_match_id.in_(ids),
+            )
+        ).all()
+    )
+
+    to_write = [
+        r
+        for r in rows
+        if r["external_match_id"] not in existing
+        or existing[r["external_match_id"]] != r["fingerprint"]
+    ]
+    counts = UpsertCounts(unchanged=len(rows) - len(to_write))
+    if not to_write:
+        return counts
+
+    stmt = _dialect_insert(db)(table).values(to_write)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.season_id, table.c.external_match_id],
+        set_={col: stmt.excluded[col] for col in _UPSERT_UPDATE_COLUMNS},
+        where=table.c.fingerprint.is_distinct_from(stmt.excluded.fingerprint),
+    ).returning(table.c.external_match_id)
+
+    # RETURNING отдаёт только вставленные и реально обновлённые строки
+    touched = set(db.execute(stmt).scalars())
+
+    counts.inserted = len(touched - existing.keys())
+    counts.updated = len(touched & existing.keys())
+    counts.unchanged += len(to_write) - len(touched)
+    return counts
+
+
 def bulk_upsert_matches_from_board(
     db: Session,
     league_shortcut: str,
     league_name: str,
     season_year: int,
     matches: Iterable[Mapping[str, Any]],
-) -> None:
+    chunk_size: int = UPSERT_CHUNK_SIZE,
+    last_change_at: Optional[datetime] = None,
+    full_sync_at: Optional[datetime] = None,
+) -> UpsertCounts:
     """
     Универсальная точка входа: на вход список матчей (dict, совместимый
     с MatchSummary.model_dump(mode='json')), на выходе — данные в БД.
+
+    Матчи пишутся пачками по chunk_size: на чанк два запроса вместо
+    SELECT + INSERT/UPDATE на каждый матч. Строки, у которых не изменился
+    fingerprint, не трогаем.
+
+    last_change_at — метка getlastchangedate, с которой получены матчи;
+    full_sync_at — время полной синхронизации сезона (для частичной — None).
+    Обе сохраняются в season в той же транзакции.
     """
     league = get_or_create_league(
         db=db,
@@ -272,45 +444,110 @@ def bulk_upsert_matches_from_board(
         is_current=True,
     )
 
+    counts = UpsertCounts()
+
+    # Дедуп по external id: ON CONFLICT не умеет дважды обновить
+    # одну и ту же строку в рамках одного INSERT (последний payload выигрывает).
+    rows: dict[int, dict[str, Any]] = {}
     for m in matches:
-        upsert_match_from_payload(db, league, season, m)
+        values = _match_values_from_payload(league, season, m)
+        if values is None:
+            counts.skipped += 1
+            continue
+        rows[values["external_match_id"]] = values
+
+    pending = list(rows.values())
+    for i in range(0, len(pending), chunk_size):
+        counts += _upsert_chunk(db, season.id, pending[i : i + chunk_size])
+
+    if last_change_at is not None:
+        season.last_change_at = last_change_at
+    if full_sync_at is not None:
+        season.last_full_sync_at = full_sync_at
 
     db.commit()
-def list_archive_matches(
+    return counts
+
+
+@dataclass
+class SeasonSyncState:
+    """Метки последней синхронизации сезона."""
+
+    last_change_at: Optional[datetime]
+    last_full_sync_at: Optional[datetime]
+
+
+def get_season_sync_state(
     db: Session,
     league_shortcut: str,
+    season_year: int,
+) -> Optional[SeasonSyncState]:
+    """Метки синхронизации сезона (None — сезона в БД ещё нет)."""
+    stmt = (
+        select(Season.last_change_at, Season.last_full_sync_at)
+        .join(League, League.id == Season.league_id)
+        .where(League.shortcut == league_shortcut, Season.year == season_year)
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        return None
+    return SeasonSyncState(last_change_at=row.last_change_at, last_full_sync_at=row.last_full_sync_at)
+
+
+def get_kickoffs_between(
+    db: Session,
+    league_shortcuts: Iterable[str],
+    season_year: int,
+    since: datetime,
+    until: datetime,
+) -> list[datetime]:
+    """Времена начала матчей лиг сезона в промежутке [since, until] (для планировщика)."""
+    stmt = (
+        select(Match.kickoff_utc)
+        .join(Season, Season.id == Match.season_id)
+        .join(League, League.id == Match.league_id)
+        .where(
+            League.shortcut.in_([lg.lower() for lg in league_shortcuts]),
+            Season.year == season_year,
+            Match.kickoff_utc >= since,
+            Match.kickoff_utc <= until,
+        )
+        .order_by(Match.kickoff_utc)
+    )
+    return [
+        k if k.tzinfo is not None else k.replace(tzinfo=dt.timezone.utc)
+        for k in db.execute(stmt).scalars()
+    ]
+
+
+def archive_matches_query(
+    league_id: int,
     season_year: Optional[int],
     date_from: Optional[dt.date],
     date_to: Optional[dt.date],
     status: Optional[str],
-    page: int,
-    page_size: int,
-) -> tuple[int, list[MatchSummary]]:
-    """
-    Чтение архива матчей из БД.
-    - league_shortcut: например 'bl1'
-    - season_year: например 2024 (можно None)
-    - date_from/date_to: фильтр по kickoff_utc (UTC), можно None
-    - status: строка ('FINISHED'/'LIVE'/'SCHEDULED'/'UNKNOWN'), можно None
-    - page: 1..N
-    - page_size: 1..200
+) -> Select:
     """
-    league = db.query(League).filter(League.shortcut == league_shortcut).first()
-    if league is None:
-        return 0, []
+    SELECT (Match, Season) под фильтры архива, без сортировки и пагинации.
 
-    q = (
-        db.query(Match, Season)
+    Условия подобраны под индексы из миграции 5f0a3c2e91b4:
+    (league_id, kickoff_utc DESC), (league_id, status, kickoff_utc),
+    (season_id, kickoff_utc) и season (league_id, year).
+    """
+    stmt = (
+        select(Match, Season)
         .join(Season, Season.id == Match.season_id)
-        .filter(Match.league_id == league.id)
+        .where(Match.league_id == league_id)
     )
 
     if season_year is not None:
-        q = q.filter(Season.year == int(season_year))
+        # league_id по сезону дублирует условие по матчу,
+        # но даёт планировщику пройти по индексу season (league_id, year)
+        stmt = stmt.where(Season.league_id == league_id, Season.year == int(season_year))
 
     if date_from is not None:
         start_dt = dt.datetime.combine(date_from, dt.time.min, tzinfo=dt.timezone.utc)
-        q = q.filter(Match.kickoff_utc >= start_dt)
+        stmt = stmt.where(Match.kickoff_utc >= start_dt)
 
     if date_to is not None:
         end_exclusive = dt.datetime.combine(
@@ -318,20 +555,61 @@ def list_archive_matches(
             dt.time.min,
             tzinfo=dt.timezone.utc,
         )
-        q = q.filter(Match.kickoff_utc < end_exclusive)
+        stmt = stmt.where(Match.kickoff_utc < end_exclusive)
 
     if status is not None:
-        q = q.filter(Match.status == status)
+        stmt = stmt.where(Match.status == status)
 
-    total = q.count()
+    return stmt
+
+
+def encode_archive_cursor(kickoff_utc: datetime, match_pk: int) -> str:
+    """Непрозрачный курсор архива: позиция (kickoff_utc, match.id) последней строки страницы."""
+    raw = f"{kickoff_utc.isoformat()}|{match_pk}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_archive_cursor(cursor: str) -> tuple[datetime, int]:
+    """Разобрать курсор архива. ValueError — если курсор битый."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        kickoff_s, pk_s = base64.urlsafe_b64decode(padded).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(kickoff_s), int(pk_s)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError(f"Invalid archive cursor: {cursor!r}") from exc
 
-    offset = (page - 1) * page_size
-    rows = (
-        q.order_by(Match.kickoff_utc.desc())
-        .limit(page_size)
-        .offset(offset)
-        .all()
-    )
+
+def _archive_league_stmt(league_shortcut: str) -> Select:
+    return select(League).where(League.shortcut == league_shortcut)
+
+
+def _archive_count_stmt(stmt: Select) -> Select:
+    return select(func.count()).select_from(stmt.subquery())
+
+
+def _archive_page_stmt(
+    stmt: Select,
+    after: Optional[tuple[datetime, int]],
+    page: int,
+    page_size: int,
+) -> Select:
+    # id — тай-брейкер для матчей с одинаковым временем начала
+    page_stmt = stmt.order_by(Match.kickoff_utc.desc(), Match.id.desc())
+    if after is not None:
+        page_stmt = page_stmt.where(tuple_(Match.kickoff_utc, Match.id) < tuple_(*after))
+    else:
+        page_stmt = page_stmt.offset((page - 1) * page_size)
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    return page_stmt.limit(page_size + 1)
+
+
+def _archive_page_from_rows(
+    rows: list[Any],
+    league_shortcut: str,
+    page_size: int,
+) -> tuple[list[MatchSummary], Optional[str]]:
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
 
     items: list[MatchSummary] = []
     for m, s in rows:
@@ -343,7 +621,7 @@ def list_archive_matches(
         items.append(
             MatchSummary(
                 id=m.external_match_id,              # важно: наружу отдаём external id
-                league_shortcut=league.shortcut,
+                league_shortcut=league_shortcut,
                 league_season=s.year,
                 group_order_id=m.group_order_id,
                 team1_name=m.team1_name,
@@ -355,35 +633,226 @@ def list_archive_matches(
             )
         )
 
-    return total, items
+    next_cursor = None
+    if has_more and rows:
+        last_match = rows[-1][0]
+        next_cursor = encode_archive_cursor(last_match.kickoff_utc, last_match.id)
+
+    return items, next_cursor
+
+
+def list_archive_matches(
+    db: Session,
+    league_shortcut: str,
+    season_year: Optional[int],
+    date_from: Optional[dt.date],
+    date_to: Optional[dt.date],
+    status: Optional[str],
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[Optional[int], list[MatchSummary], Optional[str]]:
+    """
+    Чтение архива матчей из БД.
+    - league_shortcut: например 'bl1'
+    - season_year: например 2024 (можно None)
+    - date_from/date_to: фильтр по kickoff_utc (UTC), можно None
+    - status: строка ('FINISHED'/'LIVE'/'SCHEDULED'/'UNKNOWN'), можно None
+    - page: 1..N (игнорируется, если передан cursor)
+    - page_size: 1..200
+    - cursor: next_cursor предыдущей страницы — keyset-пагинация по
+      (kickoff_utc, id) вместо OFFSET, глубина страницы не влияет на скорость
+    - include_total: считать ли total (COUNT по всей выборке); иначе total=None
+
+    Возвращает (total, items, next_cursor); next_cursor=None — страниц больше нет.
+    ValueError — если cursor битый.
+    """
+    after = decode_archive_cursor(cursor) if cursor else None
+
+    league = db.execute(_archive_league_stmt(league_shortcut)).scalars().first()
+    if league is None:
+        return (0 if include_total else None), [], None
+
+    stmt = archive_matches_query(
+        league_id=league.id,
+        season_year=season_year,
+        date_from=date_from,
+        date_to=date_to,
+        status=status,
+    )
+
+    total: Optional[int] = None
+    if include_total:
+        total = db.scalar(_archive_count_stmt(stmt)) or 0
+
+    rows = db.execute(_archive_page_stmt(stmt, after, page, page_size)).all()
+    items, next_cursor = _archive_page_from_rows(rows, league.shortcut, page_size)
+    return total, items, next_cursor
+
+
+async def list_archive_matches_async(
+    db: AsyncSession,
+    league_shortcut: str,
+    season_year: Optional[int],
+    date_from: Optional[dt.date],
+    date_to: Optional[dt.date],
+    status: Optional[str],
+    page: int,
+    page_size: int,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> tuple[Optional[int], list[MatchSummary], Optional[str]]:
+    """Асинхронная версия list_archive_matches (те же параметры и результат)."""
+    after = decode_archive_cursor(cursor) if cursor else None
+
+    league = (await db.execute(_archive_league_stmt(league_shortcut))).scalars().first()
+    if league is None:
+        return (0 if include_total else None), [], None
+
+    stmt = archive_matches_query(
+        league_id=league.id,
+        season_year=season_year,
+        date_from=date_from,
+        date_to=date_to,
+        status=status,
+    )
+
+    total: Optional[int] = None
+    if include_total:
+        total = await db.scalar(_archive_count_stmt(stmt)) or 0
+
+    rows = (await db.execute(_archive_page_stmt(stmt, after, page, page_size))).all()
+    items, next_cursor = _archive_page_from_rows(rows, league.shortcut, page_size)
+    return total, items, next_cursor
+
+
+async def season_archive_complete_async(
+    db: AsyncSession, league_shortcut: str, season_year: int
+) -> bool:
+    """
+    Сезон в БД полный и больше не изменится: загружен целиком (полная
+    синхронизация или завершённый backfill) и все его матчи FINISHED.
+    """
+    matches = select(func.count(Match.id)).where(Match.season_id == Season.id)
+    stmt = (
+        select(
+            Season.last_full_sync_at,
+            matches.scalar_subquery(),
+            matches.where(Match.status != MatchStatus.FINISHED.value).scalar_subquery(),
+            select(BackfillCheckpoint.status)
+            .where(
+                BackfillCheckpoint.league_shortcut == league_shortcut,
+                BackfillCheckpoint.season_year == season_year,
+            )
+            .scalar_subquery(),
+        )
+        .join(League, League.id == Season.league_id)
+        .where(League.shortcut == league_shortcut, Season.year == season_year)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        return False
+    full_sync_at, total, unfinished, backfill_status = row
+    loaded = full_sync_at is not None or backfill_status == "done"
+    return loaded and total > 0 and unfinished == 0
+
+
+def _archive_meta_stamp_stmt() -> Select:
+    # Лиги и сезоны только добавляются: количество и максимальный id
+    # меняются вместе с метаданными архива
+    return select(
+        select(func.count(League.id)).scalar_subquery(),
+        select(func.max(League.id)).scalar_subquery(),
+        select(func.count(Season.id)).scalar_subquery(),
+        select(func.max(Season.id)).scalar_subquery(),
+    )
+
+
+def archive_meta_stamp(db: Session) -> tuple[int, ...]:
+    """
+    Версия метаданных архива по состоянию БД (одна строка агрегатов):
+    одинаковая на всех репликах, меняется с появлением лиги или сезона.
+    """
+    return tuple(value or 0 for value in db.execute(_archive_meta_stamp_stmt()).one())
 
 
-def get_archive_meta(db: Session) -> list[ArchiveLeagueInfo]:
+async def archive_meta_stamp_async(db: AsyncSession) -> tuple[int, ...]:
+    """Асинхронная версия archive_meta_stamp."""
+    return tuple(value or 0 for value in (await db.execute(_archive_meta_stamp_stmt())).one())
+
+
+def _archive_meta_stmt() -> Select:
+    return (
+        select(League.shortcut, League.name, League.country, League.sport, Season.year)
+        .outerjoin(Season, Season.league_id == League.id)
+        .order_by(League.shortcut, Season.year.desc())
+    )
+
+
+def _archive_meta_from_rows(rows: list[Any]) -> list[ArchiveLeagueInfo]:
+    items: list[ArchiveLeagueInfo] = []
+    for shortcut, name, country, sport, year in rows:
+        if not items or items[-1].shortcut != shortcut:
+            items.append(
+                ArchiveLeagueInfo(
+                    shortcut=shortcut,
+                    name=name,
+                    country=country,
+                    sport=sport,
+                    seasons=[],
+                )
+            )
+        if year is not None:
+            items[-1].seasons.append(year)
+    return items
+
+
+def _archive_meta_cached(stamp: tuple[int, ...]) -> Optional[list[ArchiveLeagueInfo]]:
+    with _archive_meta_lock:
+        if _archive_meta_cache.stamp == stamp:
+            return _archive_meta_cache.items
+        return None
+
+
+def _archive_meta_store(items: list[ArchiveLeagueInfo], stamp: tuple[int, ...]) -> None:
+    with _archive_meta_lock:
+        _archive_meta_cache.items = items
+        _archive_meta_cache.stamp = stamp
+
+
+def get_archive_meta(db: Session, stamp: Optional[tuple[int, ...]] = None) -> list[ArchiveLeagueInfo]:
     """
     Метаданные архива из БД:
     - какие лиги есть
     - какие годы сезонов по каждой лиге
+
+    Один запрос (league LEFT JOIN season) вместо запроса сезонов на каждую лигу;
+    результат кэшируется в памяти процесса, пока не изменится версия
+    метаданных в БД (stamp — уже прочитанный archive_meta_stamp, иначе
+    читаем его сами; это один запрос агрегатов).
     """
-    leagues = db.query(League).order_by(League.shortcut).all()
+    if stamp is None:
+        stamp = archive_meta_stamp(db)
+    items = _archive_meta_cached(stamp)
+    if items is not None:
+        return items
+
+    items = _archive_meta_from_rows(db.execute(_archive_meta_stmt()).all())
+    _archive_meta_store(items, stamp)
+    return items
 
-    items: list[ArchiveLeagueInfo] = []
-    for l in leagues:
-        years_rows = (
-            db.query(Season.year)
-            .filter(Season.league_id == l.id)
-            .order_by(Season.year.desc())
-            .all()
-        )
-        seasons = [y for (y,) in years_rows]
 
-        items.append(
-            ArchiveLeagueInfo(
-                shortcut=l.shortcut,
-                name=l.name,
-                country=l.country,
-                sport=l.sport,
-                seasons=seasons,
-            )
-        )
+async def get_archive_meta_async(
+    db: AsyncSession, stamp: Optional[tuple[int, ...]] = None
+) -> list[ArchiveLeagueInfo]:
+    """Асинхронная версия get_archive_meta (общий с ней кэш)."""
+    if stamp is None:
+        stamp = await archive_meta_stamp_async(db)
+    items = _archive_meta_cached(stamp)
+    if items is not None:
+        return items
 
+    items = _archive_meta_from_rows((await db.execute(_archive_meta_stmt())).all())
+    _archive_meta_store(items, stamp)
     return items
@@ -0,0 +1,53 @@
+# app/repositories/sync_jobs.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models import SyncJobRecord
+
+# Статусы, после которых задача больше не меняется
+FINAL_SYNC_JOB_STATUSES = ("finished", "failed", "interrupted")
+
+
+def save_sync_job(
+    db: Session,
+    job_id: str,
+    holder: str,
+    status: str,
+    state: dict[str, Any],
+    now: datetime,
+) -> None:
+    """Создать или обновить задачу и сразу закоммитить (статус читают другие реплики)."""
+    record = db.get(SyncJobRecord, job_id)
+    if record is None:
+        record = SyncJobRecord(id=job_id, holder=holder, created_at=now)
+        db.add(record)
+    record.holder = holder
+    record.status = status
+    record.state = state
+    record.updated_at = now
+    db.commit()
+
+
+def get_sync_job_state(db: Session, job_id: str) -> Optional[dict[str, Any]]:
+    """Последнее сохранённое состояние задачи (SyncJob.as_dict()) или None."""
+    return db.execute(select(SyncJobRecord.state).where(SyncJobRecord.id == job_id)).scalar()
+
+
+def prune_sync_jobs(db: Session, keep: int) -> int:
+    """Оставить не больше keep завершённых задач (самые новые); вернуть, сколько удалено."""
+    stale = (
+        select(SyncJobRecord.id)
+        .where(SyncJobRecord.status.in_(FINAL_SYNC_JOB_STATUSES))
+        .order_by(SyncJobRecord.updated_at.desc())
+        .offset(keep)
+    )
+    ids = list(db.execute(stale).scalars())
+    if ids:
+        db.execute(delete(SyncJobRecord).where(SyncJobRecord.id.in_(ids)))
+        db.commit()
+    return len(ids)
@@ -0,0 +1,81 @@
+# app/repositories/sync_lock.py
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import SyncLock
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite не хранит часовой пояс; пишем всегда в UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _ensure_lock_row(db: Session, name: str) -> None:
+    if db.get(SyncLock, name) is not None:
+        return
+    db.add(SyncLock(name=name))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Строку одновременно создала другая реплика
+        db.rollback()
+
+
+def try_acquire_sync_lock(
+    db: Session,
+    name: str,
+    holder: str,
+    now: datetime,
+    ttl_s: float,
+) -> Tuple[bool, Optional[datetime]]:
+    """
+    Взять аренду планировщика на ttl_s секунд.
+
+    Получится, только если время следующего запуска (next_run_at) наступило
+    и аренду никто не держит (или она истекла). Проверка и захват — один
+    UPDATE, поэтому из нескольких реплик аренду получает ровно одна.
+
+    Возвращает (получили ли аренду, next_run_at).
+    """
+    _ensure_lock_row(db, name)
+    stmt = (
+        update(SyncLock)
+        .where(
+            SyncLock.name == name,
+            or_(SyncLock.next_run_at.is_(None), SyncLock.next_run_at <= now),
+            or_(
+                SyncLock.locked_until.is_(None),
+                SyncLock.locked_until < now,
+                SyncLock.holder == holder,
+            ),
+        )
+        .values(holder=holder, locked_until=now + timedelta(seconds=ttl_s))
+        .execution_options(synchronize_session=False)
+    )
+    acquired = db.execute(stmt).rowcount == 1
+    db.commit()
+    if acquired:
+        return True, None
+    next_run_at = db.execute(select(SyncLock.next_run_at).where(SyncLock.name == name)).scalar()
+    return False, _as_utc(next_run_at)
+
+
+def release_sync_lock(db: Session, name: str, holder: str, next_run_at: datetime) -> bool:
+    """Отпустить аренду и назначить следующий запуск (False — аренду уже перехватили)."""
+    stmt = (
+        update(SyncLock)
+        .where(SyncLock.name == name, SyncLock.holder == holder)
+        .values(holder=None, locked_until=None, next_run_at=next_run_at)
+        .execution_options(synchronize_session=False)
+    )
+    released = db.execute(stmt).rowcount == 1
+    db.commit()
+    return released
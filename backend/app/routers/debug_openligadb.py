@@ -1,5 +1,9 @@
-from fastapi import APIRouter
+from typing import Optional
 
+import httpx
+from fastapi import APIRouter, Depends
+
+from app.clients.http import get_http_client
 from app.clients.openligadb_client import OpenLigaDBClient
 from app.settings import settings
 
@@ -7,8 +11,8 @@ router = APIRouter(prefix="/debug/openligadb", tags=["debug"])
 
 
 @router.get("/ping")
-async def ping():
-    client = OpenLigaDBClient()
+async def ping(http_client: Optional[httpx.AsyncClient] = Depends(get_http_client)):
+    client = OpenLigaDBClient(http_client=http_client)
     league = settings.default_leagues[0] if settings.default_leagues else "bl1"
     groups = await client.get_available_groups(league, settings.default_season)
     return {"ok": True, "league": league, "season": settings.default_season, "groups_count": len(groups)}
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone, timedelta
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from pydantic import BaseModel
 
@@ -11,6 +11,12 @@ class MatchStatus(str, Enum):
     SCHEDULED = "SCHEDULED"
     LIVE = "LIVE"
     FINISHED = "FINISHED"
+    # Матч пропал с доски, не попав в recent (см. app.live_stream)
+    UNKNOWN = "UNKNOWN"
+
+
+# Неоконченный матч считается LIVE уже за столько до начала
+LIVE_LEAD = timedelta(minutes=5)
 
 
 class MatchSummary(BaseModel):
@@ -38,14 +44,22 @@ def _parse_kickoff(raw_match: dict[str, Any]) -> datetime:
     if not dt_str:
         # на всякий случай — "сейчас", чтобы не падать
         return datetime.now(timezone.utc)
+    return _parse_utc(dt_str)
+
+
+def _parse_utc(dt_str: str) -> datetime:
+    dt = _parse_utc_or_none(dt_str)
+    # если совсем странный формат — тоже не валимся
+    return dt if dt is not None else datetime.now(timezone.utc)
+
 
+def _parse_utc_or_none(dt_str: str) -> Optional[datetime]:
     # Пример формата: "2024-08-18T15:30:00" или "...Z"
     dt_str = dt_str.replace("Z", "+00:00")
     try:
         dt = datetime.fromisoformat(dt_str)
     except Exception:
-        # если совсем странный формат — тоже не валимся
-        return datetime.now(timezone.utc)
+        return None
 
     # Если дата наивная — считаем, что это уже UTC
     if dt.tzinfo is None:
@@ -53,6 +67,17 @@ def _parse_kickoff(raw_match: dict[str, Any]) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
+def parse_kickoff_utc(raw_match: dict[str, Any]) -> Optional[datetime]:
+    """
+    Время начала матча в UTC, как его видит classify_match;
+    None — даты нет или она не разбирается (classify_match подставит «сейчас»).
+    """
+    dt_str = raw_match.get("matchDateTimeUTC") or raw_match.get("matchDateTime")
+    if not dt_str or not isinstance(dt_str, str):
+        return None
+    return _parse_utc_or_none(dt_str)
+
+
 def _extract_final_score(match_results: list[dict[str, Any]] | None) -> tuple[Optional[int], Optional[int]]:
     """
     Вытаскиваем финальный счёт из массива matchResults.
@@ -73,18 +98,20 @@ def _extract_final_score(match_results: list[dict[str, Any]] | None) -> tuple[Op
     return final.get("pointsTeam1"), final.get("pointsTeam2")
 
 
+def _normalize_now(now: datetime | None) -> datetime:
+    if now is None:
+        return datetime.now(timezone.utc)
+    # на всякий случай приводим к UTC
+    if now.tzinfo is None:
+        return now.replace(tzinfo=timezone.utc)
+    return now.astimezone(timezone.utc)
+
+
 def classify_match(raw_match: dict[str, Any], now: datetime | None = None) -> MatchSummary:
     """
     Преобразовать сырой матч OpenLigaDB в MatchSummary и проставить статус.
     """
-    if now is None:
-        now = datetime.now(timezone.utc)
-    else:
-        # на всякий случай приводим к UTC
-        if now.tzinfo is None:
-            now = now.replace(tzinfo=timezone.utc)
-        else:
-            now = now.astimezone(timezone.utc)
+    now = _normalize_now(now)
 
     kickoff = _parse_kickoff(raw_match)
     score1, score2 = _extract_final_score(raw_match.get("matchResults") or [])
@@ -94,7 +121,7 @@ def classify_match(raw_match: dict[str, Any], now: datetime | None = None) -> Ma
         status = MatchStatus.FINISHED
     else:
         # если старт ещё далеко в будущем — матч запланирован
-        if kickoff > now + timedelta(minutes=5):
+        if kickoff > now + LIVE_LEAD:
             status = MatchStatus.SCHEDULED
         else:
             # время уже наступило, а matchIsFinished = False → считаем LIVE
@@ -114,18 +141,88 @@ def classify_match(raw_match: dict[str, Any], now: datetime | None = None) -> Ma
         score_team1=score1,
         score_team2=score2,
     )
-class MatchStatus(str, Enum):
-    SCHEDULED = "SCHEDULED"
-    LIVE = "LIVE"
-    FINISHED = "FINISHED"
-    UNKNOWN = "UNKNOWN"   # <- добавить
+
+
+def _is_int(value: Any) -> bool:
+    return type(value) is int
+
+
+def classify_matches(raw_matches: Iterable[dict[str, Any]], now: datetime | None = None) -> list[MatchSummary]:
+    """
+    classify_match для целого сезона: тот же результат, но дешевле.
+
+    - now приводится к UTC один раз на весь список;
+    - одинаковые строки дат (матчи тура в одно время) разбираются один раз;
+    - модели собираются без валидации (типы полей проверены заранее).
+
+    Матч с неожиданными типами полей (id строкой, счёт float и т. п.)
+    идёт через classify_match — с его приведением типов и ошибками.
+    """
+    now = _normalize_now(now)
+    scheduled_after = now + LIVE_LEAD
+    kickoffs: dict[str, datetime] = {}
+    summaries: list[MatchSummary] = []
+
+    for raw_match in raw_matches:
+        dt_str = raw_match.get("matchDateTimeUTC") or raw_match.get("matchDateTime")
+        score1, score2 = _extract_final_score(raw_match.get("matchResults") or [])
+        match_id = raw_match.get("matchID")
+        league_shortcut = raw_match.get("leagueShortcut")
+        team1_name = (raw_match.get("team1") or {}).get("teamName")
+        team2_name = (raw_match.get("team2") or {}).get("teamName")
+        if not (
+            (not dt_str or type(dt_str) is str)
+            and _is_int(match_id)
+            and type(league_shortcut) is str
+            and type(team1_name) is str
+            and type(team2_name) is str
+            and (score1 is None or _is_int(score1))
+            and (score2 is None or _is_int(score2))
+        ):
+            summaries.append(classify_match(raw_match, now))
+            continue
+
+        if not dt_str:
+            kickoff = datetime.now(timezone.utc)
+        else:
+            kickoff = kickoffs.get(dt_str)
+            if kickoff is None:
+                kickoff = kickoffs[dt_str] = _parse_utc(dt_str)
+
+        if raw_match.get("matchIsFinished"):
+            status = MatchStatus.FINISHED
+        elif kickoff > scheduled_after:
+            status = MatchStatus.SCHEDULED
+        else:
+            status = MatchStatus.LIVE
+
+        group = raw_match.get("group") or {}
+        summaries.append(
+            MatchSummary.model_construct(
+                id=match_id,
+                league_shortcut=league_shortcut,
+                league_season=int(raw_match.get("leagueSeason")),
+                group_order_id=int(group.get("groupOrderID") or 0),
+                team1_name=team1_name,
+                team2_name=team2_name,
+                kickoff_utc=kickoff,
+                status=status,
+                score_team1=score1,
+                score_team2=score2,
+            )
+        )
+    return summaries
 
 
 class ArchiveMatchesResponse(BaseModel):
     page: int
     page_size: int
-    total: int
+    # None, если total не запрашивали (include_total=false, по умолчанию в режиме cursor)
+    total: Optional[int]
     items: list[MatchSummary]
+    # Курсор следующей страницы (передать как ?cursor=...); None — это последняя страница
+    next_cursor: Optional[str] = None
+
 
 class ArchiveLeagueInfo(BaseModel):
     shortcut: str
@@ -0,0 +1,268 @@
+# app/season_cache.py
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+SeasonKey = Tuple[str, int]
+
+# Глобальный счётчик версий: версия уникальна для всех (league, season),
+# поэтому её можно использовать как метку данных (ETag и т.п.).
+_version_counter = itertools.count(1)
+
+
+@dataclass
+class SeasonSnapshot:
+    """
+    Сырые матчи сезона из OpenLigaDB + служебные метки.
+
+    raw не меняется после создания снапшота: если payload сезона
+    не изменился, кэш отдаёт тот же объект с той же версией.
+    """
+
+    league: str
+    season: int
+    raw: List[Dict[str, Any]]
+    version: int = field(default_factory=lambda: next(_version_counter))
+    fetched_at: float = 0.0
+    expires_at: float = 0.0
+    stale_until: float = 0.0
+    # Валидаторы для условных запросов и метка getlastchangedate,
+    # с которыми был получен payload (см. OpenLigaDBClient)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_change: Optional[dt.datetime] = None
+    # Когда payload последний раз проверялся в OpenLigaDB (GET /getmatchdata,
+    # в т.ч. ответ 304), а не только по lastchangedate
+    revalidated_at: float = 0.0
+    # Производные структуры по raw (индекс матчей по дате и т.п.):
+    # строятся один раз на версию и живут вместе со снапшотом
+    derived: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def is_finished(self) -> bool:
+        """Сезон завершён: все матчи сыграны (payload больше не поменяется)."""
+        return bool(self.raw) and all(m.get("matchIsFinished") for m in self.raw)
+
+
+@dataclass
+class SeasonPayload:
+    """
+    Результат загрузчика сезона вместе с метками для следующей проверки.
+
+    Если OpenLigaDB ответил, что ничего не поменялось, загрузчик
+    возвращает raw предыдущего снапшота (тот же объект).
+    """
+
+    raw: List[Dict[str, Any]]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    last_change: Optional[dt.datetime] = None
+    # False — payload взят из прошлого снапшота без запроса /getmatchdata
+    # (совпала lastchangedate): revalidated_at не обновляется
+    revalidated: bool = True
+
+
+SeasonLoader = Callable[[], Awaitable[Union[List[Dict[str, Any]], SeasonPayload]]]
+
+
+class SeasonCache:
+    """
+    Кэш payload'ов /getmatchdata/{league}/{season} в памяти процесса.
+
+    - TTL на запись: короткий для текущего сезона, очень длинный для завершённого;
+    - stale-while-revalidate: после истечения TTL ещё stale_s секунд отдаём
+      старые данные и обновляем запись в фоне;
+    - single-flight: на один ключ одновременно идёт не больше одного запроса
+      к OpenLigaDB, остальные ждут его результат;
+    - LRU-вытеснение сверх max_entries;
+    - revalidate_s: не реже чем раз в столько секунд загрузчик должен
+      перепроверить сезон в OpenLigaDB целиком (см. revalidation_due).
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        finished_ttl_s: float,
+        stale_s: float,
+        max_entries: int = 64,
+        revalidate_s: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.revalidate_s = revalidate_s
+        self.finished_ttl_s = finished_ttl_s
+        self.stale_s = stale_s
+        self.max_entries = max_entries
+        self._clock = clock
+
+        self._entries: "OrderedDict[SeasonKey, SeasonSnapshot]" = OrderedDict()
+        self._inflight: Dict[SeasonKey, asyncio.Task] = {}
+        self._listeners: List[Callable[[SeasonSnapshot], None]] = []
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refresh_errors = 0
+        # Обновления, после которых payload не поменялся
+        self.unchanged_refreshes = 0
+
+    @staticmethod
+    def make_key(league: str, season: int) -> SeasonKey:
+        return league.lower(), int(season)
+
+    def peek(self, league: str, season: int) -> Optional[SeasonSnapshot]:
+        """Текущий снапшот без обращения к OpenLigaDB (может быть устаревшим)."""
+        return self._entries.get(self.make_key(league, season))
+
+    async def get(self, league: str, season: int, loader: SeasonLoader) -> SeasonSnapshot:
+        key = self.make_key(league, season)
+        now = self._clock()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if now < entry.expires_at:
+                self.hits += 1
+                return entry
+            if now < entry.stale_until:
+                # Отдаём устаревшие данные сразу, обновляем в фоне
+                self.stale_hits += 1
+                self._refresh(key, loader, background=True)
+                return entry
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, loader, background=False))
+
+    def expire(self, league: str, season: int) -> None:
+        """
+        Считать запись устаревшей: следующий get() загрузит сезон заново.
+
+        В отличие от invalidate() снапшот остаётся доступен через peek(),
+        и его валидаторы используются для условного запроса.
+        """
+        entry = self._entries.get(self.make_key(league, season))
+        if entry is not None:
+            entry.expires_at = entry.stale_until = self._clock()
+
+    def revalidation_due(self, snapshot: SeasonSnapshot) -> bool:
+        """Пора перепроверить payload в OpenLigaDB, какой бы ни была lastchangedate."""
+        return self._clock() - snapshot.revalidated_at >= self.revalidate_s
+
+    def add_listener(self, callback: Callable[[SeasonSnapshot], None]) -> None:
+        """Подписаться на новые версии сезонов (вызывается синхронно, должен быть быстрым)."""
+        self._listeners.append(callback)
+
+    def invalidate(self, league: str, season: int) -> None:
+        self._entries.pop(self.make_key(league, season), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refresh_errors": self.refresh_errors,
+            "unchanged_refreshes": self.unchanged_refreshes,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+        }
+
+    # ---------- внутреннее ----------
+
+    def _refresh(self, key: SeasonKey, loader: SeasonLoader, background: bool) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            if not background:
+                self.coalesced += 1
+            return task
+
+        task = asyncio.ensure_future(self._load(key, loader, background))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t, background))
+        return task
+
+    def _finish(self, key: SeasonKey, task: asyncio.Task, background: bool) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # exception() помечает ошибку полученной: фоновое обновление никто
+        # не ждёт, и без этого asyncio пишет «Task exception was never retrieved».
+        # Ждущие get() (и coalesced) получают её как обычно.
+        exc = task.exception()
+        if exc is not None and background:
+            logger.warning("Фоновое обновление сезона %s не удалось, старых данных нет: %s", key, exc)
+
+    async def _load(self, key: SeasonKey, loader: SeasonLoader, background: bool) -> SeasonSnapshot:
+        try:
+            loaded = await loader()
+        except Exception as exc:
+            self.refresh_errors += 1
+            stale = self._entries.get(key)
+            if background and stale is not None:
+                # Фоновое обновление: оставляем старые данные, ошибку только логируем
+                logger.warning("Не удалось обновить сезон %s в кэше: %s", key, exc)
+                return stale
+            raise
+
+        if not isinstance(loaded, SeasonPayload):
+            loaded = SeasonPayload(raw=loaded)
+        return self._store(key, loaded)
+
+    def _store(self, key: SeasonKey, payload: SeasonPayload) -> SeasonSnapshot:
+        now = self._clock()
+        previous = self._entries.get(key)
+        raw = payload.raw
+
+        if previous is not None and (previous.raw is raw or previous.raw == raw):
+            # Данные не поменялись: сохраняем объект и версию,
+            # чтобы производные структуры по версии оставались валидными.
+            snapshot = previous
+            self.unchanged_refreshes += 1
+        else:
+            snapshot = SeasonSnapshot(league=key[0], season=key[1], raw=raw)
+            for callback in self._listeners:
+                try:
+                    callback(snapshot)
+                except Exception:
+                    logger.exception("Ошибка в подписчике кэша сезонов")
+
+        snapshot.etag = payload.etag
+        snapshot.last_modified = payload.last_modified
+        snapshot.last_change = payload.last_change
+        if payload.revalidated:
+            snapshot.revalidated_at = now
+
+        ttl = self.finished_ttl_s if snapshot.is_finished else self.ttl_s
+        snapshot.fetched_at = now
+        snapshot.expires_at = now + ttl
+        snapshot.stale_until = snapshot.expires_at + self.stale_s
+
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return snapshot
+
+
+def get_season_cache(request: Request) -> Optional[SeasonCache]:
+    """Dependency: кэш сезонов из app.state (None без lifespan)."""
+    return getattr(request.app.state, "season_cache", None)
@@ -0,0 +1,44 @@
+# app/serialization.py
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.schemas.match import MatchSummary
+
+# Сериализация списков одним проходом (pydantic-core), без валидации:
+# модели уже провалидированы, когда мы их создавали.
+_MATCH_SUMMARIES = TypeAdapter(List[MatchSummary])
+
+# Эти заголовки у готового тела свои, из sub-response их не переносим
+_OWN_HEADERS = {b"content-length", b"content-type"}
+
+
+def json_response(body: bytes, response: Optional[Response] = None) -> Response:
+    """
+    Готовый JSON → Response, минуя response_model.
+
+    Если обработчик вернул Response, FastAPI не переносит в него заголовки
+    из параметра response (Cache-Control, ETag) — переносим сами.
+    """
+    result = Response(content=body, media_type="application/json")
+    if response is not None:
+        result.headers.raw.extend(
+            (name, value) for name, value in response.headers.raw if name not in _OWN_HEADERS
+        )
+    return result
+
+
+def match_summaries_json(matches: Sequence[MatchSummary]) -> bytes:
+    return _MATCH_SUMMARIES.dump_json(list(matches))
+
+
+def match_summaries_rows(matches: Sequence[MatchSummary]) -> List[Dict[str, Any]]:
+    """То же, что [m.model_dump(mode="json") for m in matches], одним вызовом."""
+    return _MATCH_SUMMARIES.dump_python(list(matches), mode="json")
+
+
+def model_json(model: BaseModel) -> bytes:
+    return model.__pydantic_serializer__.to_json(model)
@@ -1,21 +1,57 @@
 # app/sports_api.py
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
 import logging
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
+from typing import Hashable, List, Tuple
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import config as cfg
-from app.db import get_db
+from app.backfill import BackfillRunner, get_backfill_runner
+from app.board_materializer import BoardMaterializer, board_key, get_board_materializer
+from app.clients.http import get_http_client
+from app.clients.openligadb_client import OpenLigaDBClient as OpenLigaDBApiClient
+from app.db import SessionLocal, db_pool_metrics, get_async_db, get_db
+from app.http_cache import (
+    ARCHIVE_FINISHED_POLICY,
+    ARCHIVE_POLICY,
+    BOARD_POLICY,
+    LIVE_POLICY,
+    NO_STORE,
+    REFERENCE_POLICY,
+    REVALIDATE,
+    apply_cache_policy,
+    not_modified_response,
+    version_etag,
+)
+from app.kickoff_index import kickoff_index
+from app.live_stream import LiveBroadcaster, get_live_broadcaster
 from app.openligadb_client import Match, OpenLigaDBClient
+from app.repositories.backfill import checkpoint_as_dict, list_backfill_checkpoints
 from app.repositories.matches import bulk_upsert_matches_from_board
-from app.schemas.match import MatchSummary, MatchStatus, classify_match
-
-from app.repositories.matches import list_archive_matches, get_archive_meta
+from app.season_cache import SeasonCache, get_season_cache
+from app.settings import settings
+from app.serialization import json_response, match_summaries_json, match_summaries_rows, model_json
+from app.sync import SyncUpstreamError, sync_season
+from app.sync_jobs import SyncJobManager, SyncJobsBusy, get_sync_jobs
+from app.sync_scheduler import SyncScheduler, get_sync_scheduler
+from app.write_behind import LeagueSnapshot, WriteBehindQueue, get_board_writer
+from app.schemas.match import MatchSummary, MatchStatus, classify_matches
+
+from app.repositories.matches import (
+    archive_meta_stamp_async,
+    get_archive_meta_async,
+    list_archive_matches_async,
+    season_archive_complete_async,
+)
 from app.schemas.match import ArchiveMatchesResponse, ArchiveMetaResponse
 
 router = APIRouter(prefix="/api", tags=["sports"])
@@ -23,9 +59,28 @@ router = APIRouter(prefix="/api", tags=["sports"])
 logger = logging.getLogger(__name__)
 
 
-async def get_client() -> OpenLigaDBClient:
-    """Dependency для DI клиента OpenLigaDB."""
-    return OpenLigaDBClient()
+async def get_client(
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+    season_cache: SeasonCache | None = Depends(get_season_cache),
+) -> OpenLigaDBClient:
+    """
+    Dependency для DI клиента OpenLigaDB.
+
+    Клиент лёгкий и создаётся на запрос, но ходит в OpenLigaDB через
+    общий пул соединений из lifespan (app.state.http_client),
+    а сезоны берёт из общего кэша (app.state.season_cache).
+    """
+    return OpenLigaDBClient(http_client=http_client, season_cache=season_cache)
+
+
+async def get_sync_client(
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+) -> OpenLigaDBApiClient:
+    """
+    Dependency: клиент OpenLigaDB с эндпоинтами по турам (groups)
+    для инкрементальной синхронизации. Ходит через тот же общий пул.
+    """
+    return OpenLigaDBApiClient(http_client=http_client)
 
 
 # ================== /leagues ==================
@@ -33,6 +88,7 @@ async def get_client() -> OpenLigaDBClient:
 
 @router.get("/leagues")
 async def get_leagues(
+    response: Response,
     client: OpenLigaDBClient = Depends(get_client),
 ) -> List[dict]:
     """
@@ -48,6 +104,7 @@ async def get_leagues(
 
     try:
         leagues = await client.get_leagues(shortcuts)
+        apply_cache_policy(response, REFERENCE_POLICY)
         # Возвращаем чистый список, без обёртки {"items": ...}
         return leagues
     except Exception as exc:
@@ -63,6 +120,7 @@ async def get_leagues(
 
 @router.get("/matches")
 async def get_matches(
+    response: Response,
     league: str,
     date_str: str = Query(..., description="Дата в формате YYYY-MM-DD"),
     client: OpenLigaDBClient = Depends(get_client),
@@ -83,6 +141,7 @@ async def get_matches(
             date=date,
             season=cfg.DEFAULT_SEASON,
         )
+        apply_cache_policy(response, LIVE_POLICY)
         return [m.model_dump() for m in matches]
     except Exception as exc:
         logger.exception(
@@ -100,6 +159,11 @@ async def get_matches(
 # ================== /board ==================
 
 
+class BoardLeagueError(BaseModel):
+    league: str
+    detail: str
+
+
 class BoardResponse(BaseModel):
     date_from: dt.date
     date_to: dt.date
@@ -107,6 +171,174 @@ class BoardResponse(BaseModel):
     recent: List[MatchSummary]
     live: List[MatchSummary]
     upcoming: List[MatchSummary]
+    # Лиги, которые не удалось загрузить: доска отдаётся частично
+    errors: List[BoardLeagueError] = []
+
+
+def persist_board_snapshots(snapshots: List[LeagueSnapshot]) -> None:
+    """
+    Сохранить снапшоты лиг с /board в БД.
+
+    Вызывается очередью write-behind в отдельном потоке, а не в обработчике.
+    Ошибка одной лиги не мешает сохранить остальные, но в конце пробрасывается,
+    чтобы очередь не посчитала пачку записанной.
+    """
+    failed: List[str] = []
+    db = SessionLocal()
+    try:
+        for snap in snapshots:
+            try:
+                bulk_upsert_matches_from_board(
+                    db=db,
+                    league_shortcut=snap.league_shortcut,
+                    league_name=snap.league_name,
+                    season_year=snap.season_year,
+                    matches=match_summaries_rows(snap.matches),
+                )
+            except Exception as db_exc:
+                db.rollback()
+                failed.append(f"{snap.league_shortcut}/{snap.season_year}")
+                logger.exception(
+                    "Ошибка при сохранении матчей лиги %s сезона %s в БД: %s",
+                    snap.league_shortcut,
+                    snap.season_year,
+                    db_exc,
+                )
+    finally:
+        db.close()
+
+    if failed:
+        raise RuntimeError(f"Не удалось сохранить в БД: {', '.join(failed)}")
+
+
+async def _fetch_league_summaries(
+    client: OpenLigaDBClient,
+    league: str,
+    season_year: int,
+    now: dt.datetime,
+    back: int,
+    ahead: int,
+    semaphore: asyncio.Semaphore,
+) -> Tuple[Hashable, List[MatchSummary]]:
+    """
+    Загрузить сезон одной лиги и классифицировать матчи окна доски.
+
+    Классифицируются только кандидаты из KickoffIndex (окно back/ahead,
+    неоконченные матчи до него и матчи без даты) — стоимость доски
+    зависит от окна, а не от размера сезона. Индекс строится один раз
+    на версию снапшота.
+
+    Возвращает метку содержимого для write-behind (версия снапшота сезона
+    + статусы матчей: LIVE/SCHEDULED зависят и от текущего времени)
+    и сами матчи.
+    """
+    async with semaphore:
+        snapshot = await client.get_season_snapshot(league, season_year)
+
+    summaries = classify_matches(kickoff_index(snapshot).board_candidates(now, back, ahead), now)
+    return (snapshot.version, tuple(m.status for m in summaries)), summaries
+
+
+async def build_board(
+    client: OpenLigaDBClient,
+    leagues_list: List[str],
+    season_year: int,
+    back: int,
+    ahead: int,
+    writer: WriteBehindQueue | None = None,
+) -> BoardResponse:
+    """
+    Собрать доску live / upcoming / recent по лигам.
+
+    Лиги загружаются параллельно (не больше BOARD_FETCH_CONCURRENCY за раз).
+    Если часть лиг не загрузилась — отдаём доску по остальным и помечаем
+    проблемные лиги в errors; HTTPException 502 — если не загрузилась ни одна.
+
+    В БД матчи пишутся не здесь: снапшоты лиг уходят в очередь write-behind.
+    """
+    now = dt.datetime.now(dt.timezone.utc)
+
+    live: List[MatchSummary] = []
+    upcoming: List[MatchSummary] = []
+    recent: List[MatchSummary] = []
+    errors: List[BoardLeagueError] = []
+
+    semaphore = asyncio.Semaphore(max(1, cfg.BOARD_FETCH_CONCURRENCY))
+    results = await asyncio.gather(
+        *(
+            _fetch_league_summaries(client, lg, season_year, now, back, ahead, semaphore)
+            for lg in leagues_list
+        ),
+        return_exceptions=True,
+    )
+
+    for lg, result in zip(leagues_list, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                "Не удалось получить матчи лиги %s для /board из OpenLigaDB: %s",
+                lg,
+                result,
+                exc_info=result,
+            )
+            errors.append(
+                BoardLeagueError(
+                    league=lg,
+                    detail="Ошибка при обращении к внешнему API OpenLigaDB",
+                )
+            )
+            continue
+
+        content_key, league_summaries = result
+
+        # Сохранение в БД — в фоне через write-behind, ответ /board его не ждёт.
+        # Ошибки БД логирует воркер, фронт от проблем с Postgres не страдает.
+        # Снапшот без изменений с последней записи очередь пропустит сама.
+        if league_summaries and writer is not None:
+            writer.submit(
+                LeagueSnapshot(
+                    league_shortcut=lg,
+                    league_name=lg,  # пока shortcut как name
+                    season_year=season_year,
+                    matches=league_summaries,
+                    content_key=content_key,
+                )
+            )
+
+        # Классифицируем по live / upcoming / recent в рамках окна
+        for m in league_summaries:
+            if m.status == MatchStatus.LIVE:
+                live.append(m)
+            elif m.status == MatchStatus.SCHEDULED:
+                if now <= m.kickoff_utc <= now + dt.timedelta(days=ahead):
+                    upcoming.append(m)
+            elif m.status == MatchStatus.FINISHED:
+                if now - dt.timedelta(days=back) <= m.kickoff_utc <= now:
+                    recent.append(m)
+
+    if leagues_list and len(errors) == len(leagues_list):
+        raise HTTPException(
+            status_code=502,
+            detail="Ошибка при обращении к внешнему API OpenLigaDB (board)",
+        )
+
+    # Сортировки
+    live.sort(key=lambda x: x.kickoff_utc)
+    upcoming.sort(key=lambda x: x.kickoff_utc)
+    recent.sort(key=lambda x: x.kickoff_utc, reverse=True)
+
+    today = dt.date.today()
+    date_from = today - dt.timedelta(days=back)
+    date_to = today + dt.timedelta(days=ahead)
+
+    return BoardResponse(
+        date_from=date_from,
+        date_to=date_to,
+        leagues=leagues_list,
+        recent=recent,
+        live=live,
+        upcoming=upcoming,
+        errors=errors,
+    )
 
 
 @router.get(
@@ -115,6 +347,7 @@ class BoardResponse(BaseModel):
     summary="Сводка матчей по диапазону дат и лигам",
 )
 async def get_board(
+    response: Response,
     # НОВОЕ: поддержка query leagues/season
     leagues: str | None = Query(
         default=None,
@@ -136,17 +369,22 @@ async def get_board(
         le=30,
         description="Сколько дней вперёд смотреть матчи",
     ),
-    db: Session = Depends(get_db),
     client: OpenLigaDBClient = Depends(get_client),
-) -> BoardResponse:
+    writer: WriteBehindQueue | None = Depends(get_board_writer),
+    materializer: BoardMaterializer | None = Depends(get_board_materializer),
+) -> Response:
     """
     Эндпоинт /board: live / upcoming / recent матчи.
 
     Если leagues/season переданы — используем их.
     Иначе берём DEFAULT_LEAGUES, DEFAULT_SEASON из config.
-    """
-    now = dt.datetime.now(dt.timezone.utc)
 
+    Сборка — build_board. Доску с параметрами по умолчанию заранее
+    собирает BoardMaterializer, такие запросы отдаются из памяти.
+
+    Кэшируется ненадолго (с stale-while-revalidate); частичную доску
+    (есть errors) кэши каждый раз перепроверяют.
+    """
     # Разбор query leagues (CSV) или fallback на дефолты
     leagues_list = (
         [x.strip() for x in leagues.split(",") if x.strip()]
@@ -155,79 +393,100 @@ async def get_board(
     )
     season_year = season or cfg.DEFAULT_SEASON
 
-    back = days_back
-    ahead = days_ahead
+    # Доска с параметрами по умолчанию уже собрана в фоне — отдаём готовые байты
+    if materializer is not None:
+        snapshot = materializer.lookup(board_key(leagues_list, season_year, days_back, days_ahead))
+        if snapshot is not None:
+            response.headers["ETag"] = snapshot.etag
+            apply_cache_policy(response, BOARD_POLICY)
+            return json_response(snapshot.body, response)
 
-    live: List[MatchSummary] = []
-    upcoming: List[MatchSummary] = []
-    recent: List[MatchSummary] = []
+    board = await build_board(client, leagues_list, season_year, days_back, days_ahead, writer)
 
-    try:
-        for lg in leagues_list:
-            raw_matches = await client.get_season_raw(lg, season_year)
+    apply_cache_policy(response, REVALIDATE if board.errors else BOARD_POLICY)
+    # Модель уже валидна — сериализуем сразу, без повторной проверки response_model
+    return json_response(model_json(board), response)
 
-            league_summaries: List[MatchSummary] = []
-            for rm in raw_matches:
-                ms = classify_match(rm, now)
-                league_summaries.append(ms)
 
-            # Сохраняем/обновляем эти матчи в БД.
-            # Ошибки БД логируем, но не ломаем сам /board,
-            # чтобы фронт не страдал при временных проблемах с Postgres.
-            try:
-                if league_summaries:
-                    bulk_upsert_matches_from_board(
-                        db=db,
-                        league_shortcut=lg,
-                        league_name=lg,  # пока shortcut как name
-                        season_year=season_year,
-                        matches=[m.model_dump(mode="json") for m in league_summaries],
-                    )
-            except Exception as db_exc:
-                logger.exception(
-                    "Ошибка при сохранении матчей лиги %s сезона %s в БД: %s",
-                    lg,
-                    season_year,
-                    db_exc,
-                )
+# ================== /live ==================
 
-            # Классифицируем по live / upcoming / recent в рамках окна
-            for m in league_summaries:
-                if m.status == MatchStatus.LIVE:
-                    live.append(m)
-                elif m.status == MatchStatus.SCHEDULED:
-                    if now <= m.kickoff_utc <= now + dt.timedelta(days=ahead):
-                        upcoming.append(m)
-                elif m.status == MatchStatus.FINISHED:
-                    if now - dt.timedelta(days=back) <= m.kickoff_utc <= now:
-                        recent.append(m)
+# Комментарий SSE: браузер его игнорирует, прокси видят трафик
+_SSE_HEARTBEAT = b": ping\n\n"
+_WS_HEARTBEAT = '{"event":"ping"}'
 
-    except Exception as exc:
-        logger.exception("Не удалось получить матчи для /board из OpenLigaDB: %s", exc)
-        raise HTTPException(
-            status_code=502,
-            detail="Ошибка при обращении к внешнему API OpenLigaDB (board)",
-        )
 
-    # Сортировки
-    live.sort(key=lambda x: x.kickoff_utc)
-    upcoming.sort(key=lambda x: x.kickoff_utc)
-    recent.sort(key=lambda x: x.kickoff_utc, reverse=True)
+@router.get(
+    "/live/stream",
+    summary="Поток изменений LIVE-матчей (Server-Sent Events)",
+)
+async def live_stream(
+    broadcaster: LiveBroadcaster | None = Depends(get_live_broadcaster),
+) -> StreamingResponse:
+    """
+    Server-Sent Events вместо опроса /board.
 
-    today = dt.date.today()
-    date_from = today - dt.timedelta(days=back)
-    date_to = today + dt.timedelta(days=ahead)
+    Первое событие — snapshot (все текущие LIVE-матчи), дальше — update
+    с матчами, у которых поменялся счёт или статус. Все соединения
+    получают одни и те же заранее сериализованные события от фоновой
+    сборки /board; в OpenLigaDB на каждого зрителя не ходим.
+    """
+    sub = broadcaster.subscribe() if broadcaster is not None else None
+    if sub is None:
+        raise HTTPException(status_code=503, detail="Live stream unavailable")
 
-    return BoardResponse(
-        date_from=date_from,
-        date_to=date_to,
-        leagues=leagues_list,
-        recent=recent,
-        live=live,
-        upcoming=upcoming,
+    async def frames():
+        try:
+            async for event in broadcaster.events(sub, settings.live_stream_heartbeat_s):
+                yield _SSE_HEARTBEAT if event is None else event.sse
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": NO_STORE.header(),
+            # nginx не должен буферизовать поток
+            "X-Accel-Buffering": "no",
+        },
     )
 
 
+@router.websocket("/live/ws")
+async def live_ws(
+    websocket: WebSocket,
+    broadcaster: LiveBroadcaster | None = Depends(get_live_broadcaster),
+) -> None:
+    """Те же события, что и /live/stream, через WebSocket (JSON-сообщения)."""
+    sub = broadcaster.subscribe() if broadcaster is not None else None
+    if sub is None:
+        # 1013: Try Again Later
+        await websocket.close(code=1013)
+        return
+
+    async def send_events() -> None:
+        async for event in broadcaster.events(sub, settings.live_stream_heartbeat_s):
+            await websocket.send_text(_WS_HEARTBEAT if event is None else event.ws)
+
+    async def wait_disconnect() -> None:
+        # Клиенту писать нечего; читаем только чтобы сразу заметить закрытие
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    await websocket.accept()
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    finally:
+        for task in tasks:
+            task.cancel()
+        broadcaster.unsubscribe(sub)
+
+
 # ================== /archive ==================
 
 
@@ -236,6 +495,7 @@ async def get_board(
     summary="Список лиг для архивов",
 )
 async def get_archive_leagues(
+    response: Response,
     client: OpenLigaDBClient = Depends(get_client),
 ) -> List[dict]:
     """
@@ -251,6 +511,7 @@ async def get_archive_leagues(
 
     try:
         leagues = await client.get_leagues(shortcuts)
+        apply_cache_policy(response, REFERENCE_POLICY)
         return leagues
     except Exception as exc:
         logger.exception("Не удалось получить архивные лиги из OpenLigaDB: %s", exc)
@@ -265,6 +526,7 @@ async def get_archive_leagues(
     summary="Доступные сезоны для выбранной лиги (архив)",
 )
 async def get_archive_seasons(
+    response: Response,
     league: str,
     client: OpenLigaDBClient = Depends(get_client),
 ) -> List[int]:
@@ -311,6 +573,7 @@ async def get_archive_seasons(
             detail=f"Для лиги '{league}' не найдено ни одного сезона",
         )
 
+    apply_cache_policy(response, REFERENCE_POLICY)
     return sorted(seasons_set, reverse=True)
 
 
@@ -320,14 +583,16 @@ async def get_archive_seasons(
     summary="Матчи выбранной лиги и сезона (архив)",
 )
 async def get_archive_matches(
+    response: Response,
     league: str,
     season: int,
     client: OpenLigaDBClient = Depends(get_client),
-) -> List[MatchSummary]:
+) -> Response:
     """
     Архивные матчи для конкретной лиги и сезона.
 
     Берём сырые матчи сезона из OpenLigaDB и приводим к MatchSummary.
+    Завершённый сезон (все матчи FINISHED) кэшируется надолго.
     """
     league = league.lower()
 
@@ -353,14 +618,14 @@ async def get_archive_matches(
 
     now = dt.datetime.now(dt.timezone.utc)
 
-    summaries: List[MatchSummary] = []
-    for rm in raw_matches:
-        ms = classify_match(rm, now)
-        summaries.append(ms)
-
+    summaries = classify_matches(raw_matches, now)
     summaries.sort(key=lambda x: x.kickoff_utc)
 
-    return summaries
+    finished = all(m.status == MatchStatus.FINISHED for m in summaries)
+    apply_cache_policy(response, ARCHIVE_FINISHED_POLICY if finished else ARCHIVE_POLICY)
+    # Целый сезон — сотни матчей: один проход pydantic-core вместо
+    # повторной валидации через response_model и jsonable_encoder
+    return json_response(match_summaries_json(summaries), response)
 
 
 # ================== /admin/sync-season ==================
@@ -371,61 +636,238 @@ async def get_archive_matches(
     summary="Принудительная синхронизация сезона в БД",
 )
 async def admin_sync_season(
+    response: Response,
     league: str,
     season: int,
+    mode: str = Query(
+        default="full",
+        pattern="^(auto|full|incremental)$",
+        description=(
+            "full — весь сезон; incremental — только текущие/изменённые туры; "
+            "auto — инкрементально, но целиком раз в SYNC_FULL_INTERVAL_S"
+        ),
+    ),
+    force: bool = Query(
+        default=False,
+        description="Синхронизировать, даже если lastchangedate не изменилась",
+    ),
     db: Session = Depends(get_db),
     client: OpenLigaDBClient = Depends(get_client),
+    api_client: OpenLigaDBApiClient = Depends(get_sync_client),
 ) -> dict:
     """
-    Админ-эндпоинт: подтягивает все матчи указанной лиги и сезона
-    из OpenLigaDB и сохраняет/обновляет их в БД.
+    Админ-эндпоинт: подтягивает матчи указанной лиги и сезона
+    из OpenLigaDB и сохраняет/обновляет их в БД (см. app.sync).
+
+    Перед скачиванием сверяем дешёвую метку getlastchangedate
+    с сохранённой при прошлой синхронизации: совпала — сезон (тур)
+    не качаем и в БД не пишем (unchanged_since в ответе).
+
+    В ответе: synced — сколько матчей пришло, changed — сколько строк
+    реально записано (inserted + updated), unchanged — пропущено по fingerprint.
 
     Пример:
-      POST /api/admin/sync-season?league=bl1&season=2024
+      POST /api/admin/sync-season?league=bl1&season=2024&mode=auto
     """
-    league = league.lower()
-    now = dt.datetime.now(dt.timezone.utc)
-
     try:
-        raw_matches = await client.get_season_raw(league, season)
-    except Exception as exc:
-        logger.exception(
-            "Не удалось получить матчи для sync-season (league=%s, season=%s): %s",
+        result = await sync_season(
+            db, client, api_client, league, season, mode=mode, force=force
+        )
+    except SyncUpstreamError as exc:
+        logger.error(
+            "Не удалось получить матчи для sync-season (league=%s, season=%s, mode=%s): %s",
             league,
             season,
+            mode,
             exc,
+            exc_info=exc.__cause__,
         )
         raise HTTPException(
             status_code=502,
             detail="Ошибка при обращении к внешнему API OpenLigaDB (admin/sync-season)",
         )
 
-    if not raw_matches:
-        return {
-            "league": league,
-            "season": season,
-            "synced": 0,
-            "detail": "Матчей не найдено",
-        }
-
-    summaries: List[MatchSummary] = []
-    for rm in raw_matches:
-        ms = classify_match(rm, now)
-        summaries.append(ms)
-
-    # Сохраняем/обновляем в БД
-    bulk_upsert_matches_from_board(
-        db=db,
-        league_shortcut=league,
-        league_name=league,
-        season_year=season,
-        matches=[m.model_dump(mode="json") for m in summaries],
-    )
+    apply_cache_policy(response, NO_STORE)
+    return result.as_dict()
+
+
+# ================== /admin/sync-jobs ==================
+
+
+class BulkSyncItem(BaseModel):
+    """Лига и один сезон (season) или диапазон сезонов (season_from..season_to включительно)."""
+
+    league: str = Field(min_length=1)
+    season: int | None = None
+    season_from: int | None = None
+    season_to: int | None = None
+
+    @model_validator(mode="after")
+    def _check_seasons(self) -> "BulkSyncItem":
+        if self.season is not None:
+            if self.season_from is not None or self.season_to is not None:
+                raise ValueError("Укажите season или season_from/season_to, но не оба")
+        elif self.season_from is None or self.season_to is None:
+            raise ValueError("Укажите season или оба season_from и season_to")
+        elif self.season_from > self.season_to:
+            raise ValueError("season_from больше season_to")
+        return self
+
+    def pairs(self) -> List[Tuple[str, int]]:
+        if self.season is not None:
+            return [(self.league, self.season)]
+        return [(self.league, year) for year in range(self.season_from, self.season_to + 1)]
+
+
+class BulkSyncRequest(BaseModel):
+    items: List[BulkSyncItem] = Field(min_length=1)
+    mode: str = Field(default="full", pattern="^(auto|full|incremental)$")
+    force: bool = False
+
+
+@router.post(
+    "/admin/sync-jobs",
+    status_code=202,
+    summary="Массовая синхронизация нескольких лиг и сезонов в фоне",
+)
+async def admin_create_sync_job(
+    request: Request,
+    response: Response,
+    body: BulkSyncRequest,
+    jobs: SyncJobManager | None = Depends(get_sync_jobs),
+) -> dict:
+    """
+    Ставит синхронизацию набора (league, season) в фон и сразу отвечает 202
+    с job_id. Пары выполняются общим ограниченным пулом воркеров
+    (BULK_SYNC_CONCURRENCY), прогресс — GET /api/admin/sync-jobs/{job_id}.
+
+    Пример тела:
+      {"items": [{"league": "bl1", "season_from": 2020, "season_to": 2024},
+                 {"league": "bl2", "season": 2024}], "mode": "full"}
+    """
+    if jobs is None:
+        raise HTTPException(status_code=503, detail="Фоновая синхронизация недоступна")
+    pairs = [pair for item in body.items for pair in item.pairs()]
+    if len(pairs) > settings.bulk_sync_max_pairs:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Слишком много пар (league, season): {len(pairs)}, "
+                f"максимум {settings.bulk_sync_max_pairs}"
+            ),
+        )
+    try:
+        job = await jobs.submit(pairs, mode=body.mode, force=body.force)
+    except SyncJobsBusy as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+
+    apply_cache_policy(response, NO_STORE)
+    status_url = request.url_for("admin_get_sync_job", job_id=job.id).path
+    response.headers["Location"] = status_url
+    return {"job_id": job.id, "total": job.total, "status_url": status_url}
+
+
+@router.get(
+    "/admin/sync-jobs/{job_id}",
+    summary="Прогресс задачи массовой синхронизации",
+)
+async def admin_get_sync_job(
+    response: Response,
+    job_id: str,
+    jobs: SyncJobManager | None = Depends(get_sync_jobs),
+) -> dict:
+    """
+    Статус (queued/running/finished/failed/interrupted), сколько пар выполнено
+    и с ошибкой, сколько матчей синхронизировано, matches_per_s и результаты
+    по каждой паре. Задачу видно с любой реплики (состояние хранится в БД).
+    """
+    state = await jobs.status(job_id) if jobs is not None else None
+    if state is None:
+        raise HTTPException(status_code=404, detail="Задача синхронизации не найдена")
+    apply_cache_policy(response, NO_STORE)
+    return state
+
+
+# ================== /admin/backfill ==================
+
+
+@router.post(
+    "/admin/backfill",
+    status_code=202,
+    summary="Загрузка архива лиги за диапазон сезонов (в фоне, с продолжением)",
+)
+async def admin_start_backfill(
+    response: Response,
+    league: str,
+    season_from: int,
+    season_to: int,
+    runner: BackfillRunner | None = Depends(get_backfill_runner),
+) -> dict:
+    """
+    Запускает backfill (см. app.backfill) в фоне и сразу отвечает 202.
+
+    Уже загруженные сезоны (чекпоинт done) пропускаются, поэтому после сбоя
+    тот же запрос продолжает с места остановки. Прогресс —
+    GET /api/admin/backfill?league=... Тот же backfill из командной строки:
+    python -m app.backfill bl1 2010 2023.
+    """
+    if runner is None:
+        raise HTTPException(status_code=503, detail="Backfill недоступен")
+    if season_from > season_to:
+        raise HTTPException(status_code=422, detail="season_from больше season_to")
+    if not await runner.start(league, season_from, season_to):
+        raise HTTPException(status_code=409, detail=f"Backfill лиги {league} уже выполняется")
+
+    apply_cache_policy(response, NO_STORE)
+    return {"league": league.lower(), "season_from": season_from, "season_to": season_to}
 
+
+@router.get(
+    "/admin/backfill",
+    summary="Прогресс загрузки архива лиги по сезонам",
+)
+def admin_backfill_progress(
+    response: Response,
+    league: str,
+    db: Session = Depends(get_db),
+    runner: BackfillRunner | None = Depends(get_backfill_runner),
+) -> dict:
+    league = league.lower()
+    checkpoints = list_backfill_checkpoints(db, league)
+    apply_cache_policy(response, NO_STORE)
     return {
         "league": league,
-        "season": season,
-        "synced": len(summaries),
+        "running": runner is not None and runner.is_running(league),
+        "last_report": runner.last_reports.get(league) if runner is not None else None,
+        "seasons": [checkpoint_as_dict(cp) for cp in checkpoints],
+    }
+
+
+# ================== /admin/metrics ==================
+
+
+@router.get(
+    "/admin/metrics",
+    summary="Внутренние счётчики backend (кэши, очереди, пул БД)",
+)
+async def admin_metrics(
+    response: Response,
+    season_cache: SeasonCache | None = Depends(get_season_cache),
+    writer: WriteBehindQueue | None = Depends(get_board_writer),
+    materializer: BoardMaterializer | None = Depends(get_board_materializer),
+    broadcaster: LiveBroadcaster | None = Depends(get_live_broadcaster),
+    scheduler: SyncScheduler | None = Depends(get_sync_scheduler),
+    jobs: SyncJobManager | None = Depends(get_sync_jobs),
+) -> dict:
+    apply_cache_policy(response, NO_STORE)
+    return {
+        "season_cache": season_cache.stats() if season_cache is not None else None,
+        "board_write_behind": writer.stats() if writer is not None else None,
+        "board_materializer": materializer.stats() if materializer is not None else None,
+        "live_stream": broadcaster.stats() if broadcaster is not None else None,
+        "sync_scheduler": scheduler.stats() if scheduler is not None else None,
+        "sync_jobs": jobs.stats() if jobs is not None else None,
+        "db_pool": db_pool_metrics(),
     }
 
 
@@ -434,7 +876,8 @@ async def admin_sync_season(
     response_model=ArchiveMatchesResponse,
     summary="Архив матчей из БД (Postgres)",
 )
-def get_archive(
+async def get_archive(
+    response: Response,
     league: str = Query(..., description="Shortcut лиги, например bl1"),
     season: int | None = Query(default=None, description="Год сезона, например 2024"),
     date_from: dt.date | None = Query(default=None, description="YYYY-MM-DD"),
@@ -442,19 +885,57 @@ def get_archive(
     status: str | None = Query(default=None, description="FINISHED/LIVE/SCHEDULED/UNKNOWN"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
-    db: Session = Depends(get_db),
-) -> ArchiveMatchesResponse:
-    total, items = list_archive_matches(
-        db=db,
-        league_shortcut=league,
-        season_year=season,
-        date_from=date_from,
-        date_to=date_to,
-        status=status,
+    cursor: str | None = Query(
+        default=None,
+        description="next_cursor из предыдущего ответа (keyset-пагинация, page игнорируется)",
+    ),
+    include_total: bool | None = Query(
+        default=None,
+        description="Считать total; по умолчанию да для page и нет для cursor",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """
+    Архив матчей из БД, новые первыми.
+
+    Два режима пагинации:
+    - page/page_size (OFFSET) — как раньше, для обратной совместимости;
+    - cursor — по next_cursor из предыдущего ответа, скорость не зависит от глубины.
+
+    Работает на async engine: запрос к БД не занимает поток threadpool.
+
+    Архив полного сезона (загружен целиком, все матчи FINISHED — см.
+    season_archive_complete_async) кэшируется надолго.
+    """
+    if include_total is None:
+        include_total = cursor is None
+
+    try:
+        total, items, next_cursor = await list_archive_matches_async(
+            db=db,
+            league_shortcut=league,
+            season_year=season,
+            date_from=date_from,
+            date_to=date_to,
+            status=status,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            include_total=include_total,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректный cursor")
+
+    finished = season is not None and await season_archive_complete_async(db, league, season)
+    apply_cache_policy(response, ARCHIVE_FINISHED_POLICY if finished else ARCHIVE_POLICY)
+    page_model = ArchiveMatchesResponse(
         page=page,
         page_size=page_size,
+        total=total,
+        items=items,
+        next_cursor=next_cursor,
     )
-    return ArchiveMatchesResponse(page=page, page_size=page_size, total=total, items=items)
+    return json_response(model_json(page_model), response)
 
 
 @router.get(
@@ -462,7 +943,26 @@ def get_archive(
     response_model=ArchiveMetaResponse,
     summary="Метаданные архива из БД (лиги и сезоны)",
 )
-def get_archive_meta_endpoint(
-    db: Session = Depends(get_db),
+async def get_archive_meta_endpoint(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
 ) -> ArchiveMetaResponse:
-    return ArchiveMetaResponse(items=get_archive_meta(db))
+    """
+    Лиги и сезоны архива.
+
+    ETag — версия метаданных по состоянию БД (archive_meta_stamp_async:
+    меняется, когда любая реплика добавляет лигу/сезон), поэтому на
+    If-None-Match отвечаем 304 после одного запроса агрегатов, без выборки
+    лиг и сезонов.
+    """
+    stamp = await archive_meta_stamp_async(db)
+    etag = version_etag("archive-meta", *stamp)
+    not_modified = not_modified_response(request, etag, REVALIDATE)
+    if not_modified is not None:
+        return not_modified
+
+    items = await get_archive_meta_async(db, stamp)
+    response.headers["ETag"] = etag
+    apply_cache_policy(response, REVALIDATE)
+    return ArchiveMetaResponse(items=items)
@@ -0,0 +1,272 @@
+# app/sync.py
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.clients.openligadb_client import OpenLigaDBClient as OpenLigaDBApiClient
+from app.openligadb_client import OpenLigaDBClient, parse_last_change_date
+from app.repositories.matches import (
+    SeasonSyncState,
+    UpsertCounts,
+    bulk_upsert_matches_from_board,
+    get_season_sync_state,
+)
+from app.schemas.match import classify_matches
+from app.serialization import match_summaries_rows
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SYNC_MODES = ("auto", "full", "incremental")
+
+
+class SyncUpstreamError(Exception):
+    """OpenLigaDB не ответил — синхронизация не выполнена, БД не тронута."""
+
+
+@dataclass
+class SyncResult:
+    league: str
+    season: int
+    mode: str
+    synced: int = 0
+    counts: UpsertCounts = field(default_factory=UpsertCounts)
+    # Туры, которые синхронизировались (только для инкрементального режима)
+    groups: Optional[List[int]] = None
+    unchanged_since: Optional[dt.datetime] = None
+    detail: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "league": self.league,
+            "season": self.season,
+            "mode": self.mode,
+            "synced": self.synced,
+            "changed": self.counts.changed,
+            **self.counts.as_dict(),
+        }
+        if self.groups is not None:
+            result["groups"] = self.groups
+        if self.unchanged_since is not None:
+            result["unchanged_since"] = self.unchanged_since.isoformat()
+        if self.detail is not None:
+            result["detail"] = self.detail
+        return result
+
+
+async def load_season_matches(
+    client: OpenLigaDBClient,
+    league: str,
+    season: int,
+    last_change: Optional[dt.datetime] = None,
+    revalidate: bool = False,
+) -> Tuple[int, list]:
+    """
+    Сырые матчи сезона и версия снапшота.
+
+    revalidate=True — мимо кэша сезона (см. get_season_snapshot).
+    """
+    snapshot = await client.get_season_snapshot(
+        league, season, last_change=last_change, revalidate=revalidate
+    )
+    return snapshot.version, snapshot.raw
+
+
+def full_sync_due(
+    state: Optional[SeasonSyncState],
+    now: dt.datetime,
+    interval_s: Optional[float] = None,
+) -> bool:
+    """Пора ли синхронизировать сезон целиком (режим auto)."""
+    if interval_s is None:
+        interval_s = settings.sync_full_interval_s
+    if state is None or state.last_full_sync_at is None:
+        return True
+    last = state.last_full_sync_at
+    if last.tzinfo is None:
+        # SQLite не хранит часовой пояс; пишем всегда в UTC
+        last = last.replace(tzinfo=dt.timezone.utc)
+    return (now - last).total_seconds() >= interval_s
+
+
+def _upsert(
+    db: Session,
+    league: str,
+    season: int,
+    raw_matches: List[Dict[str, Any]],
+    now: dt.datetime,
+    **marks: Any,
+) -> Tuple[int, UpsertCounts]:
+    summaries = classify_matches(raw_matches, now)
+    counts = bulk_upsert_matches_from_board(
+        db=db,
+        league_shortcut=league,
+        league_name=league,
+        season_year=season,
+        matches=match_summaries_rows(summaries),
+        **marks,
+    )
+    return len(summaries), counts
+
+
+async def sync_season_full(
+    db: Session,
+    client: OpenLigaDBClient,
+    league: str,
+    season: int,
+    now: dt.datetime,
+    force: bool = False,
+) -> SyncResult:
+    """
+    Полная синхронизация: все матчи сезона одним запросом.
+
+    Если метка getlastchangedate совпадает с сохранённой при прошлой
+    синхронизации, сезон не качаем и в БД не пишем (force отключает проверку).
+
+    Сам сезон всегда перепроверяется в OpenLigaDB (условный GET), а не
+    берётся из кэша: метка покрывает только текущий тур, а полная
+    синхронизация нужна как раз для остальных.
+    """
+    result = SyncResult(league=league, season=season, mode="full")
+
+    last_change = await client.get_season_last_change(league, season)
+
+    if last_change is not None and not force:
+        state = await asyncio.to_thread(get_season_sync_state, db, league, season)
+        if state is not None and state.last_change_at == last_change:
+            result.unchanged_since = last_change
+            result.detail = "Изменений с последней синхронизации нет"
+            return result
+
+    try:
+        _version, raw_matches = await load_season_matches(
+            client, league, season, last_change, revalidate=True
+        )
+    except Exception as exc:
+        raise SyncUpstreamError(str(exc)) from exc
+
+    if not raw_matches:
+        result.detail = "Матчей не найдено"
+        return result
+
+    result.synced, result.counts = await asyncio.to_thread(
+        _upsert, db, league, season, raw_matches, now, last_change_at=last_change, full_sync_at=now
+    )
+    return result
+
+
+async def sync_season_incremental(
+    db: Session,
+    api_client: OpenLigaDBApiClient,
+    league: str,
+    season: int,
+    now: dt.datetime,
+    groups_back: Optional[int] = None,
+    groups_ahead: Optional[int] = None,
+) -> SyncResult:
+    """
+    Инкрементальная синхронизация по турам (groups).
+
+    Берём текущий тур ± несколько соседних, для каждого спрашиваем
+    getlastchangedate и скачиваем только туры, изменившиеся после
+    последней синхронизации. Остальные туры догоняет полная синхронизация.
+    """
+    if groups_back is None:
+        groups_back = settings.sync_groups_back
+    if groups_ahead is None:
+        groups_ahead = settings.sync_groups_ahead
+
+    result = SyncResult(league=league, season=season, mode="incremental", groups=[])
+    state = await asyncio.to_thread(get_season_sync_state, db, league, season)
+    stored = state.last_change_at if state is not None else None
+
+    try:
+        current, available = await asyncio.gather(
+            api_client.get_current_group(league),
+            api_client.get_available_groups(league, season),
+        )
+        current_id = int((current or {}).get("groupOrderID") or 0)
+        candidates = sorted(
+            {
+                int(g["groupOrderID"])
+                for g in available or []
+                if g.get("groupOrderID") is not None
+                and current_id - groups_back <= int(g["groupOrderID"]) <= current_id + groups_ahead
+            }
+        )
+        markers = [
+            parse_last_change_date(raw)
+            for raw in await asyncio.gather(
+                *(api_client.get_last_change_date(league, season, g) for g in candidates)
+            )
+        ]
+        # Без метки (или без прошлой синхронизации) тур считаем изменённым
+        changed = [
+            g
+            for g, marker in zip(candidates, markers)
+            if stored is None or marker is None or marker > stored
+        ]
+        group_matches = await asyncio.gather(
+            *(api_client.get_matchdata_league_season_group(league, season, g) for g in changed)
+        )
+    except Exception as exc:
+        raise SyncUpstreamError(str(exc)) from exc
+
+    if not changed:
+        result.unchanged_since = stored
+        result.detail = "Изменённых туров нет"
+        return result
+
+    raw_matches = [m for matches in group_matches for m in matches or []]
+    newest = max([m for m in markers if m is not None] + ([stored] if stored else []), default=None)
+
+    result.groups = changed
+    result.synced, result.counts = await asyncio.to_thread(
+        _upsert, db, league, season, raw_matches, now, last_change_at=newest
+    )
+    return result
+
+
+async def sync_season(
+    db: Session,
+    client: OpenLigaDBClient,
+    api_client: OpenLigaDBApiClient,
+    league: str,
+    season: int,
+    mode: str = "full",
+    force: bool = False,
+    now: Optional[dt.datetime] = None,
+) -> SyncResult:
+    """
+    Синхронизировать сезон в выбранном режиме.
+
+    auto — инкрементально, но целиком раз в SYNC_FULL_INTERVAL_S
+    (и при первой синхронизации сезона).
+
+    Запросы к БД через db (и классификация перед upsert) идут в отдельном
+    потоке (asyncio.to_thread), как в write-behind: event loop не блокируется.
+    """
+    if mode not in SYNC_MODES:
+        raise ValueError(f"Неизвестный режим синхронизации: {mode}")
+    if now is None:
+        now = dt.datetime.now(dt.timezone.utc)
+    league = league.lower()
+
+    if mode == "auto":
+        if full_sync_due(await asyncio.to_thread(get_season_sync_state, db, league, season), now):
+            # Полная синхронизация по расписанию нужна как раз для туров вне окна,
+            # а метка сезона их не покрывает — поэтому без проверки метки
+            mode, force = "full", True
+        else:
+            mode = "incremental"
+        logger.info("sync-season %s/%s: режим auto -> %s", league, season, mode)
+
+    if mode == "incremental":
+        return await sync_season_incremental(db, api_client, league, season, now)
+    return await sync_season_full(db, client, league, season, now, force=force)
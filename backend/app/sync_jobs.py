@@ -0,0 +1,270 @@
+# app/sync_jobs.py
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.repositories.sync_jobs import get_sync_job_state, prune_sync_jobs, save_sync_job
+from app.sync_scheduler import default_instance_id
+
+logger = logging.getLogger(__name__)
+
+# (db, league, season, mode, force) -> SyncResult.as_dict()
+SyncPairFn = Callable[[Session, str, int, str, bool], Awaitable[Dict[str, Any]]]
+
+
+def _utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+class SyncJobsBusy(Exception):
+    """Все места под задачи заняты незавершёнными задачами."""
+
+
+@dataclass
+class SyncJob:
+    """Массовая синхронизация: набор пар (league, season) и прогресс по ним."""
+
+    id: str
+    pairs: List[Tuple[str, int]]
+    mode: str
+    force: bool
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    synced: int = 0
+    changed: int = 0
+    # Процесс остановили, не все пары выполнены
+    interrupted: bool = False
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.pairs)
+
+    @property
+    def status(self) -> str:
+        if self.interrupted:
+            return "interrupted"
+        if self.finished_at is not None:
+            return "failed" if self.failed == self.total else "finished"
+        return "running" if self.started_at is not None else "queued"
+
+    def as_dict(self, clock: Callable[[], float] = time.monotonic) -> Dict[str, Any]:
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or clock()) - self.started_at
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "mode": self.mode,
+            "total": self.total,
+            "pending": self.total - self.completed - self.failed - self.running,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "synced": self.synced,
+            "changed": self.changed,
+            "elapsed_s": round(elapsed, 3) if elapsed is not None else None,
+            # Пропускная способность: матчей (пришедших из OpenLigaDB) в секунду
+            "matches_per_s": round(self.synced / elapsed, 3) if elapsed else None,
+            "results": list(self.results),
+            "errors": list(self.errors),
+        }
+
+
+class SyncJobManager:
+    """
+    Фоновые задачи массовой синхронизации (POST /api/admin/sync-jobs).
+
+    - submit() сразу возвращает задачу, синхронизация идёт в фоне;
+    - пары (league, season) всех задач выполняются общим пулом
+      из concurrency воркеров (семафор), у каждой пары своя сессия БД;
+    - ошибка одной пары не останавливает остальные — попадает в errors;
+    - храним не больше max_jobs задач: при переполнении вытесняем
+      самые старые завершённые, если таких нет — SyncJobsBusy;
+    - состояние задачи пишется в БД (таблица sync_job) при постановке,
+      после каждой пары и по завершении: status() по job_id работает
+      на любой реплике. Задача выполняется только там, где её поставили;
+      при остановке процесса незавершённые задачи помечаются interrupted.
+    """
+
+    def __init__(
+        self,
+        sync_pair: SyncPairFn,
+        session_factory: Callable[[], Session],
+        concurrency: int = 4,
+        max_jobs: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+        instance_id: Optional[str] = None,
+        wall_clock: Callable[[], dt.datetime] = _utcnow,
+    ) -> None:
+        self._sync_pair = sync_pair
+        self._session_factory = session_factory
+        self.concurrency = concurrency
+        self.max_jobs = max_jobs
+        self._clock = clock
+        self.instance_id = instance_id or default_instance_id()
+        self._wall_clock = wall_clock
+
+        self._jobs: "OrderedDict[str, SyncJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Записи одной задачи в БД — по очереди, чтобы старое состояние не затёрло новое
+        self._persist_locks: Dict[str, asyncio.Lock] = {}
+
+        self.submitted = 0
+        self.evicted = 0
+
+    # ---------- API ----------
+
+    async def submit(
+        self, pairs: Sequence[Tuple[str, int]], mode: str = "full", force: bool = False
+    ) -> SyncJob:
+        self._make_room()
+        job = SyncJob(
+            id=uuid.uuid4().hex,
+            pairs=list(dict.fromkeys((lg.lower(), int(season)) for lg, season in pairs)),
+            mode=mode,
+            force=force,
+            created_at=self._clock(),
+        )
+        self._jobs[job.id] = job
+        # Сохраняем до ответа 202: статус сразу доступен на любой реплике
+        await self._persist(job)
+        self._tasks[job.id] = asyncio.create_task(self._run(job))
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        return self._jobs.get(job_id)
+
+    def describe(self, job: SyncJob) -> Dict[str, Any]:
+        return job.as_dict(self._clock)
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Состояние задачи: своей — из памяти, задачи другой реплики — из БД."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return self.describe(job)
+        return await asyncio.to_thread(self._load_state, job_id)
+
+    async def wait(self, job_id: str) -> None:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await task
+
+    async def stop(self) -> None:
+        """Отменить незавершённые задачи (при остановке процесса)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self._jobs),
+            "active_jobs": len(self._tasks),
+            "max_jobs": self.max_jobs,
+            "concurrency": self.concurrency,
+            "submitted": self.submitted,
+            "evicted": self.evicted,
+        }
+
+    # ---------- внутреннее ----------
+
+    def _make_room(self) -> None:
+        while len(self._jobs) >= self.max_jobs:
+            finished = next((j for j in self._jobs.values() if j.finished_at is not None), None)
+            if finished is None:
+                raise SyncJobsBusy(f"Уже выполняется {len(self._tasks)} задач синхронизации")
+            del self._jobs[finished.id]
+            self.evicted += 1
+
+    async def _run(self, job: SyncJob) -> None:
+        try:
+            await asyncio.gather(*(self._run_pair(job, lg, season) for lg, season in job.pairs))
+        except asyncio.CancelledError:
+            job.interrupted = True
+            raise
+        finally:
+            job.finished_at = self._clock()
+            self._tasks.pop(job.id, None)
+            try:
+                await self._persist(job, final=True)
+            except Exception:
+                logger.exception("sync-job %s: не удалось сохранить итог в БД", job.id)
+            self._persist_locks.pop(job.id, None)
+            logger.info(
+                "sync-job %s: %d/%d пар, %d ошибок, %d матчей",
+                job.id,
+                job.completed,
+                job.total,
+                job.failed,
+                job.synced,
+            )
+
+    async def _run_pair(self, job: SyncJob, league: str, season: int) -> None:
+        async with self._semaphore:
+            if job.started_at is None:
+                job.started_at = self._clock()
+            job.running += 1
+            # Сессия создаётся, откатывается и закрывается в потоке — не в event loop
+            db = await asyncio.to_thread(self._session_factory)
+            try:
+                result = await self._sync_pair(db, league, season, job.mode, job.force)
+            except Exception as exc:
+                await asyncio.to_thread(db.rollback)
+                job.failed += 1
+                job.errors.append(
+                    {"league": league, "season": season, "detail": str(exc) or type(exc).__name__}
+                )
+                logger.warning("sync-job %s: %s/%s не синхронизирован: %s", job.id, league, season, exc)
+            else:
+                job.completed += 1
+                job.synced += result.get("synced", 0)
+                job.changed += result.get("changed", 0)
+                job.results.append(result)
+            finally:
+                job.running -= 1
+                await asyncio.to_thread(db.close)
+            try:
+                await self._persist(job)
+            except Exception:
+                # Прогресс в БД догонит следующая запись; задачу не роняем
+                logger.exception("sync-job %s: не удалось сохранить прогресс в БД", job.id)
+
+    async def _persist(self, job: SyncJob, final: bool = False) -> None:
+        lock = self._persist_locks.setdefault(job.id, asyncio.Lock())
+        async with lock:
+            # Снимок состояния — в цикле событий, запись — в потоке
+            await asyncio.to_thread(self._save, job.id, job.status, self.describe(job), final)
+
+    def _save(self, job_id: str, status: str, state: Dict[str, Any], final: bool) -> None:
+        with self._session_factory() as db:
+            save_sync_job(db, job_id, self.instance_id, status, state, self._wall_clock())
+            if final:
+                prune_sync_jobs(db, keep=self.max_jobs)
+
+    def _load_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._session_factory() as db:
+            return get_sync_job_state(db, job_id)
+
+
+def get_sync_jobs(request: Request) -> Optional[SyncJobManager]:
+    """Dependency: задачи массовой синхронизации из app.state (None без lifespan)."""
+    return getattr(request.app.state, "sync_jobs", None)
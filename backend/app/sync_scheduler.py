@@ -0,0 +1,232 @@
+# app/sync_scheduler.py
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from sqlalchemy.orm import Session
+
+from app.repositories.matches import get_kickoffs_between
+from app.repositories.sync_lock import release_sync_lock, try_acquire_sync_lock
+
+logger = logging.getLogger(__name__)
+
+SyncLeagueFn = Callable[[Session, str], Awaitable[Any]]
+
+LOCK_NAME = "sync-scheduler"
+
+
+def default_instance_id() -> str:
+    """Имя реплики для аренды: в Kubernetes hostname — имя пода."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def next_sync_delay(
+    kickoffs: Iterable[dt.datetime],
+    now: dt.datetime,
+    live_interval_s: float,
+    idle_interval_s: float,
+    match_window_s: float,
+) -> float:
+    """
+    Через сколько секунд синхронизироваться снова.
+
+    - какой-то матч между стартом и финалом (kickoff .. kickoff + match_window_s) —
+      часто, раз в live_interval_s;
+    - иначе — к началу ближайшего матча, но не реже раза в idle_interval_s.
+    """
+    window = dt.timedelta(seconds=match_window_s)
+    upcoming: Optional[dt.datetime] = None
+    for kickoff in kickoffs:
+        if kickoff <= now <= kickoff + window:
+            return live_interval_s
+        if kickoff > now and (upcoming is None or kickoff < upcoming):
+            upcoming = kickoff
+    if upcoming is None:
+        return idle_interval_s
+    until_kickoff = (upcoming - now).total_seconds()
+    return max(live_interval_s, min(idle_interval_s, until_kickoff))
+
+
+def _utcnow() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc)
+
+
+class SyncScheduler:
+    """
+    Фоновая синхронизация сезонов в БД (вместо CronJob с curl).
+
+    - синхронизирует все лиги из списка (режим auto, см. app.sync);
+    - интервал адаптивный (next_sync_delay): часто, пока идут матчи,
+      иначе — спим до ближайшего начала матча или до idle_interval_s;
+    - несколько реплик договариваются через строку sync_lock в БД:
+      синхронизирует та, что взяла аренду, и она же записывает время
+      следующего запуска; остальные до него в OpenLigaDB не ходят;
+      аренда продлевается после каждой лиги, потеряли её — остальные
+      лиги не трогаем.
+    """
+
+    def __init__(
+        self,
+        sync_league: SyncLeagueFn,
+        leagues: Sequence[str],
+        season: int,
+        session_factory: Callable[[], Session],
+        live_interval_s: float = 45.0,
+        idle_interval_s: float = 3 * 3600.0,
+        match_window_s: float = 2.5 * 3600,
+        lock_ttl_s: float = 600.0,
+        instance_id: Optional[str] = None,
+        clock: Callable[[], dt.datetime] = _utcnow,
+    ) -> None:
+        self._sync_league = sync_league
+        self.leagues = [lg.strip().lower() for lg in leagues if lg.strip()]
+        self.season = season
+        self._session_factory = session_factory
+        self.live_interval_s = live_interval_s
+        self.idle_interval_s = idle_interval_s
+        self.match_window_s = match_window_s
+        self.lock_ttl_s = lock_ttl_s
+        self.instance_id = instance_id or default_instance_id()
+        self._clock = clock
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.skipped = 0
+        self.league_errors = 0
+        self.errors = 0
+        self.last_run_at: Optional[dt.datetime] = None
+        self.last_run_ms: Optional[float] = None
+        self.next_run_at: Optional[dt.datetime] = None
+
+    # ---------- API ----------
+
+    async def run_once(self) -> float:
+        """Один шаг планировщика. Возвращает, сколько секунд ждать до следующего."""
+        now = self._clock()
+        acquired, next_run_at = await asyncio.to_thread(self._acquire, now)
+        if not acquired:
+            self.skipped += 1
+            self.next_run_at = next_run_at
+            if next_run_at is None or next_run_at <= now:
+                # Сейчас синхронизирует другая реплика — проверим позже
+                return self.live_interval_s
+            return min((next_run_at - now).total_seconds(), self.idle_interval_s)
+
+        started = time.perf_counter()
+        try:
+            await self._sync_all()
+        finally:
+            self.runs += 1
+            self.last_run_at = now
+            self.last_run_ms = round((time.perf_counter() - started) * 1000, 3)
+
+        finished = self._clock()
+        delay = await asyncio.to_thread(self._plan, finished)
+        self.next_run_at = finished + dt.timedelta(seconds=delay)
+        if not await asyncio.to_thread(self._release, self.next_run_at):
+            logger.warning("Аренду планировщика синхронизации перехватила другая реплика")
+        return delay
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            # Синхронизация может ждать OpenLigaDB — не дожидаемся её;
+            # аренда истечёт сама через lock_ttl_s
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instance_id": self.instance_id,
+            "leagues": self.leagues,
+            "season": self.season,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "league_errors": self.league_errors,
+            "errors": self.errors,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_ms": self.last_run_ms,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+        }
+
+    # ---------- внутреннее ----------
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                delay = await self.run_once()
+            except Exception:
+                # БД недоступна и т.п. — не падаем, попробуем позже
+                self.errors += 1
+                logger.exception("Ошибка планировщика синхронизации")
+                delay = self.live_interval_s
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _sync_all(self) -> None:
+        db = self._session_factory()
+        try:
+            for i, league in enumerate(self.leagues):
+                # Перед каждой следующей лигой продлеваем аренду (её взяли перед первой)
+                if i and not (await asyncio.to_thread(self._acquire, self._clock()))[0]:
+                    logger.warning("Планировщик: аренда потеряна, лиги с %s пропущены", league)
+                    break
+                try:
+                    result = await self._sync_league(db, league)
+                    logger.info("Планировщик: синхронизирован %s/%s: %s", league, self.season, result)
+                except Exception as exc:
+                    # Одна лига не должна останавливать остальные
+                    self.league_errors += 1
+                    db.rollback()
+                    logger.warning(
+                        "Планировщик: не удалось синхронизировать %s/%s: %s", league, self.season, exc
+                    )
+        finally:
+            db.close()
+
+    def _acquire(self, now: dt.datetime) -> Tuple[bool, Optional[dt.datetime]]:
+        with self._session_factory() as db:
+            return try_acquire_sync_lock(db, LOCK_NAME, self.instance_id, now, self.lock_ttl_s)
+
+    def _release(self, next_run_at: dt.datetime) -> bool:
+        with self._session_factory() as db:
+            return release_sync_lock(db, LOCK_NAME, self.instance_id, next_run_at)
+
+    def _plan(self, now: dt.datetime) -> float:
+        window = dt.timedelta(seconds=self.match_window_s)
+        with self._session_factory() as db:
+            kickoffs: List[dt.datetime] = get_kickoffs_between(
+                db,
+                self.leagues,
+                self.season,
+                now - window,
+                now + dt.timedelta(seconds=self.idle_interval_s),
+            )
+        return next_sync_delay(
+            kickoffs, now, self.live_interval_s, self.idle_interval_s, self.match_window_s
+        )
+
+
+def get_sync_scheduler(request: Request) -> Optional[SyncScheduler]:
+    """Dependency: планировщик синхронизации из app.state (None без lifespan или если выключен)."""
+    return getattr(request.app.state, "sync_scheduler", None)
@@ -0,0 +1,188 @@
+# app/write_behind.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+
+from app.schemas.match import MatchSummary
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LeagueSnapshot:
+    """Классифицированные матчи одной лиги/сезона, которые нужно сохранить в БД."""
+
+    league_shortcut: str
+    league_name: str
+    season_year: int
+    matches: Sequence[MatchSummary]
+    # Метка содержимого (версия payload'а + статусы). Если совпадает
+    # с последней успешно записанной для этой лиги/сезона — запись не нужна.
+    content_key: Optional[Hashable] = None
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.league_shortcut.lower(), int(self.season_year)
+
+
+PersistFn = Callable[[List[LeagueSnapshot]], None]
+
+
+class WriteBehindQueue:
+    """
+    Отложенная запись снапшотов лиг в БД вне пути запроса.
+
+    - submit() не блокирует: кладёт снапшот в ограниченную очередь;
+    - для одного (league, season) в очереди держим только последний снапшот
+      (новый заменяет старый — merge);
+    - если очередь заполнена, снапшот новой лиги отбрасывается (drop):
+      следующий просмотр /board пришлёт его снова;
+    - снапшот с тем же content_key, что уже записан в БД, пропускается;
+    - фоновый воркер забирает снапшоты пачками и вызывает persist
+      в отдельном потоке (asyncio.to_thread), не блокируя event loop.
+    """
+
+    def __init__(
+        self,
+        persist: PersistFn,
+        max_pending: int = 32,
+        batch_size: int = 8,
+        flush_interval_s: float = 2.0,
+    ) -> None:
+        self._persist = persist
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+
+        self._pending: "OrderedDict[Tuple[str, int], LeagueSnapshot]" = OrderedDict()
+        # (league, season) -> content_key последней успешной записи
+        self._persisted: Dict[Tuple[str, int], Hashable] = {}
+        self._wakeup = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.merged = 0
+        self.dropped = 0
+        self.skipped_unchanged = 0
+        self.flushes = 0
+        self.flushed_snapshots = 0
+        self.flush_errors = 0
+        self.last_flush_ms: Optional[float] = None
+        self.max_flush_ms: Optional[float] = None
+        self._total_flush_ms = 0.0
+
+    # ---------- API ----------
+
+    def submit(self, snapshot: LeagueSnapshot) -> bool:
+        """Поставить снапшот в очередь. False — снапшот отброшен (очередь полна)."""
+        key = snapshot.key
+        if snapshot.content_key is not None and self._persisted.get(key) == snapshot.content_key:
+            if key in self._pending:
+                # В очереди более новый по времени, но уже неактуальный снапшот
+                del self._pending[key]
+            self.skipped_unchanged += 1
+            return True
+
+        if key in self._pending:
+            self._pending[key] = snapshot
+            self.merged += 1
+        elif len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        else:
+            self._pending[key] = snapshot
+
+        self.submitted += 1
+        self._wakeup.set()
+        return True
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить воркер, дописав всё, что осталось в очереди."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        while self._pending:
+            await self._flush_once()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "skipped_unchanged": self.skipped_unchanged,
+            "flushes": self.flushes,
+            "flushed_snapshots": self.flushed_snapshots,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": self.last_flush_ms,
+            "max_flush_ms": self.max_flush_ms,
+            "avg_flush_ms": (
+                round(self._total_flush_ms / self.flushes, 3) if self.flushes else None
+            ),
+        }
+
+    # ---------- внутреннее ----------
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Небольшая пауза, чтобы накопить пачку и схлопнуть повторы;
+            # stop() прерывает её, остаток дописывается там же.
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.flush_interval_s)
+                break
+            except asyncio.TimeoutError:
+                pass
+            while self._pending and not self._stop.is_set():
+                await self._flush_once()
+
+    async def _flush_once(self) -> None:
+        batch: List[LeagueSnapshot] = []
+        while self._pending and len(batch) < self.batch_size:
+            _key, snapshot = self._pending.popitem(last=False)
+            batch.append(snapshot)
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self._persist, batch)
+            for snapshot in batch:
+                if snapshot.content_key is not None:
+                    self._persisted[snapshot.key] = snapshot.content_key
+        except Exception as exc:
+            self.flush_errors += 1
+            logger.exception("Ошибка отложенной записи %d снапшотов в БД: %s", len(batch), exc)
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.flushes += 1
+            self.flushed_snapshots += len(batch)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms or 0.0, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+
+
+def get_board_writer(request: Request) -> Optional[WriteBehindQueue]:
+    """Dependency: очередь отложенной записи из app.state (None без lifespan)."""
+    return getattr(request.app.state, "board_writer", None)
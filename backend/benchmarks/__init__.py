@@ -0,0 +1 @@
+# benchmarks: микробенчмарки горячих путей backend (запуск из каталога backend)
@@ -0,0 +1,86 @@
+# benchmarks/bench_classify.py
+"""
+Классификация сезона: classify_match на каждый матч vs classify_matches.
+
+Запуск (из каталога backend):
+    python -m benchmarks.bench_classify [--matches 306] [--repeat 200]
+
+Меряем процессорное время (time.process_time) на один сезон:
+- per_match: [classify_match(m, now) ...] + model_dump(mode="json") на каждый,
+  как раньше делали /board, /archive/matches и admin sync;
+- batch: classify_matches(season, now) + match_summaries_rows одним вызовом.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import time
+from typing import Callable
+
+from app.schemas.match import classify_match, classify_matches
+from app.serialization import match_summaries_rows
+
+
+def make_raw_season(n: int) -> list[dict]:
+    start = dt.datetime(2024, 8, 23, 18, 30, tzinfo=dt.timezone.utc)
+    return [
+        {
+            "matchID": 70000 + i,
+            "leagueShortcut": "bl1",
+            "leagueSeason": 2024,
+            # 9 матчей тура в несколько слотов по времени, как в настоящем сезоне
+            "matchDateTimeUTC": (start + dt.timedelta(days=7 * (i // 9), hours=2 * (i % 3))).isoformat(),
+            "matchIsFinished": i < n // 2,
+            "group": {"groupOrderID": 1 + i // 9},
+            "team1": {"teamName": f"Heimmannschaft {i % 18}"},
+            "team2": {"teamName": f"Gastmannschaft {(i + 7) % 18}"},
+            "matchResults": [
+                {"resultTypeID": 1, "pointsTeam1": i % 2, "pointsTeam2": 0},
+                {"resultTypeID": 2, "pointsTeam1": i % 4, "pointsTeam2": i % 3},
+            ],
+        }
+        for i in range(n)
+    ]
+
+
+def cpu_ms(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # прогрев
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=306, help="матчей в сезоне (bl1: 306)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    season = make_raw_season(args.matches)
+    now = dt.datetime(2024, 12, 1, 12, 0, tzinfo=dt.timezone.utc)
+
+    def per_match() -> list:
+        return [classify_match(m, now).model_dump(mode="json") for m in season]
+
+    def batch() -> list:
+        return match_summaries_rows(classify_matches(season, now))
+
+    assert per_match() == batch()
+
+    results = {
+        "per_match_ms": cpu_ms(per_match, args.repeat),
+        "batch_ms": cpu_ms(batch, args.repeat),
+        "classify_match_only_ms": cpu_ms(lambda: [classify_match(m, now) for m in season], args.repeat),
+        "classify_matches_only_ms": cpu_ms(lambda: classify_matches(season, now), args.repeat),
+    }
+
+    print(f"Сезон: {args.matches} матчей, {args.repeat} повторов, CPU на один сезон")
+    for name, value in results.items():
+        print(f"  {name:<26} {value:8.3f} ms")
+    print(f"  {'matches_per_s (batch)':<26} {args.matches / results['batch_ms'] * 1000:8.0f} "
+          f"(x{results['per_match_ms'] / results['batch_ms']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# benchmarks/bench_season_parse.py
+"""
+Разбор payload'а /getmatchdata за сезон: resp.json() vs потоковый разбор.
+
+Запуск (из каталога backend):
+    python -m benchmarks.bench_season_parse [--matches 306] [--chunk-kb 64] [--repeat 20]
+
+Payload похож на настоящий OpenLigaDB (голы, стадион, иконки команд).
+Для каждого способа меряем:
+- peak_kb — пик памяти во время разбора (tracemalloc), включая само тело;
+- retained_kb — сколько занимает результат, который дальше лежит в кэше сезонов;
+- ms — время разбора одного сезона.
+
+resp.json(): тело целиком (как его буферизует httpx) + json.loads всех объектов.
+stream: куски по --chunk-kb, iter_json_array + slim_match по одному матчу.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import time
+import tracemalloc
+from typing import Any, AsyncIterator, Callable, List
+
+from app.json_stream import iter_json_array
+from app.openligadb_client import slim_match
+from app.schemas.match import classify_match
+
+
+def make_payload(n: int) -> bytes:
+    start = dt.datetime(2024, 8, 23, 18, 30, tzinfo=dt.timezone.utc)
+    matches = []
+    for i in range(n):
+        kickoff = start + dt.timedelta(hours=8 * i)
+        goals = [
+            {
+                "goalID": 100000 + i * 10 + g,
+                "scoreTeam1": g // 2 + 1,
+                "scoreTeam2": g // 2,
+                "matchMinute": 10 + g * 17,
+                "goalGetterID": 2000 + g,
+                "goalGetterName": f"Torschütze {g}",
+                "isPenalty": False,
+                "isOwnGoal": False,
+                "isOvertime": False,
+                "comment": None,
+            }
+            for g in range(i % 5)
+        ]
+        matches.append(
+            {
+                "matchID": 70000 + i,
+                "matchDateTime": kickoff.replace(tzinfo=None).isoformat(),
+                "timeZoneID": "W. Europe Standard Time",
+                "leagueId": 4741,
+                "leagueName": "1. Fußball-Bundesliga 2024/2025",
+                "leagueSeason": 2024,
+                "leagueShortcut": "bl1",
+                "matchDateTimeUTC": kickoff.isoformat().replace("+00:00", "Z"),
+                "group": {"groupName": f"{1 + i // 9}. Spieltag", "groupOrderID": 1 + i // 9, "groupID": 46000 + i // 9},
+                "team1": {
+                    "teamId": i % 18,
+                    "teamName": f"Heimmannschaft {i % 18}",
+                    "shortName": f"Heim {i % 18}",
+                    "teamIconUrl": f"https://upload.wikimedia.org/wikipedia/commons/thumb/{i % 18}/logo.svg.png",
+                    "teamGroupName": None,
+                },
+                "team2": {
+                    "teamId": (i + 7) % 18,
+                    "teamName": f"Gastmannschaft {(i + 7) % 18}",
+                    "shortName": f"Gast {(i + 7) % 18}",
+                    "teamIconUrl": f"https://upload.wikimedia.org/wikipedia/commons/thumb/{(i + 7) % 18}/logo.svg.png",
+                    "teamGroupName": None,
+                },
+                "lastUpdateDateTime": kickoff.replace(tzinfo=None).isoformat(),
+                "matchIsFinished": True,
+                "matchResults": [
+                    {
+                        "resultID": 1000 + i * 2 + r,
+                        "resultName": name,
+                        "pointsTeam1": i % 4 - r,
+                        "pointsTeam2": i % 3,
+                        "resultOrderID": r + 1,
+                        "resultTypeID": r + 1,
+                        "resultDescription": f"Ergebnis {name}",
+                    }
+                    for r, name in enumerate(("Halbzeit", "Endergebnis"))
+                ],
+                "goals": goals,
+                "location": {"locationID": 100 + i % 18, "locationCity": f"Stadt {i % 18}", "locationStadium": f"Arena {i % 18}"},
+                "numberOfViewers": 30000 + i * 37,
+            }
+        )
+    return json.dumps(matches, ensure_ascii=False).encode()
+
+
+def via_resp_json(chunks: List[bytes]) -> List[Any]:
+    body = b"".join(chunks)  # httpx буферизует тело целиком
+    return json.loads(body)
+
+
+def via_stream(chunks: List[bytes]) -> List[Any]:
+    async def network() -> AsyncIterator[bytes]:
+        for chunk in chunks:
+            yield chunk
+
+    async def collect() -> List[Any]:
+        return [m async for m in iter_json_array(network(), slim_match)]
+
+    return asyncio.run(collect())
+
+
+def measure(fn: Callable[[List[bytes]], List[Any]], chunks: List[bytes], repeat: int) -> dict:
+    fn(chunks)  # прогрев
+    tracemalloc.start()
+    result = fn(chunks)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(chunks)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+    return {"peak_kb": peak / 1024, "retained_kb": retained / 1024, "ms": elapsed_ms, "result": result}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=306, help="матчей в сезоне (bl1: 306)")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="размер куска из сети, КБ")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = make_payload(args.matches)
+    size = args.chunk_kb * 1024
+    chunks = [body[i : i + size] for i in range(0, len(body), size)]
+
+    full = measure(via_resp_json, chunks, args.repeat)
+    stream = measure(via_stream, chunks, args.repeat)
+
+    # Оба пути дают одинаковые MatchSummary
+    now = dt.datetime(2025, 6, 1, tzinfo=dt.timezone.utc)
+    assert [classify_match(m, now) for m in full["result"]] == [
+        classify_match(m, now) for m in stream["result"]
+    ]
+
+    print(f"Сезон: {args.matches} матчей, тело {len(body) / 1024:.0f} КБ, куски по {args.chunk_kb} КБ")
+    print(f"  {'':<12} {'peak_kb':>10} {'retained_kb':>12} {'ms':>8}")
+    for name, r in (("resp.json()", full), ("stream", stream)):
+        print(f"  {name:<12} {r['peak_kb']:10.0f} {r['retained_kb']:12.0f} {r['ms']:8.2f}")
+    print(f"  peak x{full['peak_kb'] / stream['peak_kb']:.1f}, "
+          f"retained x{full['retained_kb'] / stream['retained_kb']:.1f} меньше")
+
+
+if __name__ == "__main__":
+    main()
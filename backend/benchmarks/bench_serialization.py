@@ -0,0 +1,114 @@
+# benchmarks/bench_serialization.py
+"""
+Сериализация ответа с целым сезоном: response_model vs быстрый путь.
+
+Запуск (из каталога backend):
+    python -m benchmarks.bench_serialization [--matches 306] [--repeat 200]
+
+Меряем процессорное время (time.process_time) на один ответ:
+- response_model: как FastAPI — валидация списка по response_model,
+  сериализация в python-объекты, json.dumps в JSONResponse;
+- fast path: TypeAdapter(List[MatchSummary]).dump_json одним проходом;
+- сжатие готового тела gzip (и brotli, если установлен).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gzip
+import json
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.compression import brotli
+from app.schemas.match import MatchSummary, classify_match
+from app.serialization import match_summaries_json
+
+
+def make_season(n: int) -> List[MatchSummary]:
+    start = dt.datetime(2024, 8, 23, 18, 30, tzinfo=dt.timezone.utc)
+    now = dt.datetime(2025, 6, 1, tzinfo=dt.timezone.utc)
+    raw = [
+        {
+            "matchID": 70000 + i,
+            "leagueShortcut": "bl1",
+            "leagueSeason": 2024,
+            "matchDateTimeUTC": (start + dt.timedelta(hours=8 * i)).isoformat(),
+            "matchIsFinished": True,
+            "group": {"groupOrderID": 1 + i // 9},
+            "team1": {"teamName": f"Heimmannschaft {i % 18}"},
+            "team2": {"teamName": f"Gastmannschaft {(i + 7) % 18}"},
+            "matchResults": [{"resultTypeID": 2, "pointsTeam1": i % 4, "pointsTeam2": i % 3}],
+        }
+        for i in range(n)
+    ]
+    return [classify_match(m, now) for m in raw]
+
+
+def cpu_ms(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # прогрев
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=306, help="матчей в сезоне (bl1: 306)")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    matches = make_season(args.matches)
+    field = create_model_field(name="Response", type_=List[MatchSummary], mode="serialization")
+
+    async def via_response_model() -> bytes:
+        content = await serialize_response(field=field, response_content=matches, is_coroutine=True)
+        return JSONResponse(content).body
+
+    def response_model_path() -> bytes:
+        coro = via_response_model()
+        try:
+            coro.send(None)
+        except StopIteration as stop:  # внутри нет реального ожидания
+            return stop.value
+        raise RuntimeError("serialize_response неожиданно ушёл в ожидание")
+
+    def legacy_model_dump_path() -> bytes:
+        # Старый /matches-стиль: model_dump() на каждый матч + jsonable_encoder
+        return JSONResponse(jsonable_encoder([m.model_dump() for m in matches])).body
+
+    def fast_path() -> bytes:
+        return match_summaries_json(matches)
+
+    body = fast_path()
+    assert json.loads(body) == json.loads(response_model_path())
+
+    results = {
+        "response_model_ms": cpu_ms(response_model_path, args.repeat),
+        "model_dump_jsonable_ms": cpu_ms(legacy_model_dump_path, args.repeat),
+        "fast_path_ms": cpu_ms(fast_path, args.repeat),
+        "gzip_ms": cpu_ms(lambda: gzip.compress(body, compresslevel=6, mtime=0), args.repeat),
+    }
+    sizes = {"body_bytes": len(body), "gzip_bytes": len(gzip.compress(body, 6, mtime=0))}
+    if brotli is not None:
+        results["brotli_ms"] = cpu_ms(lambda: brotli.compress(body, quality=5), args.repeat)
+        sizes["brotli_bytes"] = len(brotli.compress(body, quality=5))
+
+    print(f"Сезон: {args.matches} матчей, {args.repeat} повторов, CPU на один ответ")
+    for name, value in results.items():
+        print(f"  {name:<24} {value:8.3f} ms")
+    saved = results["response_model_ms"] - results["fast_path_ms"]
+    print(f"  {'saved_per_request_ms':<24} {saved:8.3f} ms "
+          f"(x{results['response_model_ms'] / results['fast_path_ms']:.1f})")
+    for name, value in sizes.items():
+        print(f"  {name:<24} {value:8d}")
+
+
+if __name__ == "__main__":
+    main()
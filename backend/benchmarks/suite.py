@@ -0,0 +1,286 @@
+# benchmarks/suite.py
+"""
+Набор бенчмарков горячих путей backend'а, без сети и внешних сервисов.
+
+Запуск (из каталога backend):
+    python -m benchmarks.suite [--matches 306] [--leagues 4] [--seasons 5] [--repeat 20]
+                               [--output results.json] [--compare old.json]
+                               [--postgres-url postgresql://...]
+
+Что меряем (время на одну операцию, медиана и минимум из --repeat):
+- classify: classify_match на каждый матч сезона и classify_matches;
+- board: build_board по --leagues лигам из готовых снапшотов
+  (warm — индекс kickoff уже построен, cold — новый снапшот);
+- upsert_*: bulk_upsert_matches_from_board в SQLite (и в Postgres, если
+  передан --postgres-url или BENCH_POSTGRES_URL; база должна быть пустой
+  и не нужной — в неё пишутся таблицы и данные бенчмарка);
+- archive_*: list_archive_matches на первой, средней и последней странице
+  (OFFSET) и та же глубина по cursor;
+- archive_json: сериализация ответа /archive (200 матчей).
+
+Данные синтетические: --seasons сезонов по --matches матчей.
+Результат — JSON (--output, по умолчанию в stdout после таблицы);
+--compare печатает отношение к результатам прошлого запуска.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+
+# Как в тестах: app.db не должен смотреть на настоящий Postgres
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='sporthub-bench-')}/app.db")
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Base
+from app.repositories.matches import bulk_upsert_matches_from_board, list_archive_matches
+from app.schemas.match import ArchiveMatchesResponse, classify_match, classify_matches
+from app.season_cache import SeasonSnapshot
+from app.serialization import match_summaries_rows, model_json
+from app.sports_api import build_board
+from benchmarks.bench_classify import make_raw_season
+
+NOW = dt.datetime(2024, 12, 1, 12, 0, tzinfo=dt.timezone.utc)
+PAGE_SIZE = 50
+
+
+def timeit(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    fn()  # прогрев
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "repeat": repeat,
+    }
+
+
+class SnapshotClient:
+    """Клиент OpenLigaDB поверх готовых снапшотов: /board без сети."""
+
+    def __init__(self, snapshots: Dict[str, SeasonSnapshot]) -> None:
+        self.snapshots = snapshots
+
+    async def get_season_snapshot(
+        self, league: str, season: int, last_change=None, revalidate: bool = False
+    ) -> SeasonSnapshot:
+        return self.snapshots[league]
+
+
+def bench_classify(season: List[dict], repeat: int) -> Dict[str, Any]:
+    return {
+        "classify_match_season": timeit(lambda: [classify_match(m, NOW) for m in season], repeat),
+        "classify_matches_season": timeit(lambda: classify_matches(season, NOW), repeat),
+    }
+
+
+def season_around_now(season: List[dict]) -> List[dict]:
+    """
+    Тот же сезон, сдвинутый так, что его середина — сейчас: build_board
+    берёт текущее время, и на доске должны быть обычные recent/live/upcoming.
+    """
+    now = dt.datetime.now(dt.timezone.utc)
+    middle = dt.datetime.fromisoformat(season[len(season) // 2]["matchDateTimeUTC"])
+    shifted = []
+    for m in season:
+        kickoff = dt.datetime.fromisoformat(m["matchDateTimeUTC"]) + (now - middle)
+        shifted.append(
+            dict(m, matchDateTimeUTC=kickoff.isoformat(), matchIsFinished=kickoff < now - dt.timedelta(hours=2))
+        )
+    return shifted
+
+
+def bench_board(season: List[dict], leagues: int, repeat: int) -> Dict[str, Any]:
+    names = [f"l{i}" for i in range(leagues)]
+    season = season_around_now(season)
+    warm = SnapshotClient({lg: SeasonSnapshot(league=lg, season=2024, raw=season) for lg in names})
+
+    def run(client: SnapshotClient) -> None:
+        asyncio.run(build_board(client, names, 2024, back=2, ahead=7))
+
+    def run_cold() -> None:
+        run(SnapshotClient({lg: SeasonSnapshot(league=lg, season=2024, raw=season) for lg in names}))
+
+    return {
+        f"board_{leagues}_leagues_warm": timeit(lambda: run(warm), repeat),
+        f"board_{leagues}_leagues_cold": timeit(run_cold, repeat),
+    }
+
+
+def bench_upsert(url: str, rows: List[dict], seasons: int, repeat: int, prefix: str) -> Dict[str, Any]:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    years = iter(range(3000, 100000))
+    flipped = [dict(r, status="LIVE" if r["status"] != "LIVE" else "FINISHED") for r in rows]
+    toggle = {"rows": rows}
+
+    def upsert(db: Session, year: int, data: List[dict]) -> None:
+        bulk_upsert_matches_from_board(
+            db=db, league_shortcut="bench", league_name="bench", season_year=year, matches=data
+        )
+
+    def update(db: Session) -> None:
+        toggle["rows"] = flipped if toggle["rows"] is rows else rows
+        upsert(db, 2000, toggle["rows"])
+
+    db = factory()
+    try:
+        for year in range(2000, 2000 + seasons):
+            upsert(db, year, rows)
+        results = {
+            f"{prefix}_insert_season": timeit(lambda: upsert(db, next(years), rows), repeat),
+            f"{prefix}_unchanged_season": timeit(lambda: upsert(db, 2000, rows), repeat),
+            f"{prefix}_update_season": timeit(lambda: update(db), repeat),
+        }
+    finally:
+        db.close()
+        engine.dispose()
+    return results
+
+
+def bench_archive(url: str, rows: List[dict], seasons: int, repeat: int) -> Dict[str, Any]:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    results: Dict[str, Any] = {}
+    try:
+        for year in range(2000, 2000 + seasons):
+            bulk_upsert_matches_from_board(
+                db=db, league_shortcut="arch", league_name="arch", season_year=year, matches=rows
+            )
+
+        def page(number: int, cursor: Optional[str] = None):
+            return list_archive_matches(
+                db, "arch", None, None, None, None, number, PAGE_SIZE, cursor=cursor, include_total=cursor is None
+            )
+
+        total = page(1)[0] or 0
+        last = max(1, -(-total // PAGE_SIZE))
+        depths = {"first": 1, "middle": max(1, last // 2), "last": last}
+        # Курсоры, ведущие на нужную глубину: один проход по страницам
+        cursors: Dict[int, Optional[str]] = {1: None}
+        for number in range(1, last):
+            cursors[number + 1] = page(number, cursors[number])[2]
+
+        for name, number in depths.items():
+            results[f"archive_offset_{name}_page"] = timeit(lambda n=number: page(n), repeat)
+            results[f"archive_cursor_{name}_page"] = timeit(lambda n=number: page(n, cursors[n]), repeat)
+        results["archive_pages"] = {"total_matches": total, "pages": last, "page_size": PAGE_SIZE}
+
+        _, items, _ = list_archive_matches(db, "arch", None, None, None, None, 1, 200, include_total=False)
+        body = ArchiveMatchesResponse(page=1, page_size=200, total=total, items=items)
+        results["archive_json_model_json"] = timeit(lambda: model_json(body), repeat)
+        results["archive_json_jsonable_encoder"] = timeit(
+            lambda: json.dumps(jsonable_encoder(body)).encode(), repeat
+        )
+    finally:
+        db.close()
+        engine.dispose()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5, check=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suite(
+    matches: int = 306,
+    leagues: int = 4,
+    seasons: int = 5,
+    repeat: int = 20,
+    postgres_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Прогнать все бенчмарки; результат — словарь, готовый к json.dumps."""
+    season = make_raw_season(matches)
+    rows = match_summaries_rows(classify_matches(season, NOW))
+
+    results: Dict[str, Any] = {}
+    results.update(bench_classify(season, repeat))
+    results.update(bench_board(season, leagues, repeat))
+
+    with tempfile.TemporaryDirectory(prefix="sporthub-bench-") as tmp:
+        results.update(bench_upsert(f"sqlite:///{tmp}/upsert.db", rows, seasons, repeat, "upsert_sqlite"))
+        results.update(bench_archive(f"sqlite:///{tmp}/archive.db", rows, seasons, repeat))
+    if postgres_url:
+        results.update(bench_upsert(postgres_url, rows, seasons, repeat, "upsert_postgres"))
+    else:
+        results["upsert_postgres"] = {"skipped": "нет --postgres-url / BENCH_POSTGRES_URL"}
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "params": {"matches": matches, "leagues": leagues, "seasons": seasons, "repeat": repeat},
+        },
+        "results": results,
+    }
+
+
+def _print_table(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    old = (baseline or {}).get("results", {})
+    print(f"commit {report['meta']['commit']}, {report['meta']['params']}", file=sys.stderr)
+    if baseline and baseline["meta"].get("params") != report["meta"]["params"]:
+        print(f"  внимание: параметры сравнения другие: {baseline['meta'].get('params')}", file=sys.stderr)
+    for name, value in report["results"].items():
+        if "median_ms" not in value:
+            print(f"  {name:<36} {value}", file=sys.stderr)
+            continue
+        line = f"  {name:<36} {value['median_ms']:10.3f} ms  (min {value['min_ms']:.3f})"
+        previous = old.get(name, {}).get("median_ms")
+        if previous:
+            line += f"  x{value['median_ms'] / previous:.2f} к {baseline['meta'].get('commit')}"
+        print(line, file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--matches", type=int, default=306, help="матчей в сезоне (bl1: 306)")
+    parser.add_argument("--leagues", type=int, default=4, help="лиг на /board")
+    parser.add_argument("--seasons", type=int, default=5, help="сезонов в БД для архива")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="куда записать JSON (по умолчанию stdout)")
+    parser.add_argument("--compare", help="JSON прошлого запуска для сравнения")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"))
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.matches, args.leagues, args.seasons, args.repeat, args.postgres_url)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    _print_table(report, baseline)
+
+    body = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(body + "\n")
+    else:
+        print(body)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""indexes for archive queries
+
+Revision ID: 5f0a3c2e91b4
+Revises: bca578505d70
+Create Date: 2026-10-16 11:40:05.118472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0a3c2e91b4'
+down_revision: Union[str, Sequence[str], None] = 'bca578505d70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # season по (league_id, year): фильтр архива по сезону и метаданные архива
+    op.create_index('ix_season_league_id_year', 'season', ['league_id', 'year'])
+    # архив лиги, новые матчи первыми: WHERE league_id ORDER BY kickoff_utc DESC, id DESC
+    # (id — для keyset-пагинации по (kickoff_utc, id))
+    op.create_index(
+        'ix_match_league_id_kickoff_utc',
+        'match',
+        ['league_id', sa.text('kickoff_utc DESC'), sa.text('id DESC')],
+    )
+    # архив конкретного сезона (+ диапазон дат)
+    op.create_index('ix_match_season_id_kickoff_utc', 'match', ['season_id', 'kickoff_utc', 'id'])
+    # архив лиги с фильтром по статусу
+    op.create_index(
+        'ix_match_league_id_status_kickoff_utc',
+        'match',
+        ['league_id', 'status', 'kickoff_utc', 'id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_match_league_id_status_kickoff_utc', table_name='match')
+    op.drop_index('ix_match_season_id_kickoff_utc', table_name='match')
+    op.drop_index('ix_match_league_id_kickoff_utc', table_name='match')
+    op.drop_index('ix_season_league_id_year', table_name='season')
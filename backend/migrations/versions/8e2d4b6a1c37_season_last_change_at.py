@@ -0,0 +1,29 @@
+"""season last_change_at column
+
+Revision ID: 8e2d4b6a1c37
+Revises: 5f0a3c2e91b4
+Create Date: 2026-10-16 14:20:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4b6a1c37'
+down_revision: Union[str, Sequence[str], None] = '5f0a3c2e91b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL — сезон ещё не синхронизировался с меткой, первый sync качает его целиком.
+    op.add_column('season', sa.Column('last_change_at', sa.DateTime(timezone=False), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('season', 'last_change_at')
@@ -0,0 +1,38 @@
+"""sync_job table
+
+Revision ID: 9c4e1a7b3f60
+Revises: e6d18c4b7f25
+Create Date: 2026-10-16 12:40:21.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1a7b3f60'
+down_revision: Union[str, Sequence[str], None] = 'e6d18c4b7f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Задачи массовой синхронизации: статус видят все реплики.
+    op.create_table(
+        'sync_job',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('holder', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sync_job')
@@ -0,0 +1,36 @@
+"""sync_lock table for the sync scheduler
+
+Revision ID: a3b9e2f61d04
+Revises: c41f7e9d2a58
+Create Date: 2026-10-16 22:05:37.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3b9e2f61d04'
+down_revision: Union[str, Sequence[str], None] = 'c41f7e9d2a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Одна строка на планировщик: аренда (holder, locked_until) и время следующего запуска.
+    op.create_table(
+        'sync_lock',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('holder', sa.String(), nullable=True),
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('next_run_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sync_lock')
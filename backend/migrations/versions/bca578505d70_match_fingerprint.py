@@ -0,0 +1,30 @@
+"""match fingerprint column
+
+Revision ID: bca578505d70
+Revises: d7c36b711bc8
+Create Date: 2026-10-16 11:02:17.330918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bca578505d70'
+down_revision: Union[str, Sequence[str], None] = 'd7c36b711bc8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Без backfill: у старых строк fingerprint NULL, ближайший sync
+    # перепишет их один раз и проставит отпечаток.
+    op.add_column('match', sa.Column('fingerprint', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('match', 'fingerprint')
@@ -0,0 +1,29 @@
+"""season last_full_sync_at column
+
+Revision ID: c41f7e9d2a58
+Revises: 8e2d4b6a1c37
+Create Date: 2026-10-16 15:02:09.541377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7e9d2a58'
+down_revision: Union[str, Sequence[str], None] = '8e2d4b6a1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL — полной синхронизации ещё не было, режим auto начнёт с неё.
+    op.add_column('season', sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('season', 'last_full_sync_at')
@@ -0,0 +1,46 @@
+"""match unique (season_id, external_match_id)
+
+Revision ID: d7c36b711bc8
+Revises: fbe3c5a7608f
+Create Date: 2026-10-16 10:12:41.512204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7c36b711bc8'
+down_revision: Union[str, Sequence[str], None] = 'fbe3c5a7608f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Старый upsert (SELECT, потом INSERT) мог наплодить дубли при гонках —
+    # оставляем по одной строке (с максимальным id) на (season_id, external_match_id).
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM match
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM match GROUP BY season_id, external_match_id
+            )
+            """
+        )
+    )
+    # batch: SQLite не умеет ALTER TABLE ADD CONSTRAINT — Alembic пересоздаст таблицу
+    with op.batch_alter_table('match') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_match_season_external_match_id',
+            ['season_id', 'external_match_id'],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('match') as batch_op:
+        batch_op.drop_constraint('uq_match_season_external_match_id', type_='unique')
@@ -0,0 +1,41 @@
+"""backfill_checkpoint table
+
+Revision ID: e6d18c4b7f25
+Revises: a3b9e2f61d04
+Create Date: 2026-10-16 23:12:48.306519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6d18c4b7f25'
+down_revision: Union[str, Sequence[str], None] = 'a3b9e2f61d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Одна строка на (лига, сезон): докуда дошла загрузка архива.
+    op.create_table(
+        'backfill_checkpoint',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('league_shortcut', sa.String(), nullable=False),
+        sa.Column('season_year', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('matches_written', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('league_shortcut', 'season_year', name='uq_backfill_checkpoint_league_season'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('backfill_checkpoint')
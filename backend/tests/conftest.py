@@ -1,15 +1,35 @@
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 # Ensure the backend package is importable when tests are run from the repository root.
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+# Tests must never reach the real Postgres: point the app at a throwaway SQLite file.
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{tempfile.mkdtemp(prefix='sporthub-tests-')}/sporthub.db",
+)
+# Background workers that call the real OpenLigaDB stay off; tests drive them directly.
+os.environ.setdefault("BOARD_MATERIALIZER_ENABLED", "false")
+os.environ.setdefault("SYNC_SCHEDULER_ENABLED", "false")
+
+from app.db import async_database_url, engine
 from app.main import app
+from app.models import Base
+from app.repositories.matches import invalidate_archive_meta_cache
+
+Base.metadata.create_all(engine)
 
 
 @pytest.fixture
@@ -33,3 +53,42 @@ def dummy_db():
             pass
 
     yield DummySession()
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'sporthub.db'}"
+
+
+@pytest.fixture
+def db_session(db_url):
+    """A fresh SQLite database with the full schema, one per test."""
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    # The archive metadata cache is process-wide; a new database must not see stale entries.
+    invalidate_archive_meta_cache()
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def async_db_factory(db_session, db_url):
+    """Async sessions (aiosqlite) over the same database file as ``db_session``."""
+    engine = create_async_engine(async_database_url(db_url), poolclass=NullPool)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    engine.sync_engine.dispose()
+
+
+@pytest.fixture
+def async_db(async_db_factory):
+    """Override for ``get_async_db`` bound to the test database."""
+
+    async def override():
+        async with async_db_factory() as session:
+            yield session
+
+    return override
@@ -1,10 +1,16 @@
+import asyncio
 import datetime as dt
 
+from fastapi.testclient import TestClient
+
 from app import config as cfg
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.main import app
 from app.openligadb_client import Match
-from app.sports_api import get_client
+from app.schemas.match import classify_match
+from app.season_cache import SeasonSnapshot
+from app.sports_api import BoardResponse, get_client
+from app.write_behind import get_board_writer
 
 
 class StubOpenLigaClient:
@@ -33,6 +39,13 @@ class StubOpenLigaClient:
         self.calls.append(("get_season_raw", league, season))
         return self._season_raw
 
+    async def get_season_snapshot(self, league, season, last_change=None, revalidate=False):
+        # Как у настоящего клиента, только без кэша: каждый раз новый снапшот
+        return SeasonSnapshot(league=league, season=season, raw=await self.get_season_raw(league, season))
+
+    async def get_season_last_change(self, league, season):
+        return None
+
 
 def test_health_returns_ok(client):
     response = client.get("/health")
@@ -40,6 +53,22 @@ def test_health_returns_ok(client):
     assert response.json() == {"status": "ok"}
 
 
+def test_lifespan_opens_and_closes_shared_http_client(app_client):
+    with TestClient(app_client):
+        http_client = app_client.state.http_client
+        assert not http_client.is_closed
+
+    assert http_client.is_closed
+
+
+def test_get_client_reuses_shared_http_client(client):
+    shared = client.app.state.http_client
+
+    openliga_client = asyncio.run(get_client(http_client=shared, season_cache=None))
+
+    assert openliga_client._http is shared
+
+
 def test_root_returns_message(client):
     response = client.get("/")
 
@@ -331,6 +360,93 @@ def test_board_returns_502_on_client_failure(client, dummy_db):
     assert "OpenLigaDB" in response.json()["detail"]
 
 
+def test_board_hands_league_snapshots_to_write_behind(client):
+    now = dt.datetime.now(dt.timezone.utc)
+    stub_client = StubOpenLigaClient(
+        season_raw=[
+            {
+                "matchID": 5,
+                "leagueShortcut": "bl1",
+                "leagueSeason": 2024,
+                "matchDateTimeUTC": (now + dt.timedelta(days=2)).isoformat(),
+                "matchIsFinished": False,
+                "group": {"groupOrderID": 2},
+                "team1": {"teamName": "Home"},
+                "team2": {"teamName": "Away"},
+                "matchResults": [],
+            }
+        ]
+    )
+
+    class RecordingWriter:
+        def __init__(self):
+            self.snapshots = []
+
+        def submit(self, snapshot):
+            self.snapshots.append(snapshot)
+            return True
+
+    writer = RecordingWriter()
+
+    async def override_client():
+        return stub_client
+
+    app.dependency_overrides[get_client] = override_client
+    app.dependency_overrides[get_board_writer] = lambda: writer
+
+    response = client.get("/api/board")
+
+    assert response.status_code == 200
+    assert [(s.league_shortcut, s.season_year) for s in writer.snapshots] == [
+        ("bl1", cfg.DEFAULT_SEASON)
+    ]
+    assert [m.id for m in writer.snapshots[0].matches] == [5]
+
+
+def test_board_degrades_to_partial_board_when_one_league_fails(client, monkeypatch, dummy_db):
+    now = dt.datetime.now(dt.timezone.utc)
+    bl1_matches = [
+        {
+            "matchID": 7,
+            "leagueShortcut": "bl1",
+            "leagueSeason": 2024,
+            "matchDateTimeUTC": (now + dt.timedelta(days=1)).isoformat(),
+            "matchIsFinished": False,
+            "group": {"groupOrderID": 3},
+            "team1": {"teamName": "Home"},
+            "team2": {"teamName": "Away"},
+            "matchResults": [],
+        }
+    ]
+
+    class PerLeagueStub(StubOpenLigaClient):
+        async def get_season_raw(self, league, season):
+            self.calls.append(("get_season_raw", league, season))
+            if league == "bl2":
+                raise RuntimeError("bl2 is down")
+            return bl1_matches
+
+    stub_client = PerLeagueStub()
+
+    async def override_client():
+        return stub_client
+
+    async def override_db():
+        yield dummy_db
+
+    monkeypatch.setattr("app.sports_api.bulk_upsert_matches_from_board", lambda **_: None)
+    app.dependency_overrides[get_client] = override_client
+    app.dependency_overrides[get_db] = override_db
+
+    response = client.get("/api/board", params={"leagues": "bl1,bl2"})
+
+    assert response.status_code == 200
+    board = response.json()
+    assert [m["id"] for m in board["upcoming"]] == [7]
+    assert [e["league"] for e in board["errors"]] == ["bl2"]
+    assert sorted(c[1] for c in stub_client.calls) == ["bl1", "bl2"]
+
+
 def test_archive_leagues_returns_configured_shortcuts(client, monkeypatch):
     monkeypatch.setattr("app.config.DEFAULT_LEAGUES", "bl1,apl", raising=False)
 
@@ -470,3 +586,333 @@ def test_archive_matches_returns_502_on_client_failure(client):
 
     assert response.status_code == 502
     assert "OpenLigaDB" in response.json()["detail"]
+
+
+def test_admin_sync_season_reports_changed_rows(client, db_session):
+    now = dt.datetime.now(dt.timezone.utc)
+    raw = {
+        "matchID": 11,
+        "leagueShortcut": "bl1",
+        "leagueSeason": 2023,
+        "matchDateTimeUTC": (now - dt.timedelta(days=30)).isoformat(),
+        "matchIsFinished": True,
+        "group": {"groupOrderID": 1},
+        "team1": {"teamName": "Home"},
+        "team2": {"teamName": "Away"},
+        "matchResults": [{"resultTypeID": 2, "pointsTeam1": 2, "pointsTeam2": 2}],
+    }
+    stub_client = StubOpenLigaClient(season_raw=[raw])
+
+    async def override_client():
+        return stub_client
+
+    app.dependency_overrides[get_client] = override_client
+    app.dependency_overrides[get_db] = lambda: db_session
+
+    first = client.post("/api/admin/sync-season", params={"league": "bl1", "season": 2023})
+    second = client.post("/api/admin/sync-season", params={"league": "bl1", "season": 2023})
+
+    assert first.status_code == 200
+    assert first.json()["changed"] == 1
+    assert first.json()["inserted"] == 1
+    assert second.json()["synced"] == 1
+    assert second.json()["changed"] == 0
+    assert second.json()["unchanged"] == 1
+
+
+def test_admin_sync_season_skips_download_when_last_change_is_unchanged(client, db_session):
+    raw = {
+        "matchID": 12,
+        "leagueShortcut": "bl1",
+        "leagueSeason": 2023,
+        "matchDateTimeUTC": "2023-09-02T13:30:00Z",
+        "matchIsFinished": True,
+        "group": {"groupOrderID": 1},
+        "team1": {"teamName": "Home"},
+        "team2": {"teamName": "Away"},
+        "matchResults": [],
+    }
+
+    class LastChangeStub(StubOpenLigaClient):
+        last_change = dt.datetime(2023, 9, 2, 15, 20)
+
+        async def get_season_last_change(self, league, season):
+            self.calls.append(("get_season_last_change", league, season))
+            return self.last_change
+
+    stub_client = LastChangeStub(season_raw=[raw])
+
+    async def override_client():
+        return stub_client
+
+    app.dependency_overrides[get_client] = override_client
+    app.dependency_overrides[get_db] = lambda: db_session
+
+    params = {"league": "bl1", "season": 2023}
+    first = client.post("/api/admin/sync-season", params=params)
+    second = client.post("/api/admin/sync-season", params=params)
+    forced = client.post("/api/admin/sync-season", params={**params, "force": "true"})
+
+    assert first.json()["inserted"] == 1
+    assert second.json()["synced"] == 0
+    assert second.json()["unchanged_since"] == "2023-09-02T15:20:00"
+    assert forced.json()["synced"] == 1
+    assert [c[0] for c in stub_client.calls].count("get_season_raw") == 2
+
+
+def test_archive_cursor_mode_returns_next_cursor_and_rejects_bad_cursor(client, db_session, async_db):
+    stub_client = StubOpenLigaClient(
+        season_raw=[
+            {
+                "matchID": i,
+                "leagueShortcut": "bl1",
+                "leagueSeason": 2022,
+                "matchDateTimeUTC": f"2022-09-{i:02d}T15:30:00Z",
+                "matchIsFinished": True,
+                "group": {"groupOrderID": i},
+                "team1": {"teamName": f"Home {i}"},
+                "team2": {"teamName": f"Away {i}"},
+                "matchResults": [],
+            }
+            for i in range(1, 6)
+        ]
+    )
+
+    async def override_client():
+        return stub_client
+
+    app.dependency_overrides[get_client] = override_client
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = async_db
+    client.post("/api/admin/sync-season", params={"league": "bl1", "season": 2022})
+
+    first = client.get("/api/archive", params={"league": "bl1", "page_size": 3})
+    second = client.get(
+        "/archive",
+        params={"league": "bl1", "page_size": 3, "cursor": first.json()["next_cursor"]},
+    )
+    bad = client.get("/api/archive", params={"league": "bl1", "cursor": "%%%"})
+
+    assert first.json()["total"] == 5
+    assert [m["id"] for m in first.json()["items"]] == [5, 4, 3]
+    assert second.json()["total"] is None
+    assert [m["id"] for m in second.json()["items"]] == [2, 1]
+    assert second.json()["next_cursor"] is None
+    assert bad.status_code == 400
+
+
+def test_archive_meta_endpoint_uses_async_session(client, db_session, async_db):
+    stub_client = StubOpenLigaClient(
+        season_raw=[
+            {
+                "matchID": 1,
+                "leagueShortcut": "bl1",
+                "leagueSeason": 2021,
+                "matchDateTimeUTC": "2021-09-01T15:30:00Z",
+                "matchIsFinished": True,
+                "group": {"groupOrderID": 1},
+                "team1": {"teamName": "Home"},
+                "team2": {"teamName": "Away"},
+                "matchResults": [],
+            }
+        ]
+    )
+
+    async def override_client():
+        return stub_client
+
+    app.dependency_overrides[get_client] = override_client
+    app.dependency_overrides[get_db] = lambda: db_session
+    app.dependency_overrides[get_async_db] = async_db
+    client.post("/api/admin/sync-season", params={"league": "bl1", "season": 2021})
+
+    response = client.get("/archive/meta")
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [
+        {"shortcut": "bl1", "name": "bl1", "country": "Germany", "sport": "Football", "seasons": [2021]}
+    ]
+
+
+def test_board_sends_etag_and_answers_304_on_revalidation(client):
+    stub_client = StubOpenLigaClient(
+        season_raw=[
+            {
+                "matchID": 21,
+                "leagueShortcut": "bl1",
+                "leagueSeason": 2024,
+                "matchDateTimeUTC": (dt.datetime.now(dt.timezone.utc) + dt.timedelta(days=1)).isoformat(),
+                "matchIsFinished": False,
+                "group": {"groupOrderID": 1},
+                "team1": {"teamName": "Home"},
+                "team2": {"teamName": "Away"},
+                "matchResults": [],
+            }
+        ]
+    )
+
+    async def override_client():
+        return stub_client
+
+    app.dependency_overrides[get_client] = override_client
+
+    first = client.get("/api/board")
+    etag = first.headers["etag"]
+    revalidated = client.get("/board", params={"days_back": 3, "days_ahead": 3}, headers={"If-None-Match": etag})
+    weak = client.get("/api/board", headers={"If-None-Match": f'W/"other", W/{etag}'})
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=15, stale-while-revalidate=45"
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    assert weak.status_code == 304
+
+
+def test_archive_meta_etag_follows_database_state_not_process(client, db_session, async_db):
+    from sqlalchemy import insert
+
+    from app.models import League
+
+    app.dependency_overrides[get_async_db] = async_db
+    first = client.get("/api/archive/meta")
+    etag = first.headers["etag"]
+    cached = client.get("/api/archive/meta", headers={"If-None-Match": etag})
+
+    # Лигу добавила другая реплика: кэш этого процесса о ней не знает
+    db_session.execute(insert(League).values(shortcut="bl2", name="bl2", country="Germany", sport="Football"))
+    db_session.commit()
+    after_sync = client.get("/api/archive/meta", headers={"If-None-Match": etag})
+
+    assert first.headers["cache-control"] == "no-cache"
+    assert cached.status_code == 304
+    assert after_sync.status_code == 200
+    assert after_sync.headers["etag"] != etag
+
+
+def test_archive_is_cached_long_only_for_a_complete_season(client, db_session, async_db):
+    from app.repositories.matches import bulk_upsert_matches_from_board
+
+    def store(season, status, full_sync_at=None):
+        bulk_upsert_matches_from_board(
+            db=db_session,
+            league_shortcut="bl1",
+            league_name="bl1",
+            season_year=season,
+            matches=[
+                {
+                    "id": 1,
+                    "group_order_id": 1,
+                    "team1_name": "A",
+                    "team2_name": "B",
+                    "kickoff_utc": f"{season}-09-01T13:30:00+00:00",
+                    "status": status,
+                }
+            ],
+            full_sync_at=full_sync_at,
+        )
+
+    synced_at = dt.datetime(2024, 6, 1, tzinfo=dt.timezone.utc)
+    store(2019, "FINISHED", full_sync_at=synced_at)
+    store(2020, "FINISHED")  # только часть сезона (без полной синхронизации)
+    store(2021, "SCHEDULED", full_sync_at=synced_at)
+    app.dependency_overrides[get_async_db] = async_db
+
+    def policy(season):
+        return client.get("/api/archive", params={"league": "bl1", "season": season}).headers["cache-control"]
+
+    assert policy(2019) == "public, max-age=86400"
+    assert policy(2020) == "public, max-age=60, stale-while-revalidate=60"
+    assert policy(2021) == "public, max-age=60, stale-while-revalidate=60"
+    assert policy(2018) == "public, max-age=60, stale-while-revalidate=60"
+
+
+def test_finished_season_archive_is_cached_longer_than_current_one(client):
+    def season(finished):
+        return StubOpenLigaClient(
+            season_raw=[
+                {
+                    "matchID": 31,
+                    "leagueShortcut": "bl1",
+                    "leagueSeason": 2020,
+                    "matchDateTimeUTC": "2020-09-19T13:30:00Z",
+                    "matchIsFinished": finished,
+                    "group": {"groupOrderID": 1},
+                    "team1": {"teamName": "Home"},
+                    "team2": {"teamName": "Away"},
+                    "matchResults": [],
+                }
+            ]
+        )
+
+    app.dependency_overrides[get_client] = lambda: season(True)
+    finished = client.get("/api/archive/bl1/2020/matches")
+    app.dependency_overrides[get_client] = lambda: season(False)
+    running = client.get("/archive/bl1/2020/matches")
+
+    assert finished.headers["cache-control"] == "public, max-age=86400"
+    assert running.headers["cache-control"] == "public, max-age=60, stale-while-revalidate=60"
+
+
+def test_large_archive_is_compressed_and_serialized_like_response_model(client):
+    raw_matches = [
+        {
+            "matchID": i,
+            "leagueShortcut": "bl1",
+            "leagueSeason": 2020,
+            "matchDateTimeUTC": f"2020-09-{1 + i % 28:02d}T13:30:00Z",
+            "matchIsFinished": True,
+            "group": {"groupOrderID": 1 + i // 9},
+            "team1": {"teamName": f"Heim {i}"},
+            "team2": {"teamName": f"Gäste {i}"},
+            "matchResults": [{"resultTypeID": 2, "pointsTeam1": 1, "pointsTeam2": 0}],
+        }
+        for i in range(1, 61)
+    ]
+    app.dependency_overrides[get_client] = lambda: StubOpenLigaClient(season_raw=raw_matches)
+
+    compressed = client.get("/api/archive/bl1/2020/matches", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/archive/bl1/2020/matches", headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert "content-encoding" not in plain.headers
+    assert compressed.json() == plain.json()
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    now = dt.datetime.now(dt.timezone.utc)
+    expected = sorted((classify_match(m, now) for m in raw_matches), key=lambda m: m.kickoff_utc)
+    assert plain.json() == [m.model_dump(mode="json") for m in expected]
+
+
+def test_default_board_is_served_from_materialized_snapshot(client):
+    from app.board_materializer import BoardMaterializer, board_key
+
+    stub_client = StubOpenLigaClient(errors={"get_season_raw": RuntimeError("must not be called")})
+    app.dependency_overrides[get_client] = lambda: stub_client
+
+    async def build():
+        return BoardResponse(
+            date_from=dt.date(2024, 9, 1),
+            date_to=dt.date(2024, 9, 7),
+            leagues=cfg.get_default_leagues_list(),
+            recent=[],
+            live=[],
+            upcoming=[],
+        )
+
+    materializer = BoardMaterializer(
+        build,
+        board_key(cfg.get_default_leagues_list(), cfg.DEFAULT_SEASON, cfg.BOARD_DAYS_BACK, cfg.BOARD_DAYS_AHEAD),
+    )
+    snapshot = asyncio.run(materializer.refresh())
+    client.app.state.board_materializer = materializer
+
+    response = client.get("/api/board")
+    other_window = client.get("/api/board", params={"days_back": 10})
+
+    assert response.status_code == 200
+    assert response.json()["date_from"] == "2024-09-01"
+    assert response.headers["etag"].removeprefix("W/") == snapshot.etag
+    assert stub_client.calls == []
+    assert other_window.status_code == 502
@@ -0,0 +1,176 @@
+import asyncio
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import pytest
+
+from app.backfill import BackfillBusy, BackfillRunner, RateLimiter, get_backfill_runner, run_backfill
+from app.db import get_db
+from app.models import Match
+from app.repositories.backfill import list_backfill_checkpoints
+from app.repositories.matches import get_season_sync_state
+
+
+def raw_match(match_id, season):
+    return {
+        "matchID": match_id,
+        "leagueShortcut": "bl1",
+        "leagueSeason": season,
+        "matchDateTimeUTC": f"{season}-09-01T13:30:00Z",
+        "matchIsFinished": True,
+        "group": {"groupOrderID": 1},
+        "team1": {"teamName": f"Home {match_id}"},
+        "team2": {"teamName": f"Away {match_id}"},
+        "matchResults": [{"resultTypeID": 2, "pointsTeam1": 1, "pointsTeam2": 0}],
+    }
+
+
+class ArchiveClient:
+    def __init__(self, failing=(), empty=()):
+        self.failing = set(failing)
+        self.empty = set(empty)
+        self.calls = []
+
+    async def get_season_last_change(self, league, season):
+        return None
+
+    async def get_season_raw(self, league, season):
+        self.calls.append(season)
+        if season in self.failing:
+            raise RuntimeError("upstream down")
+        if season in self.empty:
+            return []
+        return [raw_match(season * 100 + i, season) for i in range(5)]
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_spaces_requests_evenly():
+    clock = FakeTime()
+    limiter = RateLimiter(2.0, clock=clock, sleep=clock.sleep)
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.acquire()
+
+    asyncio.run(scenario())
+
+    assert clock.sleeps == [0.5, 0.5]
+    assert limiter.waited_s == 1.0
+
+
+def test_backfill_writes_in_batches_and_resumes_after_failure(db_session, db_url):
+    factory = sessionmaker(bind=create_engine(db_url), expire_on_commit=False)
+    limiter = RateLimiter(0)
+
+    first = ArchiveClient(failing={2021})
+    report = asyncio.run(
+        run_backfill(factory, first, "BL1", 2020, 2022, limiter=limiter, batch_size=2)
+    )
+
+    assert report.done == [2020, 2022]
+    assert report.failed == {2021: "upstream down"}
+    checkpoints = {cp.season_year: cp for cp in list_backfill_checkpoints(db_session, "bl1")}
+    assert {s: cp.status for s, cp in checkpoints.items()} == {
+        2020: "done",
+        2021: "failed",
+        2022: "done",
+    }
+    assert checkpoints[2020].matches_written == 5
+    assert get_season_sync_state(db_session, "bl1", 2020).last_full_sync_at is not None
+
+    second = ArchiveClient()
+    resumed = asyncio.run(
+        run_backfill(factory, second, "bl1", 2020, 2022, limiter=limiter, batch_size=2)
+    )
+
+    assert second.calls == [2021]
+    assert resumed.skipped == [2020, 2022]
+    assert resumed.done == [2021]
+    db_session.expire_all()
+    retried = list_backfill_checkpoints(db_session, "bl1", 2021, 2021)[0]
+    assert (retried.status, retried.attempts, retried.error) == ("done", 2, None)
+    assert db_session.execute(select(func.count()).select_from(Match)).scalar() == 15
+
+
+def test_backfill_endpoints_start_in_background_and_report_progress(client, db_session, db_url):
+    factory = sessionmaker(bind=create_engine(db_url), expire_on_commit=False)
+    runner = BackfillRunner(factory, ArchiveClient(), rate_per_s=0, batch_size=10)
+    client.app.dependency_overrides[get_backfill_runner] = lambda: runner
+
+    started = client.post(
+        "/api/admin/backfill", params={"league": "bl1", "season_from": 2019, "season_to": 2020}
+    )
+    assert started.status_code == 202
+    client.portal.call(runner.wait, "bl1")
+
+    invalid = client.post(
+        "/api/admin/backfill", params={"league": "bl1", "season_from": 2020, "season_to": 2019}
+    )
+    assert invalid.status_code == 422
+
+    client.app.dependency_overrides[get_db] = lambda: db_session
+    progress = client.get("/api/admin/backfill", params={"league": "BL1"})
+
+    assert progress.status_code == 200
+    body = progress.json()
+    assert body["running"] is False
+    assert body["last_report"]["done"] == [2019, 2020]
+    assert [(s["season"], s["status"]) for s in body["seasons"]] == [(2019, "done"), (2020, "done")]
+
+
+def test_empty_season_is_not_marked_done(db_session, db_url):
+    factory = sessionmaker(bind=create_engine(db_url), expire_on_commit=False)
+
+    empty = asyncio.run(run_backfill(factory, ArchiveClient(empty={2020}), "bl1", 2020, 2020, limiter=RateLimiter(0)))
+    retried = ArchiveClient()
+    resumed = asyncio.run(run_backfill(factory, retried, "bl1", 2020, 2020, limiter=RateLimiter(0)))
+
+    assert list(empty.failed) == [2020] and empty.done == []
+    assert retried.calls == [2020]
+    assert resumed.done == [2020]
+
+
+def test_one_backfill_per_league_across_replicas(db_session, db_url):
+    factory = sessionmaker(bind=create_engine(db_url), expire_on_commit=False)
+
+    class SlowClient(ArchiveClient):
+        async def get_season_raw(self, league, season):
+            await self.release.wait()
+            return await super().get_season_raw(league, season)
+
+    slow = SlowClient()
+    first = BackfillRunner(factory, slow, rate_per_s=0, instance_id="pod-a")
+    second = BackfillRunner(factory, ArchiveClient(), rate_per_s=0, instance_id="pod-b")
+
+    async def scenario():
+        slow.release = asyncio.Event()
+        started = await first.start("bl1", 2019, 2020)
+        elsewhere = await second.start("BL1", 2019, 2020)
+        other_league = await second.start("bl2", 2019, 2019)
+        with pytest.raises(BackfillBusy):
+            await run_backfill(factory, ArchiveClient(), "bl1", 2021, 2021, limiter=RateLimiter(0), holder="cli")
+        slow.release.set()
+        await first.wait("bl1")
+        await second.wait("bl2")
+        after = await second.start("bl1", 2021, 2021)
+        await second.wait("bl1")
+        return started, elsewhere, other_league, after
+
+    started, elsewhere, other_league, after = asyncio.run(scenario())
+
+    assert (started, elsewhere, other_league, after) == (True, False, True, True)
+    assert first.last_reports["bl1"]["done"] == [2019, 2020]
+    assert second.last_reports["bl1"]["done"] == [2021]
@@ -0,0 +1,19 @@
+import json
+
+from benchmarks.suite import run_suite
+
+
+def test_benchmark_suite_runs_on_a_tiny_season_and_reports_json():
+    report = run_suite(matches=20, leagues=2, seasons=2, repeat=1)
+
+    results = json.loads(json.dumps(report))["results"]
+    assert results["archive_pages"]["total_matches"] == 40
+    assert results["upsert_postgres"]["skipped"]
+    timed = {name for name, value in results.items() if "median_ms" in value}
+    assert {
+        "classify_matches_season",
+        "board_2_leagues_warm",
+        "upsert_sqlite_insert_season",
+        "archive_cursor_last_page",
+        "archive_json_model_json",
+    } <= timed
@@ -0,0 +1,105 @@
+import asyncio
+
+from pydantic import BaseModel
+
+from app.board_materializer import BoardMaterializer, board_key
+
+KEY = board_key(["BL1"], 2024, 3, 3)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class Board(BaseModel):
+    live: list
+    errors: list = []
+
+
+def make_builder(boards, calls):
+    async def build():
+        calls.append(1)
+        item = boards[min(len(calls), len(boards)) - 1]
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    return build
+
+
+def test_unchanged_board_keeps_snapshot_and_etag():
+    calls = []
+    materializer = BoardMaterializer(
+        make_builder([Board(live=[1]), Board(live=[1]), Board(live=[2])], calls), KEY
+    )
+
+    async def scenario():
+        first = await materializer.refresh()
+        same = await materializer.refresh()
+        changed = await materializer.refresh()
+        return first, same, changed
+
+    first, same, changed = asyncio.run(scenario())
+
+    assert same is first
+    assert changed.etag != first.etag
+    assert changed.body == b'{"live":[2],"errors":[]}'
+    assert materializer.stats()["changes"] == 2
+
+
+def test_lookup_serves_only_default_key_fresh_and_complete_boards():
+    clock = FakeClock()
+    calls = []
+    materializer = BoardMaterializer(
+        make_builder([Board(live=[]), Board(live=[], errors=["bl2"])], calls),
+        KEY,
+        max_age_s=60,
+        clock=clock,
+    )
+
+    asyncio.run(materializer.refresh())
+    assert materializer.lookup(board_key(["bl1"], 2024, 3, 3)) is not None
+    assert materializer.lookup(board_key(["bl1"], 2024, 7, 7)) is None
+
+    clock.now += 61
+    assert materializer.lookup(KEY) is None
+
+    asyncio.run(materializer.refresh())
+    assert materializer.lookup(KEY) is None  # частичная доска
+
+
+def test_failed_build_keeps_previous_snapshot():
+    calls = []
+    materializer = BoardMaterializer(
+        make_builder([Board(live=[1]), RuntimeError("OpenLigaDB down")], calls), KEY
+    )
+
+    async def scenario():
+        first = await materializer.refresh()
+        after_error = await materializer.refresh()
+        return first, after_error
+
+    first, after_error = asyncio.run(scenario())
+
+    assert after_error is first
+    assert materializer.stats()["build_errors"] == 1
+
+
+def test_notify_triggers_rebuild_before_interval():
+    calls = []
+    materializer = BoardMaterializer(make_builder([Board(live=[])], calls), KEY, interval_s=60)
+
+    async def scenario():
+        materializer.start()
+        await asyncio.sleep(0.01)
+        materializer.notify()
+        await asyncio.sleep(0.01)
+        await materializer.stop()
+
+    asyncio.run(scenario())
+
+    assert len(calls) == 2
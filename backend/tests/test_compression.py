@@ -0,0 +1,55 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware
+
+
+def make_client(*, thread_min_size):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=10, thread_min_size=thread_min_size)
+
+    @app.get("/body")
+    def body(size: int):
+        return PlainTextResponse("x" * size)
+
+    return TestClient(app)
+
+
+def record_threads(monkeypatch):
+    calls = []
+    to_thread = asyncio.to_thread
+
+    async def recording_to_thread(func, *args, **kwargs):
+        calls.append(func)
+        return await to_thread(func, *args, **kwargs)
+
+    monkeypatch.setattr(compression.asyncio, "to_thread", recording_to_thread)
+    return calls
+
+
+def test_large_bodies_are_compressed_in_a_thread(monkeypatch):
+    calls = record_threads(monkeypatch)
+    client = make_client(thread_min_size=1000)
+
+    small = client.get("/body", params={"size": 100}, headers={"Accept-Encoding": "gzip"})
+    large = client.get("/body", params={"size": 5000}, headers={"Accept-Encoding": "gzip"})
+
+    assert small.headers["content-encoding"] == "gzip"
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.text == "x" * 5000
+    assert calls == [compression._gzip]
+
+
+def test_bodies_below_minimum_size_are_not_compressed(monkeypatch):
+    calls = record_threads(monkeypatch)
+    client = make_client(thread_min_size=0)
+
+    response = client.get("/body", params={"size": 5}, headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "xxxxx"
+    assert calls == []
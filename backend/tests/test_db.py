@@ -0,0 +1,46 @@
+from sqlalchemy import text
+
+from app.db import InstrumentedQueuePool, async_database_url, create_db_engine, pool_status
+from app.settings import settings
+
+
+def test_async_database_url_swaps_in_async_drivers():
+    assert (
+        async_database_url("postgresql://u:p@db:5432/sporthub")
+        == "postgresql+asyncpg://u:p@db:5432/sporthub"
+    )
+    assert async_database_url("sqlite:///tmp/x.db") == "sqlite+aiosqlite:///tmp/x.db"
+    assert async_database_url("postgresql+asyncpg://db/x") == "postgresql+asyncpg://db/x"
+
+
+def test_engine_pool_uses_settings_and_reports_wait_stats(db_url, monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 3)
+    monkeypatch.setattr(settings, "db_max_overflow", 1)
+    monkeypatch.setattr(settings, "db_pool_recycle_s", 600)
+    engine = create_db_engine(db_url)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            during = pool_status(engine.pool)
+        after = pool_status(engine.pool)
+    finally:
+        engine.dispose()
+
+    assert isinstance(engine.pool, InstrumentedQueuePool)
+    assert engine.pool._pre_ping is True
+    assert engine.pool._recycle == 600
+    assert during["size"] == 3
+    assert during["max_overflow"] == 1
+    assert during["checked_out"] == 1
+    assert after["checked_out"] == 0
+    assert after["wait"]["checkouts"] == 1
+    assert after["wait"]["timeouts"] == 0
+
+
+def test_admin_metrics_publishes_pool_stats(client):
+    response = client.get("/api/admin/metrics")
+
+    assert response.status_code == 200
+    db_pool = response.json()["db_pool"]
+    assert db_pool["sync"]["pool_class"] == "InstrumentedQueuePool"
+    assert "checked_out" in db_pool["sync"]
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.json_stream import iter_json_array
+from app.openligadb_client import OpenLigaDBClient, slim_match
+
+FAT_MATCH = {
+    "matchID": 66000,
+    "matchDateTime": "2024-08-23T20:30:00",
+    "matchDateTimeUTC": "2024-08-23T18:30:00Z",
+    "leagueName": "1. Fußball-Bundesliga 2024/2025",
+    "leagueShortcut": "bl1",
+    "leagueSeason": 2024,
+    "group": {"groupName": "1. Spieltag", "groupOrderID": 1, "groupID": 46000},
+    "team1": {"teamId": 40, "teamName": "FC Bayern München", "teamIconUrl": "https://i.imgur.com/x.png"},
+    "team2": {"teamId": 7, "teamName": "Borussia Dortmund", "teamIconUrl": "https://i.imgur.com/y.png"},
+    "lastUpdateDateTime": "2024-08-23T22:25:00",
+    "matchIsFinished": True,
+    "matchResults": [{"resultID": 1, "resultName": "Endergebnis", "pointsTeam1": 2, "pointsTeam2": 1, "resultTypeID": 2}],
+    "goals": [{"goalID": 1, "scoreTeam1": 1, "scoreTeam2": 0, "goalGetterName": "Kane", "matchMinute": 12}],
+    "location": {"locationID": 1, "locationCity": "München", "locationStadium": "Allianz Arena"},
+    "numberOfViewers": 75000,
+}
+
+
+def parse(body: bytes, chunk_size: int, transform=None):
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    async def collect():
+        return [item async for item in iter_json_array(chunks(), transform)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 100_000])
+def test_array_items_match_json_loads_for_any_chunking(chunk_size):
+    payload = [FAT_MATCH, 12, -3.5e2, "ü€", None, True, [], {}, [1, [2, {"a": "]"}]]]
+    body = (" \n" + json.dumps(payload, ensure_ascii=False, indent=1) + "\n").encode()
+
+    assert parse(body, chunk_size) == payload
+    assert parse(b"[]", chunk_size) == []
+
+
+def test_non_array_body_yields_nothing_and_broken_json_raises():
+    assert parse(b'{"error": "not found"}', 3) == []
+
+    for broken in (b"[1, 2", b"[1 2]", b"[1,]", b'[{"a": 1}] x', b"{"):
+        with pytest.raises(json.JSONDecodeError):
+            parse(broken, 2)
+
+
+def test_season_download_is_streamed_into_slim_matches():
+    def upstream(request):
+        return httpx.Response(200, content=json.dumps([FAT_MATCH, FAT_MATCH]).encode())
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+            client = OpenLigaDBClient(base_url="http://openligadb", http_client=http)
+            return await client.get_season_raw("bl1", 2024)
+
+    raw = asyncio.run(scenario())
+
+    assert raw == [slim_match(FAT_MATCH)] * 2
+    assert "goals" not in raw[0] and "location" not in raw[0]
+    assert raw[0]["team1"] == {"teamName": "FC Bayern München"}
+    assert raw[0]["matchResults"] == [{"resultTypeID": 2, "pointsTeam1": 2, "pointsTeam2": 1}]
+    assert raw[0]["group"] == {"groupOrderID": 1, "groupName": "1. Spieltag"}
@@ -0,0 +1,68 @@
+import datetime as dt
+
+from app.kickoff_index import KickoffIndex, kickoff_index
+from app.schemas.match import MatchStatus, classify_matches
+from app.season_cache import SeasonSnapshot
+
+NOW = dt.datetime(2024, 11, 9, 15, 0, tzinfo=dt.timezone.utc)
+
+
+def raw(match_id, kickoff, finished):
+    return {
+        "matchID": match_id,
+        "leagueShortcut": "bl1",
+        "leagueSeason": 2024,
+        "matchDateTimeUTC": kickoff.isoformat() if isinstance(kickoff, dt.datetime) else kickoff,
+        "matchIsFinished": finished,
+        "group": {"groupOrderID": 1},
+        "team1": {"teamName": "A"},
+        "team2": {"teamName": "B"},
+    }
+
+
+def on_board(summaries, back, ahead):
+    """Те же условия, что у build_board."""
+    ids = set()
+    for m in summaries:
+        if m.status == MatchStatus.LIVE:
+            ids.add(m.id)
+        elif m.status == MatchStatus.SCHEDULED and NOW <= m.kickoff_utc <= NOW + dt.timedelta(days=ahead):
+            ids.add(m.id)
+        elif m.status == MatchStatus.FINISHED and NOW - dt.timedelta(days=back) <= m.kickoff_utc <= NOW:
+            ids.add(m.id)
+    return ids
+
+
+def make_season():
+    start = NOW - dt.timedelta(days=90)
+    season = [raw(i, start + dt.timedelta(hours=12 * i), start + dt.timedelta(hours=12 * i) < NOW) for i in range(360)]
+    season[3] = raw(3, season[3]["matchDateTimeUTC"], False)  # перенесён и не закрыт — LIVE
+    season.append(raw(1000, NOW - dt.timedelta(days=2), True))  # ровно на границе окна
+    season.append(raw(1001, NOW + dt.timedelta(minutes=3), False))  # вот-вот начнётся — LIVE
+    season.append(raw(1002, None, False))  # без даты
+    season.reverse()
+    return season
+
+
+def test_board_candidates_cover_everything_the_full_classification_puts_on_board():
+    season = make_season()
+    index = KickoffIndex(season)
+
+    for back, ahead in [(2, 7), (0, 0), (30, 30)]:
+        candidates = index.board_candidates(NOW, back, ahead)
+        expected = on_board(classify_matches(season, NOW), back, ahead)
+
+        assert on_board(classify_matches(candidates, NOW), back, ahead) == expected
+        assert {3, 1001} <= expected
+        assert 1002 in {m["matchID"] for m in candidates}
+
+    assert 1000 in on_board(classify_matches(season, NOW), 2, 7)
+    assert len(index.board_candidates(NOW, 2, 7)) < 30 < len(index)
+    assert index.epochs == sorted(index.epochs)
+
+
+def test_kickoff_index_is_built_once_per_snapshot():
+    snapshot = SeasonSnapshot(league="bl1", season=2024, raw=make_season())
+
+    assert kickoff_index(snapshot) is kickoff_index(snapshot)
+    assert [m["matchID"] for m in kickoff_index(snapshot).between(NOW, NOW + dt.timedelta(hours=12))] == [180, 1001, 181]
@@ -0,0 +1,161 @@
+import asyncio
+import datetime as dt
+import json
+import warnings
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+from starlette.websockets import WebSocketDisconnect
+
+from app.live_stream import LiveBroadcaster, get_live_broadcaster
+from app.schemas.match import MatchStatus, MatchSummary
+from app.sports_api import live_stream
+
+KICKOFF = dt.datetime(2024, 9, 1, 15, 30, tzinfo=dt.timezone.utc)
+
+
+class Board(BaseModel):
+    recent: list[MatchSummary] = []
+    live: list[MatchSummary] = []
+
+
+def match(match_id, status=MatchStatus.LIVE, score=(0, 0)):
+    return MatchSummary(
+        id=match_id,
+        league_shortcut="bl1",
+        league_season=2024,
+        group_order_id=1,
+        team1_name="A",
+        team2_name="B",
+        kickoff_utc=KICKOFF,
+        status=status,
+        score_team1=score[0],
+        score_team2=score[1],
+    )
+
+
+def payload(event):
+    return json.loads(event.data)
+
+
+def test_publish_sends_only_score_and_status_changes():
+    broadcaster = LiveBroadcaster()
+
+    async def scenario():
+        sub = broadcaster.subscribe()
+        first = broadcaster.publish_board(Board(live=[match(1), match(2)]))
+        unchanged = broadcaster.publish_board(Board(live=[match(1), match(2)]))
+        goal = broadcaster.publish_board(Board(live=[match(1, score=(1, 0)), match(2)]))
+        finished = broadcaster.publish_board(
+            Board(live=[match(2)], recent=[match(1, MatchStatus.FINISHED, (1, 0))])
+        )
+        events = [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+        return first, unchanged, goal, finished, events
+
+    first, unchanged, goal, finished, events = asyncio.run(scenario())
+
+    assert [m["id"] for m in payload(first[0])] == [1, 2]
+    assert unchanged == []
+    assert [(m["id"], m["score_team1"]) for m in payload(goal[0])] == [(1, 1)]
+    assert [(m["id"], m["status"]) for m in payload(finished[0])] == [(1, "FINISHED")]
+    assert [e.kind for e in events] == ["snapshot", "update", "update", "update"]
+    assert [m["id"] for m in payload(broadcaster.subscribe().queue.get_nowait())] == [2]
+
+
+def test_match_that_left_the_board_is_sent_as_unknown():
+    broadcaster = LiveBroadcaster()
+    broadcaster.publish_board(Board(live=[match(1), match(2)]))
+
+    with warnings.catch_warnings():
+        # Статус сериализуется как поле MatchSummary, без предупреждений pydantic
+        warnings.simplefilter("error")
+        dropped = broadcaster.publish_board(Board(live=[match(2)]))
+
+    assert [(m["id"], m["status"]) for m in payload(dropped[0])] == [(1, "UNKNOWN")]
+    assert MatchSummary.model_validate(payload(dropped[0])[0]).status is MatchStatus.UNKNOWN
+
+
+def test_slow_subscriber_gets_fresh_snapshot_instead_of_backlog():
+    broadcaster = LiveBroadcaster(queue_size=2)
+
+    async def scenario():
+        sub = broadcaster.subscribe()
+        for goals in range(5):
+            broadcaster.publish_board(Board(live=[match(1, score=(goals, 0))]))
+        assert sub.queue.qsize() == 1
+        events = broadcaster.events(sub, heartbeat_s=0.01)
+        resync = await events.__anext__()
+        heartbeat = await events.__anext__()
+        await events.aclose()
+        return sub, resync, heartbeat
+
+    sub, resync, heartbeat = asyncio.run(scenario())
+
+    assert resync.kind == "snapshot"
+    assert payload(resync)[0]["score_team1"] == 4
+    assert heartbeat is None
+    assert sub.overflows == 1
+    assert broadcaster.stats()["overflows"] == 1
+
+
+def test_subscriber_limit_rejects_new_connections():
+    broadcaster = LiveBroadcaster(max_subscribers=1)
+
+    async def scenario():
+        first = broadcaster.subscribe()
+        second = broadcaster.subscribe()
+        broadcaster.unsubscribe(first)
+        third = broadcaster.subscribe()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert first is not None and third is not None
+    assert second is None
+    assert broadcaster.stats()["rejected"] == 1
+
+
+def test_sse_endpoint_streams_snapshot_and_unsubscribes_on_close():
+    broadcaster = LiveBroadcaster()
+    broadcaster.publish_board(Board(live=[match(7, score=(2, 1))]))
+
+    async def scenario():
+        response = await live_stream(broadcaster=broadcaster)
+        frames = response.body_iterator
+        first = await frames.__anext__()
+        subscribers = broadcaster.subscribers
+        await frames.aclose()
+        return response, first, subscribers
+
+    response, first, subscribers = asyncio.run(scenario())
+
+    assert response.media_type == "text/event-stream"
+    assert response.headers["cache-control"] == "no-store"
+    assert first.startswith(b"id: ") and b"event: snapshot\n" in first
+    assert b'"id":7' in first
+    assert subscribers == 1
+    assert broadcaster.subscribers == 0
+
+
+def test_sse_endpoint_returns_503_without_broadcaster():
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(live_stream(broadcaster=None))
+
+    assert exc_info.value.status_code == 503
+
+
+def test_websocket_sends_snapshot_and_rejects_over_limit(client):
+    broadcaster = LiveBroadcaster(max_subscribers=1)
+    broadcaster.publish_board(Board(live=[match(3)]))
+    client.app.dependency_overrides[get_live_broadcaster] = lambda: broadcaster
+
+    with client.websocket_connect("/api/live/ws") as ws:
+        message = ws.receive_json()
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect("/live/ws") as rejected:
+                rejected.receive_json()
+
+    assert message["event"] == "snapshot"
+    assert [m["id"] for m in message["matches"]] == [3]
+    assert exc_info.value.code == 1013
@@ -0,0 +1,60 @@
+import datetime as dt
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.match import classify_match, classify_matches
+from app.serialization import match_summaries_rows
+
+NOW = dt.datetime(2024, 9, 7, 15, 0, tzinfo=dt.timezone.utc)
+
+
+def raw(match_id, kickoff, finished=False, **extra):
+    match = {
+        "matchID": match_id,
+        "leagueShortcut": "bl1",
+        "leagueSeason": 2024,
+        "matchDateTimeUTC": kickoff,
+        "matchIsFinished": finished,
+        "group": {"groupOrderID": 2},
+        "team1": {"teamName": "Bayern"},
+        "team2": {"teamName": "Dortmund"},
+        "matchResults": [
+            {"resultTypeID": 1, "pointsTeam1": 1, "pointsTeam2": 0},
+            {"resultTypeID": 2, "pointsTeam1": 2, "pointsTeam2": 1},
+        ],
+    }
+    match.update(extra)
+    return match
+
+
+SEASON = [
+    raw(1, "2024-09-01T13:30:00Z", finished=True),
+    raw(2, "2024-09-07T14:00:00Z"),  # LIVE
+    raw(3, "2024-09-07T15:04:00Z"),  # меньше 5 минут до начала — LIVE
+    raw(4, "2024-09-07T15:30:00Z", matchResults=[]),  # SCHEDULED
+    raw(5, "2024-09-07T17:30:00+02:00"),  # та же дата, что у 4, в другой зоне
+    raw(6, "2024-09-07T15:30:00Z", group=None, team2=None),
+    raw(7, None, matchDateTime="2024-09-14T15:30:00"),  # наивная — считаем UTC
+    raw(8, "2024-09-07T15:30:00Z", matchID="8"),  # id строкой — через валидацию
+    raw(9, "2024-09-07T15:30:00Z", matchResults=[{"pointsTeam1": 1.0, "pointsTeam2": 0}]),
+]
+
+
+@pytest.mark.parametrize("now", [NOW, NOW.replace(tzinfo=None), NOW.astimezone(dt.timezone(dt.timedelta(hours=2)))])
+def test_batch_classification_matches_classify_match(now):
+    expected = [classify_match(m, now) for m in SEASON[:5] + SEASON[6:]]
+    got = classify_matches(SEASON[:5] + SEASON[6:], now)
+
+    assert got == expected
+    assert [type(m.status) for m in got] == [type(m.status) for m in expected]
+    assert match_summaries_rows(got) == [m.model_dump(mode="json") for m in expected]
+
+
+def test_batch_classification_raises_like_classify_match_on_invalid_match():
+    broken = [SEASON[0], SEASON[5]]  # у 6 нет team2
+
+    with pytest.raises(ValidationError):
+        classify_match(SEASON[5], NOW)
+    with pytest.raises(ValidationError):
+        classify_matches(broken, NOW)
@@ -0,0 +1,162 @@
+import asyncio
+import datetime as dt
+
+import httpx
+
+from app.openligadb_client import OpenLigaDBClient
+from app.season_cache import SeasonCache
+
+SEASON = [{"matchID": 1, "matchIsFinished": False}]
+
+
+class FakeOpenLigaDB:
+    """Минимальный OpenLigaDB: currentgroup, lastchangedate и getmatchdata с ETag."""
+
+    def __init__(self):
+        self.last_change = "2024-09-01T18:00:00.123"
+        self.etag = '"v1"'
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append((path, request.headers.get("If-None-Match")))
+        if path == "/getcurrentgroup/bl1":
+            return httpx.Response(200, json={"groupOrderID": 3, "groupName": "3. Spieltag"})
+        if path == "/getlastchangedate/bl1/2024/3":
+            return httpx.Response(200, json=self.last_change)
+        if path == "/getmatchdata/bl1/2024":
+            if request.headers.get("If-None-Match") == self.etag:
+                return httpx.Response(304, headers={"ETag": self.etag})
+            return httpx.Response(200, json=SEASON, headers={"ETag": self.etag})
+        return httpx.Response(404)
+
+    def season_downloads(self):
+        return [h for p, h in self.requests if p == "/getmatchdata/bl1/2024"]
+
+
+def test_season_refresh_skips_download_when_last_change_date_is_unchanged():
+    upstream = FakeOpenLigaDB()
+    cache = SeasonCache(ttl_s=60, finished_ttl_s=3600, stale_s=0)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+            client = OpenLigaDBClient(base_url="http://openligadb", http_client=http, season_cache=cache)
+
+            first = await client.get_season_snapshot("bl1", 2024)
+            assert first.last_change.isoformat() == "2024-09-01T18:00:00.123000"
+            cache.expire("bl1", 2024)
+            unchanged = await client.get_season_snapshot("bl1", 2024)
+
+            # Метка поменялась, payload — нет: условный запрос получает 304
+            upstream.last_change = "2024-09-01T18:05:00"
+            cache.expire("bl1", 2024)
+            not_modified = await client.get_season_snapshot("bl1", 2024)
+            return first, unchanged, not_modified
+
+    first, unchanged, not_modified = asyncio.run(scenario())
+
+    assert first.raw == SEASON
+    assert unchanged is first and not_modified is first
+    assert not_modified.last_change.isoformat() == "2024-09-01T18:05:00"
+    assert upstream.season_downloads() == [None, '"v1"']
+    assert cache.stats()["unchanged_refreshes"] == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unchanged_last_change_date_does_not_hide_changes_in_other_matchdays_forever():
+    upstream = FakeOpenLigaDB()
+    clock = FakeClock()
+    cache = SeasonCache(ttl_s=60, finished_ttl_s=3600, stale_s=0, revalidate_s=600, clock=clock)
+    rescheduled = [{"matchID": 1, "matchIsFinished": False, "matchDateTimeUTC": "2024-09-21T18:30:00Z"}]
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+            client = OpenLigaDBClient(base_url="http://openligadb", http_client=http, season_cache=cache)
+            first = await client.get_season_snapshot("bl1", 2024)
+
+            # Матч следующего тура перенесли: payload и ETag новые, метка текущего тура та же
+            SEASON[:] = rescheduled
+            upstream.etag = '"v2"'
+            clock.now += 61
+            within_bound = await client.get_season_snapshot("bl1", 2024)
+            clock.now += 600
+            after_bound = await client.get_season_snapshot("bl1", 2024)
+            forced = await client.get_season_snapshot("bl1", 2024, revalidate=True)
+            return first, within_bound, after_bound, forced
+
+    original = list(SEASON)
+    try:
+        first, within_bound, after_bound, forced = asyncio.run(scenario())
+    finally:
+        SEASON[:] = original
+
+    assert within_bound is first
+    assert after_bound.raw == rescheduled
+    assert upstream.season_downloads() == [None, '"v1"', '"v2"']
+    assert forced is after_bound
+
+
+def test_season_last_change_is_none_when_upstream_fails():
+    def broken(request):
+        return httpx.Response(503)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(broken)) as http:
+            client = OpenLigaDBClient(base_url="http://openligadb", http_client=http)
+            return await client.get_season_last_change("bl1", 2024)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_matches_for_date_reuse_index_until_season_payload_changes():
+    def match(match_id, kickoff, team1="Bayern"):
+        return {
+            "matchID": match_id,
+            "leagueShortcut": "bl1",
+            "leagueSeason": 2024,
+            "matchDateTime": kickoff,
+            "matchIsFinished": False,
+            "group": {"groupName": "3. Spieltag"},
+            "team1": {"teamName": team1},
+            "team2": {"teamName": "Dortmund"},
+        }
+
+    season = [
+        match(2, "2024-09-14T18:30:00"),
+        match(1, "2024-09-14T15:30:00"),
+        match(3, "2024-09-15T17:30:00"),
+    ]
+    cache = SeasonCache(ttl_s=60, finished_ttl_s=3600, stale_s=0)
+
+    def upstream(request):
+        if request.url.path == "/getmatchdata/bl1/2024":
+            return httpx.Response(200, json=season)
+        return httpx.Response(404)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+            client = OpenLigaDBClient(base_url="http://openligadb", http_client=http, season_cache=cache)
+
+            saturday = await client.get_matches_for_date("bl1", dt.date(2024, 9, 14), season=2024)
+            again = await client.get_matches_for_date("bl1", dt.date(2024, 9, 14), season=2024)
+            empty = await client.get_matches_for_date("bl1", dt.date(2024, 9, 16), season=2024)
+
+            season[2] = match(3, "2024-09-15T17:30:00", "Leipzig")
+            cache.expire("bl1", 2024)
+            sunday = await client.get_matches_for_date("bl1", dt.date(2024, 9, 15), season=2024)
+            return saturday, again, empty, sunday
+
+    saturday, again, empty, sunday = asyncio.run(scenario())
+
+    assert [m.match_id for m in saturday] == [1, 2]
+    assert saturday[0].group_name == "3. Spieltag"
+    assert all(a is b for a, b in zip(saturday, again))
+    assert empty == []
+    assert [m.team1 for m in sunday] == ["Leipzig"]
@@ -0,0 +1,321 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from sqlalchemy import create_engine, event, func, insert, select, text, tuple_
+
+from app.models import Match, Season
+from app.repositories.matches import (
+    archive_matches_query,
+    bulk_upsert_matches_from_board,
+    get_archive_meta,
+    get_or_create_league,
+    get_or_create_season,
+    list_archive_matches,
+    list_archive_matches_async,
+)
+
+
+def summary(match_id, *, score=(None, None), status="SCHEDULED", day=1):
+    kickoff = dt.datetime(2024, 8, day, 15, 30, tzinfo=dt.timezone.utc)
+    return {
+        "id": match_id,
+        "league_shortcut": "bl1",
+        "league_season": 2024,
+        "group_order_id": 1,
+        "team1_name": f"Home {match_id}",
+        "team2_name": f"Away {match_id}",
+        "kickoff_utc": kickoff.isoformat(),
+        "status": status,
+        "score_team1": score[0],
+        "score_team2": score[1],
+    }
+
+
+def upsert(db, matches, **kwargs):
+    return bulk_upsert_matches_from_board(
+        db=db,
+        league_shortcut="bl1",
+        league_name="Bundesliga",
+        season_year=2024,
+        matches=matches,
+        **kwargs,
+    )
+
+
+def test_bulk_upsert_inserts_then_reports_unchanged(db_session):
+    matches = [summary(i) for i in range(1, 11)]
+
+    first = upsert(db_session, matches)
+    second = upsert(db_session, matches)
+
+    assert first.as_dict() == {"inserted": 10, "updated": 0, "unchanged": 0, "skipped": 0}
+    assert second.as_dict() == {"inserted": 0, "updated": 0, "unchanged": 10, "skipped": 0}
+    assert db_session.scalar(select(func.count()).select_from(Match)) == 10
+
+
+def test_bulk_upsert_updates_only_changed_rows(db_session):
+    upsert(db_session, [summary(1), summary(2), summary(3)])
+
+    counts = upsert(
+        db_session,
+        [summary(1), summary(2, score=(2, 1), status="FINISHED"), summary(3), summary(4)],
+    )
+
+    assert counts.as_dict() == {"inserted": 1, "updated": 1, "unchanged": 2, "skipped": 0}
+    row = db_session.scalars(select(Match).where(Match.external_match_id == 2)).one()
+    assert (row.score_team1, row.score_team2, row.status) == (2, 1, "FINISHED")
+
+
+def test_bulk_upsert_uses_a_constant_number_of_statements_per_chunk(db_session):
+    upsert(db_session, [summary(i) for i in range(1, 7)])
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        upsert(db_session, [summary(i, score=(1, 0)) for i in range(1, 7)], chunk_size=3)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    # лига + сезон, затем на каждый из двух чанков: SELECT существующих id
+    # и один INSERT ... ON CONFLICT — вместо запроса на каждый матч
+    assert len(statements) == 2 + 2 * 2
+    assert sum("ON CONFLICT" in s for s in statements) == 2
+
+
+def test_bulk_upsert_skips_unparseable_kickoff_and_dedupes_ids(db_session):
+    broken = summary(5)
+    broken["kickoff_utc"] = "not a date"
+
+    counts = upsert(db_session, [summary(1), summary(1, score=(3, 3)), broken])
+
+    assert counts.as_dict() == {"inserted": 1, "updated": 0, "unchanged": 0, "skipped": 1}
+    row = db_session.scalars(select(Match)).one()
+    assert (row.score_team1, row.score_team2) == (3, 3)
+
+
+def test_bulk_upsert_does_not_write_rows_with_same_fingerprint(db_session):
+    matches = [summary(i) for i in range(1, 4)]
+    upsert(db_session, matches)
+    fingerprints = dict(db_session.execute(select(Match.external_match_id, Match.fingerprint)).all())
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        counts = upsert(db_session, matches)
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert counts.changed == 0
+    assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+    assert all(len(fp) == 32 for fp in fingerprints.values())
+
+
+def test_fingerprint_ignores_timezone_representation(db_session):
+    upsert(db_session, [summary(1)])
+    same_moment = summary(1)
+    same_moment["kickoff_utc"] = "2024-08-01T17:30:00+02:00"
+
+    counts = upsert(db_session, [same_moment])
+
+    assert counts.as_dict() == {"inserted": 0, "updated": 0, "unchanged": 1, "skipped": 0}
+
+
+def _query_plan(db, stmt):
+    compiled = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    return [row[3] for row in db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))]
+
+
+@pytest.mark.parametrize(
+    "filters, expected_indexes",
+    [
+        ({}, {"ix_match_league_id_kickoff_utc"}),
+        (
+            {"date_from": dt.date(2024, 8, 1), "date_to": dt.date(2024, 8, 31)},
+            {"ix_match_league_id_kickoff_utc"},
+        ),
+        ({"status": "FINISHED"}, {"ix_match_league_id_status_kickoff_utc"}),
+        (
+            {"season_year": 2024},
+            {"ix_match_league_id_kickoff_utc", "ix_match_season_id_kickoff_utc"},
+        ),
+    ],
+)
+def test_archive_queries_use_composite_indexes(db_session, filters, expected_indexes):
+    upsert(db_session, [summary(i, day=1 + i % 28) for i in range(1, 40)])
+    params = {"season_year": None, "date_from": None, "date_to": None, "status": None, **filters}
+    # Как страница list_archive_matches: keyset по (kickoff_utc, id) и тот же порядок
+    stmt = (
+        archive_matches_query(league_id=1, **params)
+        .where(tuple_(Match.kickoff_utc, Match.id) < tuple_(dt.datetime(2024, 8, 20, tzinfo=dt.timezone.utc), 20))
+        .order_by(Match.kickoff_utc.desc(), Match.id.desc())
+        .limit(50)
+    )
+
+    plan = _query_plan(db_session, stmt)
+
+    match_steps = [step for step in plan if " match " in f" {step} "]
+    assert match_steps, plan
+    assert not any(step.startswith("SCAN match") for step in match_steps), plan
+    assert any(name in step for step in match_steps for name in expected_indexes), plan
+    # id в индексе: порядок страницы берётся из индекса, без сортировки
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_list_archive_matches_pages_newest_first(db_session):
+    upsert(db_session, [summary(i, day=i) for i in range(1, 8)])
+
+    total, first_page, _ = list_archive_matches(
+        db=db_session,
+        league_shortcut="bl1",
+        season_year=2024,
+        date_from=None,
+        date_to=None,
+        status=None,
+        page=1,
+        page_size=3,
+    )
+    _, last_page, last_cursor = list_archive_matches(
+        db=db_session,
+        league_shortcut="bl1",
+        season_year=2024,
+        date_from=None,
+        date_to=None,
+        status=None,
+        page=3,
+        page_size=3,
+    )
+
+    assert total == 7
+    assert [m.id for m in first_page] == [7, 6, 5]
+    assert [m.id for m in last_page] == [1]
+    assert last_cursor is None
+
+
+def test_list_archive_matches_cursor_walks_all_rows_without_total(db_session):
+    # дни повторяются → у части матчей одинаковый kickoff, курсор должен их различать
+    upsert(db_session, [summary(i, day=1 + i % 3) for i in range(1, 11)])
+
+    seen, cursor = [], None
+    for _ in range(10):
+        total, items, cursor = list_archive_matches(
+            db=db_session,
+            league_shortcut="bl1",
+            season_year=None,
+            date_from=None,
+            date_to=None,
+            status=None,
+            page=1,
+            page_size=4,
+            cursor=cursor,
+            include_total=False,
+        )
+        assert total is None
+        seen.extend(m.id for m in items)
+        if cursor is None:
+            break
+
+    assert sorted(seen) == list(range(1, 11))
+    days = [1 + i % 3 for i in seen]
+    assert days == sorted(days, reverse=True)
+
+
+def test_list_archive_matches_rejects_garbage_cursor(db_session):
+    with pytest.raises(ValueError):
+        list_archive_matches(
+            db=db_session,
+            league_shortcut="bl1",
+            season_year=None,
+            date_from=None,
+            date_to=None,
+            status=None,
+            page=1,
+            page_size=4,
+            cursor="not-a-cursor",
+        )
+
+
+def _count_statements(db, fn):
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_archive_meta_is_served_from_cache_while_db_version_is_unchanged(db_session):
+    for shortcut in ("bl1", "bl2", "bl3"):
+        league = get_or_create_league(db_session, shortcut=shortcut, name=shortcut.upper())
+        for year in (2022, 2023):
+            get_or_create_season(db_session, league=league, year=year)
+    get_or_create_league(db_session, shortcut="dfb", name="DFB-Pokal")
+    db_session.commit()
+
+    items, first_queries = _count_statements(db_session, lambda: get_archive_meta(db_session))
+    again, second_queries = _count_statements(db_session, lambda: get_archive_meta(db_session))
+
+    # Версия метаданных (агрегаты) + сами метаданные, потом только версия
+    assert first_queries == 2
+    assert second_queries == 1
+    assert again is items
+    assert [(i.shortcut, i.seasons) for i in items] == [
+        ("bl1", [2023, 2022]),
+        ("bl2", [2023, 2022]),
+        ("bl3", [2023, 2022]),
+        ("dfb", []),
+    ]
+
+
+def test_archive_meta_cache_is_invalidated_by_new_season(db_session):
+    league = get_or_create_league(db_session, shortcut="bl1", name="Bundesliga")
+    get_or_create_season(db_session, league=league, year=2023)
+    db_session.commit()
+    assert get_archive_meta(db_session)[0].seasons == [2023]
+
+    upsert(db_session, [summary(1)])  # создаёт сезон 2024
+
+    assert get_archive_meta(db_session)[0].seasons == [2024, 2023]
+
+
+def test_archive_meta_cache_sees_seasons_added_by_another_replica(db_session, db_url):
+    league = get_or_create_league(db_session, shortcut="bl1", name="Bundesliga")
+    get_or_create_season(db_session, league=league, year=2023)
+    db_session.commit()
+    assert get_archive_meta(db_session)[0].seasons == [2023]
+
+    # Другой процесс: свой engine, без сессий и хуков этого процесса
+    other = create_engine(db_url)
+    with other.begin() as conn:
+        conn.execute(insert(Season).values(league_id=league.id, year=2024, is_current=True))
+    other.dispose()
+
+    assert get_archive_meta(db_session)[0].seasons == [2024, 2023]
+
+
+def test_async_archive_listing_matches_sync_version(db_session, async_db_factory):
+    upsert(db_session, [summary(i, day=i) for i in range(1, 6)])
+    params = dict(
+        league_shortcut="bl1",
+        season_year=2024,
+        date_from=None,
+        date_to=None,
+        status=None,
+        page=1,
+        page_size=2,
+    )
+
+    async def run_async():
+        async with async_db_factory() as session:
+            return await list_archive_matches_async(db=session, **params)
+
+    sync_total, sync_items, sync_cursor = list_archive_matches(db=db_session, **params)
+    async_total, async_items, async_cursor = asyncio.run(run_async())
+
+    assert async_total == sync_total == 5
+    assert [m.id for m in async_items] == [m.id for m in sync_items] == [5, 4]
+    assert async_cursor == sync_cursor
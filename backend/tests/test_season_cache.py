@@ -0,0 +1,162 @@
+import asyncio
+import gc
+import logging
+
+import pytest
+
+from app.season_cache import SeasonCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_loader(payloads, calls, delay=0.0):
+    async def loader():
+        calls.append(1)
+        if delay:
+            await asyncio.sleep(delay)
+        item = payloads[min(len(calls), len(payloads)) - 1]
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    return loader
+
+
+def make_cache(clock):
+    return SeasonCache(ttl_s=60, finished_ttl_s=3600, stale_s=30, clock=clock)
+
+
+def test_cache_hit_within_ttl_does_not_refetch():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    calls = []
+    loader = make_loader([[{"matchID": 1}]], calls)
+
+    async def scenario():
+        first = await cache.get("BL1", 2024, loader)
+        clock.now += 59
+        second = await cache.get("bl1", 2024, loader)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert first is second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_concurrent_misses_are_coalesced_into_one_fetch():
+    cache = make_cache(FakeClock())
+    calls = []
+    loader = make_loader([[{"matchID": 1}]], calls, delay=0.01)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("bl1", 2024, loader) for _ in range(10)))
+
+    snapshots = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(s is snapshots[0] for s in snapshots)
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_stale_entry_is_served_and_refreshed_in_background():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    calls = []
+    loader = make_loader([[{"matchID": 1}], [{"matchID": 2}]], calls)
+
+    async def scenario():
+        first = await cache.get("bl1", 2024, loader)
+        clock.now += 70  # TTL истёк, но окно stale ещё открыто
+        stale = await cache.get("bl1", 2024, loader)
+        await asyncio.sleep(0)  # даём фоновому обновлению отработать
+        fresh = await cache.get("bl1", 2024, loader)
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(scenario())
+
+    assert stale is first
+    assert fresh.raw == [{"matchID": 2}]
+    assert fresh.version != first.version
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_unchanged_payload_keeps_version():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    calls = []
+    loader = make_loader([[{"matchID": 1}], [{"matchID": 1}]], calls)
+
+    async def scenario():
+        first = await cache.get("bl1", 2024, loader)
+        clock.now += 1000  # за пределами stale-окна → синхронная перезагрузка
+        second = await cache.get("bl1", 2024, loader)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(calls) == 2
+    assert second.version == first.version
+
+
+def test_finished_season_uses_long_ttl():
+    clock = FakeClock()
+    cache = make_cache(clock)
+    calls = []
+    loader = make_loader([[{"matchID": 1, "matchIsFinished": True}]], calls)
+
+    async def scenario():
+        await cache.get("bl1", 2020, loader)
+        clock.now += 1800
+        await cache.get("bl1", 2020, loader)
+
+    asyncio.run(scenario())
+
+    assert len(calls) == 1
+
+
+def test_failed_miss_propagates_error():
+    cache = make_cache(FakeClock())
+    loader = make_loader([RuntimeError("boom")], [])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get("bl1", 2024, loader))
+
+    assert cache.stats()["refresh_errors"] == 1
+
+
+def test_failed_background_refresh_without_stale_entry_is_logged_not_leaked(caplog):
+    clock = FakeClock()
+    cache = make_cache(clock)
+    calls = []
+    loader = make_loader([[{"matchID": 1}], RuntimeError("upstream down")], calls, delay=0.01)
+    unhandled = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda _loop, context: unhandled.append(context))
+        first = await cache.get("bl1", 2024, loader)
+        clock.now += 61
+        stale = await cache.get("bl1", 2024, loader)
+        # Запись пропала, пока обновление шло: отдавать при ошибке нечего
+        cache.invalidate("bl1", 2024)
+        await asyncio.sleep(0.05)
+        gc.collect()
+        return first, stale
+
+    with caplog.at_level(logging.WARNING, logger="app.season_cache"):
+        first, stale = asyncio.run(scenario())
+    gc.collect()
+
+    assert stale is first
+    assert len(calls) == 2
+    assert cache.stats()["inflight"] == 0
+    assert unhandled == []
+    assert "upstream down" in caplog.text
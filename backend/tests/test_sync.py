@@ -0,0 +1,172 @@
+import asyncio
+import datetime as dt
+import threading
+
+import httpx
+from sqlalchemy import select
+
+from app.models import Match
+from app.openligadb_client import OpenLigaDBClient
+from app.repositories.matches import get_season_sync_state
+from app.season_cache import SeasonCache, SeasonSnapshot
+from app import sync
+from app.sync import full_sync_due, sync_season
+
+T0 = dt.datetime(2024, 9, 1, 18, 0)
+T1 = dt.datetime(2024, 9, 8, 17, 30)
+NOW = dt.datetime(2024, 9, 8, 18, 0, tzinfo=dt.timezone.utc)
+
+
+def raw_match(match_id, group):
+    return {
+        "matchID": match_id,
+        "leagueShortcut": "bl1",
+        "leagueSeason": 2024,
+        "matchDateTimeUTC": f"2024-09-{group:02d}T13:30:00Z",
+        "matchIsFinished": True,
+        "group": {"groupOrderID": group},
+        "team1": {"teamName": f"Home {match_id}"},
+        "team2": {"teamName": f"Away {match_id}"},
+        "matchResults": [{"resultTypeID": 2, "pointsTeam1": 1, "pointsTeam2": 0}],
+    }
+
+
+SEASON = [raw_match(100 + g, g) for g in range(1, 6)]
+
+
+class SeasonClient:
+    def __init__(self):
+        self.calls = []
+
+    async def get_season_last_change(self, league, season):
+        return T0
+
+    async def get_season_snapshot(self, league, season, last_change=None, revalidate=False):
+        self.calls.append("season")
+        return SeasonSnapshot(league=league, season=season, raw=SEASON, last_change=last_change)
+
+
+class GroupsClient:
+    def __init__(self, markers):
+        self.markers = markers
+        self.calls = []
+
+    async def get_current_group(self, league):
+        return {"groupOrderID": 3}
+
+    async def get_available_groups(self, league, season):
+        return [{"groupOrderID": g} for g in range(1, 6)]
+
+    async def get_last_change_date(self, league, season, group):
+        self.calls.append(("lastchange", group))
+        return self.markers[group].isoformat()
+
+    async def get_matchdata_league_season_group(self, league, season, group):
+        self.calls.append(("group", group))
+        changed = dict(raw_match(100 + group, group), matchResults=[])
+        return [changed]
+
+
+def test_incremental_sync_fetches_only_changed_groups_near_current(db_session):
+    season_client = SeasonClient()
+    groups_client = GroupsClient({2: T0, 3: T1, 4: T0})
+
+    async def scenario():
+        full = await sync_season(db_session, season_client, groups_client, "bl1", 2024, mode="full", now=NOW)
+        incremental = await sync_season(
+            db_session, season_client, groups_client, "bl1", 2024, mode="incremental", now=NOW
+        )
+        return full, incremental
+
+    full, incremental = asyncio.run(scenario())
+
+    assert full.synced == 5
+    assert incremental.groups == [3]
+    assert incremental.synced == 1
+    assert incremental.counts.updated == 1
+    assert [c for c in groups_client.calls if c[0] == "group"] == [("group", 3)]
+    assert sorted(g for kind, g in groups_client.calls if kind == "lastchange") == [2, 3, 4]
+
+    state = get_season_sync_state(db_session, "bl1", 2024)
+    assert state.last_change_at == T1
+
+
+def test_auto_mode_falls_back_to_full_sync_on_interval(db_session):
+    season_client = SeasonClient()
+    groups_client = GroupsClient({2: T0, 3: T0, 4: T0})
+
+    async def run(now):
+        return await sync_season(db_session, season_client, groups_client, "bl1", 2024, mode="auto", now=now)
+
+    first = asyncio.run(run(NOW))
+    second = asyncio.run(run(NOW + dt.timedelta(hours=1)))
+    later = asyncio.run(run(NOW + dt.timedelta(days=2)))
+
+    assert first.mode == "full" and first.synced == 5
+    assert second.mode == "incremental" and second.groups == []
+    # Полная синхронизация по расписанию идёт даже при неизменной метке сезона
+    assert later.mode == "full" and later.synced == 5
+    assert season_client.calls == ["season", "season"]
+
+
+def test_full_sync_due_without_previous_full_sync():
+    assert full_sync_due(None, NOW, interval_s=3600) is True
+
+
+def test_forced_full_sync_bypasses_season_cache_when_marker_is_unchanged(db_session):
+    season = [raw_match(100 + g, g) for g in range(1, 6)]
+    etag = {"value": '"v1"'}
+    season_requests = []
+
+    def upstream(request):
+        path = request.url.path
+        if path == "/getcurrentgroup/bl1":
+            return httpx.Response(200, json={"groupOrderID": 5})
+        if path == "/getlastchangedate/bl1/2024/5":
+            return httpx.Response(200, json=T0.isoformat())
+        if path == "/getmatchdata/bl1/2024":
+            season_requests.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == etag["value"]:
+                return httpx.Response(304, headers={"ETag": etag["value"]})
+            return httpx.Response(200, json=season, headers={"ETag": etag["value"]})
+        return httpx.Response(404)
+
+    cache = SeasonCache(ttl_s=3600, finished_ttl_s=3600, stale_s=0)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as http:
+            client = OpenLigaDBClient(base_url="http://openligadb", http_client=http, season_cache=cache)
+            await sync_season(db_session, client, None, "bl1", 2024, mode="full", now=NOW)
+
+            # Матч первого тура перенесли: метка текущего (пятого) тура прежняя,
+            # снапшот в кэше ещё свежий по TTL
+            season[0] = dict(season[0], matchDateTimeUTC="2024-09-04T18:30:00Z")
+            etag["value"] = '"v2"'
+            return await sync_season(db_session, client, None, "bl1", 2024, mode="full", force=True, now=NOW)
+
+    forced = asyncio.run(scenario())
+
+    assert forced.synced == 5 and forced.counts.updated == 1
+    assert season_requests == [None, '"v1"']
+    kickoff = db_session.scalar(select(Match.kickoff_utc).where(Match.external_match_id == 101))
+    assert kickoff.replace(tzinfo=None) == dt.datetime(2024, 9, 4, 18, 30)
+
+
+def test_database_work_runs_off_the_event_loop_thread(db_session, monkeypatch):
+    threads = []
+    upsert = sync._upsert
+
+    def recording_upsert(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(sync, "_upsert", recording_upsert)
+
+    async def scenario():
+        await sync_season(db_session, SeasonClient(), None, "bl1", 2024, mode="full", now=NOW)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert threads and loop_thread not in threads
+    assert get_season_sync_state(db_session, "bl1", 2024).last_full_sync_at is not None
@@ -0,0 +1,146 @@
+import asyncio
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.sync_jobs import SyncJobManager, SyncJobsBusy, get_sync_jobs
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_manager(db_url, concurrency=2, max_jobs=50, fail=(), clock=None, instance_id="pod-a", delay=0.01):
+    state = {"running": 0, "peak": 0, "calls": []}
+
+    async def sync_pair(db, league, season, mode, force):
+        state["calls"].append((league, season, mode))
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(delay)
+        state["running"] -= 1
+        if (league, season) in fail:
+            raise RuntimeError("upstream down")
+        if clock is not None:
+            clock.now += 1
+        return {"league": league, "season": season, "synced": 300, "changed": 10}
+
+    manager = SyncJobManager(
+        sync_pair,
+        session_factory=sessionmaker(bind=create_engine(db_url), expire_on_commit=False),
+        concurrency=concurrency,
+        max_jobs=max_jobs,
+        clock=clock or FakeClock(),
+        instance_id=instance_id,
+    )
+    return manager, state
+
+
+def test_job_runs_pairs_on_bounded_pool_and_reports_throughput(db_session, db_url):
+    clock = FakeClock()
+    manager, state = make_manager(db_url, concurrency=2, fail={("bl1", 2021)}, clock=clock)
+
+    async def scenario():
+        job = await manager.submit([("BL1", s) for s in range(2020, 2024)] + [("bl1", 2020)], mode="auto")
+        queued = manager.describe(job)
+        await manager.wait(job.id)
+        return queued, manager.describe(job)
+
+    queued, done = asyncio.run(scenario())
+
+    assert queued["status"] == "queued" and queued["total"] == 4
+    assert state["peak"] == 2
+    assert {c[2] for c in state["calls"]} == {"auto"}
+    assert done["status"] == "finished"
+    assert (done["completed"], done["failed"], done["synced"]) == (3, 1, 900)
+    assert done["errors"] == [{"league": "bl1", "season": 2021, "detail": "upstream down"}]
+    assert done["elapsed_s"] == 3.0
+    assert done["matches_per_s"] == 300.0
+
+
+def test_finished_jobs_are_evicted_and_running_ones_are_not(db_session, db_url):
+    manager, _state = make_manager(db_url, max_jobs=1)
+
+    async def scenario():
+        first = await manager.submit([("bl1", 2024)])
+        try:
+            await manager.submit([("bl2", 2024)])
+            busy = False
+        except SyncJobsBusy:
+            busy = True
+        await manager.wait(first.id)
+        second = await manager.submit([("bl2", 2024)])
+        await manager.wait(second.id)
+        return first, second, busy
+
+    first, second, busy = asyncio.run(scenario())
+
+    assert busy
+    assert manager.get(first.id) is None
+    assert manager.get(second.id) is not None
+    assert manager.stats()["evicted"] == 1
+    assert asyncio.run(manager.status(first.id)) is None
+
+
+def test_sync_jobs_endpoints_accept_ranges_and_expose_progress(client, db_session, db_url):
+    manager, _state = make_manager(db_url)
+    client.app.dependency_overrides[get_sync_jobs] = lambda: manager
+
+    created = client.post(
+        "/api/admin/sync-jobs",
+        json={
+            "items": [
+                {"league": "bl1", "season_from": 2022, "season_to": 2023},
+                {"league": "bl2", "season": 2024},
+            ]
+        },
+    )
+
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+    assert created.json()["total"] == 3
+    assert created.headers["location"] == f"/api/admin/sync-jobs/{job_id}"
+
+    status = client.get(f"/api/admin/sync-jobs/{job_id}")
+    assert status.status_code == 200
+    assert status.json()["job_id"] == job_id
+    assert status.headers["cache-control"] == "no-store"
+
+    assert client.get("/api/admin/sync-jobs/unknown").status_code == 404
+    invalid = client.post(
+        "/api/admin/sync-jobs",
+        json={"items": [{"league": "bl1", "season_from": 2024, "season_to": 2020}]},
+    )
+    assert invalid.status_code == 422
+
+
+def test_job_status_is_served_by_another_replica(client, db_session, db_url):
+    clock = FakeClock()
+    owner, _state = make_manager(db_url, clock=clock, instance_id="pod-a", delay=0.05)
+    other, _ = make_manager(db_url, clock=clock, instance_id="pod-b")
+    client.app.dependency_overrides[get_sync_jobs] = lambda: other
+
+    async def scenario():
+        done = await owner.submit([("bl1", 2023), ("bl1", 2024)])
+        await owner.wait(done.id)
+        stopped = await owner.submit([("bl2", 2024)])
+        await asyncio.sleep(0.01)
+        await owner.stop()
+        return done.id, stopped.id
+
+    done_id, stopped_id = asyncio.run(scenario())
+
+    finished = client.get(f"/api/admin/sync-jobs/{done_id}")
+    assert finished.status_code == 200
+    assert finished.json() == owner.describe(owner.get(done_id))
+    assert finished.json()["status"] == "finished" and finished.json()["synced"] == 600
+
+    # Реплику остановили посреди задачи: на другой видно, что задача прервана
+    interrupted = client.get(f"/api/admin/sync-jobs/{stopped_id}").json()
+    assert interrupted["status"] == "interrupted"
+    assert (interrupted["completed"], interrupted["pending"]) == (0, 1)
+    assert other.get(done_id) is None
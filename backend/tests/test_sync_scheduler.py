@@ -0,0 +1,135 @@
+import asyncio
+import datetime as dt
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.repositories.matches import bulk_upsert_matches_from_board
+from app.sync_scheduler import SyncScheduler, next_sync_delay
+
+NOW = dt.datetime(2024, 9, 7, 12, 0, tzinfo=dt.timezone.utc)
+HOUR = dt.timedelta(hours=1)
+
+
+class FakeClock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def delay(kickoffs, now=NOW):
+    return next_sync_delay(kickoffs, now, live_interval_s=45, idle_interval_s=3 * 3600, match_window_s=9000)
+
+
+def test_delay_is_short_only_between_kickoff_and_final():
+    assert delay([NOW - HOUR]) == 45
+    assert delay([NOW - 3 * HOUR]) == 3 * 3600
+    assert delay([]) == 3 * 3600
+
+
+def test_delay_wakes_up_for_next_kickoff_but_not_later_than_idle_interval():
+    assert delay([NOW + HOUR, NOW + 2 * HOUR]) == 3600
+    assert delay([NOW + 10 * HOUR]) == 3 * 3600
+    assert delay([NOW + dt.timedelta(seconds=5)]) == 45
+
+
+def make_scheduler(db_url, calls, clock, instance_id, sync_error=None, on_league=None):
+    factory = sessionmaker(bind=create_engine(db_url), expire_on_commit=False)
+
+    async def sync_league(db, league):
+        calls.append((instance_id, league))
+        if on_league is not None:
+            on_league(league)
+        if sync_error and league in sync_error:
+            raise RuntimeError("upstream down")
+        return {"league": league}
+
+    return SyncScheduler(
+        sync_league=sync_league,
+        leagues=["BL1", "bl2"],
+        season=2024,
+        session_factory=factory,
+        instance_id=instance_id,
+        clock=clock,
+    )
+
+
+def store_kickoff(db_session, kickoff):
+    bulk_upsert_matches_from_board(
+        db=db_session,
+        league_shortcut="bl1",
+        league_name="bl1",
+        season_year=2024,
+        matches=[
+            {
+                "id": 1,
+                "group_order_id": 1,
+                "team1_name": "A",
+                "team2_name": "B",
+                "kickoff_utc": kickoff.isoformat(),
+                "status": "LIVE",
+            }
+        ],
+    )
+
+
+def test_only_one_replica_syncs_until_the_planned_next_run(db_session, db_url):
+    store_kickoff(db_session, NOW - HOUR)
+    clock = FakeClock()
+    calls = []
+    first = make_scheduler(db_url, calls, clock, "pod-a", sync_error={"bl1"})
+    second = make_scheduler(db_url, calls, clock, "pod-b")
+
+    delay_first = asyncio.run(first.run_once())
+    delay_second = asyncio.run(second.run_once())
+
+    assert calls == [("pod-a", "bl1"), ("pod-a", "bl2")]
+    assert first.league_errors == 1
+    assert delay_first == 45
+    assert delay_second == 45
+    assert second.skipped == 1
+    assert second.next_run_at == NOW + dt.timedelta(seconds=45)
+
+    clock.now = NOW + dt.timedelta(seconds=46)
+    asyncio.run(second.run_once())
+
+    assert calls[-2:] == [("pod-b", "bl1"), ("pod-b", "bl2")]
+    assert first.stats()["runs"] == second.stats()["runs"] == 1
+
+
+def test_expired_lease_of_a_stuck_replica_is_taken_over(db_session, db_url):
+    clock = FakeClock()
+    calls = []
+    stuck = make_scheduler(db_url, calls, clock, "pod-a")
+    other = make_scheduler(db_url, calls, clock, "pod-b")
+
+    assert stuck._acquire(NOW) == (True, None)
+    asyncio.run(other.run_once())
+    assert calls == []
+
+    clock.now = NOW + dt.timedelta(seconds=stuck.lock_ttl_s + 1)
+    idle_delay = asyncio.run(other.run_once())
+
+    assert [instance for instance, _ in calls] == ["pod-b", "pod-b"]
+    assert idle_delay == 3 * 3600
+    assert stuck._release(NOW) is False
+
+
+def test_lease_is_extended_after_each_league(db_session, db_url):
+    clock = FakeClock()
+    calls = []
+    taken_over = []
+    other = make_scheduler(db_url, calls, clock, "pod-b")
+
+    def slow_league(league):
+        # Каждая лига — почти весь lock_ttl_s: без продления аренда истекла бы на второй
+        clock.now += dt.timedelta(seconds=other.lock_ttl_s - 10)
+        taken_over.append(other._acquire(clock.now)[0])
+
+    owner = make_scheduler(db_url, calls, clock, "pod-a", on_league=slow_league)
+    asyncio.run(owner.run_once())
+
+    assert calls == [("pod-a", "bl1"), ("pod-a", "bl2")]
+    assert taken_over == [False, False]
@@ -0,0 +1,107 @@
+import asyncio
+
+from app.write_behind import LeagueSnapshot, WriteBehindQueue
+
+
+def snapshot(league, season=2024, marker=0):
+    return LeagueSnapshot(
+        league_shortcut=league,
+        league_name=league,
+        season_year=season,
+        matches=[marker],
+    )
+
+
+def test_snapshots_for_same_league_season_are_merged():
+    persisted = []
+    queue = WriteBehindQueue(persist=persisted.append, flush_interval_s=0)
+
+    async def scenario():
+        queue.submit(snapshot("bl1", marker=1))
+        queue.submit(snapshot("BL1", marker=2))
+        queue.submit(snapshot("bl2"))
+        assert queue.depth == 2
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert [[s.league_shortcut for s in batch] for batch in persisted] == [["BL1", "bl2"]]
+    assert persisted[0][0].matches == [2]
+    assert queue.stats()["merged"] == 1
+
+
+def test_new_keys_are_dropped_when_queue_is_full():
+    queue = WriteBehindQueue(persist=lambda batch: None, max_pending=1)
+
+    assert queue.submit(snapshot("bl1")) is True
+    assert queue.submit(snapshot("bl2")) is False
+    # тот же ключ всё равно принимается — заменяет ожидающий снапшот
+    assert queue.submit(snapshot("bl1", marker=5)) is True
+
+    stats = queue.stats()
+    assert stats["depth"] == 1
+    assert stats["dropped"] == 1
+
+
+def test_worker_flushes_in_batches_off_the_event_loop():
+    batches = []
+    queue = WriteBehindQueue(persist=batches.append, batch_size=2, flush_interval_s=0)
+
+    async def scenario():
+        queue.start()
+        for league in ("bl1", "bl2", "bl3"):
+            queue.submit(snapshot(league))
+        for _ in range(50):
+            if queue.depth == 0 and queue.stats()["flushed_snapshots"] == 3:
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert [len(b) for b in batches] == [2, 1]
+    stats = queue.stats()
+    assert stats["flushes"] == 2
+    assert stats["last_flush_ms"] is not None
+
+
+def test_persist_errors_are_counted_not_raised():
+    def failing(batch):
+        raise RuntimeError("db down")
+
+    queue = WriteBehindQueue(persist=failing, flush_interval_s=0)
+
+    async def scenario():
+        queue.submit(snapshot("bl1"))
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert queue.stats()["flush_errors"] == 1
+    assert queue.depth == 0
+
+
+def test_snapshot_already_persisted_with_same_content_key_is_skipped():
+    persisted = []
+    queue = WriteBehindQueue(persist=persisted.append, flush_interval_s=0)
+
+    async def scenario():
+        first = snapshot("bl1")
+        first.content_key = (7, ("LIVE",))
+        queue.submit(first)
+        await queue.stop()
+
+        again = snapshot("bl1")
+        again.content_key = (7, ("LIVE",))
+        assert queue.submit(again) is True
+        assert queue.depth == 0
+
+        changed = snapshot("bl1")
+        changed.content_key = (7, ("FINISHED",))
+        queue.submit(changed)
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+    assert len(persisted) == 2
+    assert queue.stats()["skipped_unchanged"] == 1